@@ -0,0 +1,46 @@
+"""
+Benchmark de la récupération Jira contre un faux serveur local.
+
+    python benchmarks/bench_jira_fetch.py --latency 0.05 --workers 1 4 8
+
+Affiche, pour 200 / 2k / 20k issues, le temps mural, le nombre de requêtes
+et les issues récupérées pour chaque taille de pool (1 = pagination séquentielle).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_jira import FakeJira, make_issues  # noqa: E402
+from jira_fetch import fetch_issues  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark pagination Jira (faux serveur local).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2_000, 20_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence simulée par requête (s)")
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'workers':>8} {'requêtes':>9} {'récupérées':>11} {'temps (s)':>10}")
+    for size in args.sizes:
+        issues = make_issues(size)
+        for workers in args.workers:
+            with FakeJira(issues, latency=args.latency, max_page=args.page_size) as fake:
+                t0 = time.perf_counter()
+                data, completed, remaining = fetch_issues(fake.url, "bench", "token", "project = BENCH",
+                                                          page_size=args.page_size, max_workers=workers)
+                elapsed = time.perf_counter() - t0
+                assert len(data) == size, f"{len(data)} issues récupérées sur {size}"
+                print(f"{size:>8} {workers:>8} {fake.requests:>9} {len(data):>11} {elapsed:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Faux serveur Jira local (API REST v2 /search) pour benchmarks hors-ligne."""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ["To Do", "In Progress", "Done"]
+PRIORITIES = ["High", "Medium", "Low"]
+_UPDATED_SINCE = re.compile(r'updated >= "(\d{4})/(\d{2})/(\d{2}) (\d{2}:\d{2})"')
+
+
+def make_issues(n: int) -> List[Dict[str, Any]]:
+    """Issues synthétiques déterministes au format JSON de Jira."""
+    issues = []
+    for i in range(1, n + 1):
+        issues.append({
+            "key": f"BENCH-{i}",
+            "fields": {
+                "summary": f"Issue synthétique {i}",
+                "status": {"name": STATUSES[i % 3]},
+                "assignee": {"displayName": f"Dev {i % 7}"} if i % 5 else None,
+                "priority": {"name": PRIORITIES[i % 3]},
+                "customfield_10016": float(i % 8),
+                "customfield_10020": [{"name": "Sprint 42"}],
+                "updated": "2024-01-01T09:00:00.000+0000",
+            },
+        })
+    return issues
+
+
+class FakeJira:
+    """
+    Sert `issues` paginées sur /rest/api/2/search.
+    `latency` simule l'aller-retour réseau, `max_page` le plafond maxResults de Jira.
+    """
+
+    def __init__(self, issues: List[Dict[str, Any]], latency: float = 0.05, max_page: int = 100) -> None:
+        self.issues = issues
+        self.latency = latency
+        self.max_page = max_page
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeJira":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def search(self, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        start_at = int(query.get("startAt", ["0"])[0])
+        page = min(int(query.get("maxResults", ["50"])[0]), self.max_page)
+        fields = set(query.get("fields", [""])[0].split(",")) - {""}
+        issues = self.issues
+        since = _UPDATED_SINCE.search(query.get("jql", [""])[0])
+        if since:
+            y, m, d, hm = since.groups()
+            mark = f"{y}-{m}-{d}T{hm}"
+            issues = [it for it in issues if it["fields"]["updated"][:16] >= mark]
+        chunk = issues[start_at:start_at + page]
+        if fields:
+            chunk = [{"key": it["key"], "fields": {k: v for k, v in it["fields"].items() if k in fields}}
+                     for it in chunk]
+        return {"startAt": start_at, "maxResults": page, "total": len(issues), "issues": chunk}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                with fake._lock:
+                    fake.requests += 1
+                time.sleep(fake.latency)
+                parsed = urlparse(self.path)
+                if parsed.path != "/rest/api/2/search":
+                    self.send_error(404)
+                    return
+                body = json.dumps(fake.search(parse_qs(parsed.query))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
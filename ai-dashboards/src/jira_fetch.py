@@ -0,0 +1,139 @@
+"""Récupération paginée et concurrente des issues Jira (API REST v2 /search)."""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Seuls les champs lus par le rapport sont demandés (payload réduit d'un ordre de grandeur)
+JIRA_FIELDS = ["summary", "status", "assignee", "priority", "customfield_10016", "customfield_10020"]
+# `updated` sert de high-water mark à la synchro incrémentale (jira_store)
+SYNC_FIELDS = JIRA_FIELDS + ["updated"]
+DONE_STATUSES = {"done", "terminé", "terminée", "résolu", "closed"}
+
+
+def build_session(email: str, api_token: str, max_workers: int) -> requests.Session:
+    """Session authentifiée dont le pool de connexions suit le nombre de workers."""
+    session = requests.Session()
+    session.auth = (email, api_token)
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def search_page(session: requests.Session, server: str, jql: str, start_at: int,
+                page_size: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Une page de /rest/api/2/search."""
+    params = {
+        "jql": jql,
+        "startAt": start_at,
+        "maxResults": page_size,
+        "fields": ",".join(fields or JIRA_FIELDS),
+    }
+    resp = session.get(f"{server}/rest/api/2/search", params=params, timeout=30)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Jira API error {resp.status_code}: {resp.text}")
+    return resp.json()
+
+
+def iter_issue_pages(session: requests.Session, server: str, jql: str, page_size: int = 100,
+                     max_workers: int = 4, fields: Optional[List[str]] = None
+                     ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Produit (startAt, issues) au fil de l'eau.
+    La 1re page donne le total ; les suivantes partent en parallèle (pool borné)
+    et sont rendues dans leur ordre d'arrivée, pas dans l'ordre startAt.
+    """
+    first = search_page(session, server, jql, 0, page_size, fields)
+    issues = first.get("issues", [])
+    yield 0, issues
+
+    total = int(first.get("total", len(issues)))
+    # Jira peut plafonner maxResults en dessous de la valeur demandée : on se cale sur la taille réelle
+    step = len(issues) or page_size
+    starts = list(range(step, total, step))
+    if not starts:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(search_page, session, server, jql, s, step, fields): s for s in starts}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result().get("issues", [])
+
+
+def _sprint_name(sprint_field: Any) -> str:
+    # Sprint (customfield_10020) → liste de dicts en JSON, varie selon instances Jira
+    if isinstance(sprint_field, list) and sprint_field:
+        first = sprint_field[0]
+        if isinstance(first, dict):
+            return first.get("name") or str(first)
+        return getattr(first, "name", str(first))
+    if sprint_field is None:
+        return "No Sprint"
+    return str(sprint_field)
+
+
+def issue_to_row(issue: Dict[str, Any]) -> List:
+    """Issue JSON → ligne du rapport [Key, Summary, Status, Assignee, Sprint, Priority, SP]."""
+    fields = issue.get("fields") or {}
+
+    # Story points (customfield_10016) → adapte si besoin
+    story_points = fields.get("customfield_10016") or 0
+    try:
+        story_points = float(story_points)
+    except Exception:
+        story_points = 0.0
+
+    status = fields.get("status") or {}
+    assignee = fields.get("assignee")
+    priority = fields.get("priority")
+    return [
+        issue.get("key"),
+        fields.get("summary"),
+        status.get("name"),
+        assignee.get("displayName") if assignee else "Unassigned",
+        _sprint_name(fields.get("customfield_10020")),
+        priority.get("name") if priority else "",
+        story_points,
+    ]
+
+
+class StoryPointTotals:
+    """Cumul SP terminés vs restants, alimenté ligne à ligne."""
+
+    def __init__(self) -> None:
+        self.completed = 0.0
+        self.remaining = 0.0
+
+    def add(self, row: List) -> None:
+        status_name = (row[2] or "").strip().lower()
+        if status_name in DONE_STATUSES:
+            self.completed += row[6]
+        else:
+            self.remaining += row[6]
+
+
+def fetch_issues(server: str, email: str, api_token: str, jql: str, page_size: int = 100,
+                 max_workers: int = 4) -> Tuple[List[List], float, float]:
+    """
+    Toutes les issues du JQL (plus de troncature à 200) + cumul des story points.
+    Les totaux sont mis à jour dès qu'une page arrive ; les lignes sont ensuite
+    réassemblées dans l'ordre Jira pour garder une sortie stable.
+    """
+    session = build_session(email, api_token, max_workers)
+    totals = StoryPointTotals()
+    pages: Dict[int, List[List]] = {}
+    try:
+        for start_at, issues in iter_issue_pages(session, server, jql, page_size, max_workers):
+            rows = [issue_to_row(issue) for issue in issues]
+            for row in rows:
+                totals.add(row)
+            pages[start_at] = rows
+    finally:
+        session.close()
+
+    data = [row for start_at in sorted(pages) for row in pages[start_at]]
+    return data, totals.completed, totals.remaining
@@ -0,0 +1,165 @@
+"""
+Cache local SQLite des issues Jira + synchro incrémentale par `updated`.
+
+1er passage (ou --full-resync) : téléchargement complet, mémorisation du high-water mark.
+Passages suivants : seules les issues `updated >= mark` sont téléchargées puis fusionnées.
+Un comptage léger (maxResults=0) vérifie que le cache couvre bien le périmètre du JQL ;
+en cas d'écart (issue sortie du sprint, suppression…) ou de cache trop ancien, on repasse en complet.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import json
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from jira_fetch import SYNC_FIELDS, StoryPointTotals, build_session, issue_to_row, iter_issue_pages, search_page
+
+_ORDER_BY = re.compile(r"\s+ORDER\s+BY\s+.*$", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class SyncStats:
+    mode: str = "full"          # full | incremental
+    fetched: int = 0            # issues téléchargées pendant ce passage
+    from_cache: int = 0         # issues servies par le cache local
+    api_calls: int = 0
+
+    def summary(self) -> str:
+        return (f"Jira sync {self.mode}: {self.fetched} téléchargées, {self.from_cache} depuis le cache "
+                f"({self.api_calls} appels API)")
+
+
+class JiraIssueStore:
+    """Issues par JQL (clé, updated, ligne du rapport) + high-water mark de synchro."""
+
+    def __init__(self, path: str = "jira_issues.sqlite3") -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS issues (
+                jql TEXT NOT NULL,
+                key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                updated TEXT,
+                row TEXT NOT NULL,
+                PRIMARY KEY (jql, key)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                jql TEXT PRIMARY KEY,
+                high_water TEXT,
+                synced_at TEXT NOT NULL
+            );
+        """)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def state(self, jql: str) -> Tuple[Optional[str], Optional[dt.datetime]]:
+        cur = self.conn.execute("SELECT high_water, synced_at FROM sync_state WHERE jql = ?", (jql,))
+        found = cur.fetchone()
+        if not found:
+            return None, None
+        return found[0], dt.datetime.fromisoformat(found[1])
+
+    def count(self, jql: str) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM issues WHERE jql = ?", (jql,)).fetchone()[0]
+
+    def clear(self, jql: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM issues WHERE jql = ?", (jql,))
+
+    def upsert(self, jql: str, entries: Iterable[Tuple[int, str, Optional[str], List]]) -> None:
+        """entries : (position, key, updated, row). Une issue déjà connue garde sa position."""
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO issues (jql, key, position, updated, row) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (jql, key) DO UPDATE SET updated = excluded.updated, row = excluded.row
+            """, [(jql, key, pos, updated, json.dumps(row, ensure_ascii=False)) for pos, key, updated, row in entries])
+
+    def next_position(self, jql: str) -> int:
+        found = self.conn.execute("SELECT MAX(position) FROM issues WHERE jql = ?", (jql,)).fetchone()[0]
+        return (found + 1) if found is not None else 0
+
+    def set_high_water(self, jql: str, mark: Optional[str]) -> None:
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO sync_state (jql, high_water, synced_at) VALUES (?, ?, ?)
+                ON CONFLICT (jql) DO UPDATE SET high_water = excluded.high_water, synced_at = excluded.synced_at
+            """, (jql, mark, dt.datetime.now().isoformat()))
+
+    def rows(self, jql: str) -> List[List]:
+        cur = self.conn.execute("SELECT row FROM issues WHERE jql = ? ORDER BY position", (jql,))
+        return [json.loads(r[0]) for r in cur]
+
+
+def to_jql_datetime(updated: str) -> str:
+    """
+    '2024-05-02T14:07:31.000+0200' → '2024/05/02 14:07'.
+    Jira renvoie `updated` dans le fuseau de l'utilisateur, celui dans lequel le JQL est interprété ;
+    la troncature à la minute rend le filtre `>=` inclusif (recouvrement sans perte, fusion idempotente).
+    """
+    return f"{updated[0:4]}/{updated[5:7]}/{updated[8:10]} {updated[11:16]}"
+
+
+def incremental_jql(jql: str, mark: str) -> str:
+    """Ajoute `updated >= mark` au JQL en conservant un éventuel ORDER BY."""
+    order = _ORDER_BY.search(jql)
+    where = jql[:order.start()] if order else jql
+    suffix = order.group(0) if order else ""
+    return f'({where}) AND updated >= "{to_jql_datetime(mark)}"{suffix}'
+
+
+def _pull(session: requests.Session, server: str, jql: str, store: JiraIssueStore, store_jql: str,
+          page_size: int, max_workers: int, stats: SyncStats) -> Optional[str]:
+    """Télécharge `jql` page par page et fusionne dans le store. Retourne le max(updated) vu."""
+    base = store.next_position(store_jql)
+    high_water: Optional[str] = None
+    for start_at, issues in iter_issue_pages(session, server, jql, page_size, max_workers, fields=SYNC_FIELDS):
+        stats.api_calls += 1
+        entries = []
+        for i, issue in enumerate(issues):
+            updated = (issue.get("fields") or {}).get("updated")
+            if updated and (high_water is None or updated > high_water):
+                high_water = updated
+            entries.append((base + start_at + i, issue.get("key"), updated, issue_to_row(issue)))
+        store.upsert(store_jql, entries)
+        stats.fetched += len(entries)
+    return high_water
+
+
+def sync_issues(server: str, email: str, api_token: str, jql: str, store: JiraIssueStore,
+                full_resync: bool = False, max_age: dt.timedelta = dt.timedelta(hours=24),
+                page_size: int = 100, max_workers: int = 4) -> Tuple[List[List], float, float, SyncStats]:
+    """Synchronise le cache puis retourne (data, completed_sp, remaining_sp, stats)."""
+    session = build_session(email, api_token, max_workers)
+    stats = SyncStats()
+    try:
+        mark, synced_at = store.state(jql)
+        too_old = synced_at is None or dt.datetime.now() - synced_at > max_age
+        if not (full_resync or mark is None or too_old):
+            stats.mode = "incremental"
+            new_mark = _pull(session, server, incremental_jql(jql, mark), store, jql,
+                             page_size, max_workers, stats)
+            total = int(search_page(session, server, jql, 0, 0).get("total", -1))
+            stats.api_calls += 1
+            if total == store.count(jql):
+                store.set_high_water(jql, max(filter(None, [mark, new_mark])))
+                stats.from_cache = total - stats.fetched
+            else:
+                stats = SyncStats(api_calls=stats.api_calls)  # cache incohérent → complet
+
+        if stats.mode == "full":
+            store.clear(jql)
+            store.set_high_water(jql, _pull(session, server, jql, store, jql, page_size, max_workers, stats))
+    finally:
+        session.close()
+
+    data = store.rows(jql)
+    totals = StoryPointTotals()
+    for row in data:
+        totals.add(row)
+    return data, totals.completed, totals.remaining, stats
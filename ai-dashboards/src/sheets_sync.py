@@ -0,0 +1,150 @@
+"""
+Écriture différentielle d'un tableau dans une feuille Google Sheets.
+
+Au lieu de `clear()` + `append_rows()` (feuille vide quelques secondes, quota proportionnel au volume),
+on lit la feuille en une requête, on compare par clé (1re colonne) et on n'écrit que les lignes
+modifiées / ajoutées / déplacées, regroupées en plages contiguës dans un seul `batch_update`.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+
+@dataclass
+class SheetSyncStats:
+    read_requests: int = 0
+    write_requests: int = 0
+    updated: int = 0
+    added: int = 0
+    removed: int = 0
+    ranges: int = 0
+    cells_written: int = 0
+
+    @property
+    def api_requests(self) -> int:
+        return self.read_requests + self.write_requests
+
+    def summary(self) -> str:
+        return (f"Sheets diff: {self.updated} modifiées, {self.added} ajoutées, {self.removed} supprimées — "
+                f"{self.api_requests} requêtes API ({self.read_requests} lecture, {self.write_requests} écriture), "
+                f"{self.ranges} plages, {self.cells_written} cellules")
+
+
+def _norm(value: Any) -> str:
+    """Forme comparable d'une cellule (valeurs non formatées de l'API ou valeurs Python)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _same(a: List[Any], b: List[Any], width: int) -> bool:
+    a = list(a) + [""] * (width - len(a))
+    b = list(b) + [""] * (width - len(b))
+    return [_norm(x) for x in a] == [_norm(x) for x in b]
+
+
+def _col_letter(n: int) -> str:
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def plan_sheet_updates(current: List[List[Any]], header: List[Any], rows: List[List[Any]],
+                       key_col: int = 0) -> Tuple[Dict[int, List[Any]], SheetSyncStats, int]:
+    """
+    Calcule les écritures minimales pour que la feuille contienne `header` puis `rows` (ordre libre).
+    Retourne ({n° de ligne 1-based: valeurs}, stats, largeur). Les lignes existantes restent en place ;
+    les lignes supprimées libèrent leur emplacement, réutilisé par les ajouts ou par les lignes de fin
+    de tableau qui remontent, puis la fin est effacée.
+    """
+    stats = SheetSyncStats()
+    width = max([len(header)] + [len(r) for r in current] + [len(r) for r in rows])
+    blank = [""] * width
+    writes: Dict[int, List[Any]] = {}
+
+    if not current or not _same(current[0], header, width):
+        writes[1] = list(header)
+
+    # position actuelle (n° de ligne) de chaque clé ; doublons et lignes sans clé sont à effacer
+    position: Dict[str, int] = {}
+    for i, existing in enumerate(current[1:], start=2):
+        key = _norm(existing[key_col]) if len(existing) > key_col else ""
+        if key and key not in position:
+            position[key] = i
+
+    desired = {_norm(r[key_col]) for r in rows}
+    stats.removed = sum(1 for key in position if key not in desired)
+
+    last = len(rows) + 1                    # dernière ligne occupée après synchro
+    kept: Dict[int, List[Any]] = {}         # ligne → valeurs, pour les clés conservées
+    to_place: List[List[Any]] = []
+    for row in rows:
+        key = _norm(row[key_col])
+        pos = position.get(key)
+        if pos is None:
+            stats.added += 1
+            to_place.append(row)
+            continue
+        changed = not _same(current[pos - 1], row, width)
+        if changed:
+            stats.updated += 1
+        if pos > last:
+            to_place.append(row)            # remonte dans un trou libéré
+        else:
+            kept[pos] = row
+            if changed:
+                writes[pos] = row
+
+    free = (r for r in range(2, last + 1) if r not in kept)
+    for row, slot in zip(to_place, free):
+        writes[slot] = row
+
+    for r in range(last + 1, len(current) + 1):
+        if any(_norm(v) for v in current[r - 1]):
+            writes[r] = blank
+
+    return writes, stats, width
+
+
+def coalesce_ranges(writes: Dict[int, List[Any]], width: int) -> List[Dict[str, Any]]:
+    """Regroupe les lignes contiguës en plages A1 pour `batch_update`."""
+    data: List[Dict[str, Any]] = []
+    last_col = _col_letter(width)
+    run: List[int] = []
+    for r in sorted(writes) + [None]:
+        if run and (r is None or r != run[-1] + 1):
+            values = [list(writes[i]) + [""] * (width - len(writes[i])) for i in run]
+            data.append({"range": f"A{run[0]}:{last_col}{run[-1]}", "values": values})
+            run = []
+        if r is not None:
+            run.append(r)
+    return data
+
+
+def sync_worksheet(worksheet, header: List[Any], rows: List[List[Any]], key_col: int = 0) -> SheetSyncStats:
+    """Applique le diff sur une feuille gspread : 1 lecture, extension de grille si besoin et 1 batch_update."""
+    current = worksheet.get_all_values(value_render_option="UNFORMATTED_VALUE")
+    writes, stats, width = plan_sheet_updates(current, header, rows, key_col)
+    stats.read_requests = 1
+    if not writes:
+        return stats
+
+    needed = max(writes)
+    if needed > worksheet.row_count:
+        worksheet.add_rows(needed - worksheet.row_count)
+        stats.write_requests += 1
+    if width > worksheet.col_count:
+        worksheet.add_cols(width - worksheet.col_count)
+        stats.write_requests += 1
+
+    data = coalesce_ranges(writes, width)
+    worksheet.batch_update(data, value_input_option="RAW")
+    stats.write_requests += 1
+    stats.ranges = len(data)
+    stats.cells_written = sum(len(d["values"]) * width for d in data)
+    return stats
@@ -0,0 +1,104 @@
+"""Exécution concurrente des sorties du rapport (Sheets, Miro, Notion, Slack, PDF, email…)."""
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class Sink:
+    """
+    Une sortie. `run` reçoit en arguments positionnels les valeurs retournées par `deps`.
+    Une sortie non configurée (`enabled=False`) n'est pas lancée et transmet None à ses dépendants.
+    `run` doit lever une exception en cas d'échec (cf. check_response) : un échec seulement loggé
+    serait compté `ok` et ses dépendants lancés quand même.
+    """
+    name: str
+    run: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    enabled: bool = True
+
+
+class SinkError(RuntimeError):
+    """Échec d'une sortie (réponse HTTP en erreur, réponse inexploitable…) : la sortie passe en `error`."""
+
+
+def check_response(resp: Any, service: str, ok: Tuple[int, ...] = (200, 201)) -> Any:
+    """Retourne `resp` si son statut est dans `ok`, sinon lève SinkError (statut + début du corps)."""
+    if resp.status_code not in ok:
+        raise SinkError(f"{service} HTTP {resp.status_code}: {str(getattr(resp, 'text', ''))[:200]}")
+    return resp
+
+
+@dataclass
+class SinkResult:
+    name: str
+    status: str                 # ok | error | disabled | skipped
+    latency: float = 0.0
+    value: Any = None
+    error: Optional[str] = None
+
+
+def _timed(sink: Sink, args: List[Any]) -> SinkResult:
+    t0 = time.perf_counter()
+    try:
+        value = sink.run(*args)
+        return SinkResult(sink.name, "ok", time.perf_counter() - t0, value)
+    except Exception as e:
+        return SinkResult(sink.name, "error", time.perf_counter() - t0, error=str(e))
+
+
+def run_sinks(sinks: Sequence[Sink], max_workers: int = 6) -> Dict[str, SinkResult]:
+    """
+    Lance chaque sortie dès que ses dépendances sont terminées (pool de threads borné).
+    Une sortie dont une dépendance a échoué est marquée `skipped`.
+    """
+    by_name = {s.name: s for s in sinks}
+    for s in sinks:
+        unknown = [d for d in s.deps if d not in by_name]
+        if unknown:
+            raise ValueError(f"Sortie '{s.name}' : dépendance inconnue {unknown}")
+
+    results: Dict[str, SinkResult] = {}
+    pending = list(sinks)
+    running: Dict[Future, str] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending or running:
+            for s in list(pending):
+                if not all(d in results for d in s.deps):
+                    continue
+                pending.remove(s)
+                failed = [d for d in s.deps if results[d].status in ("error", "skipped")]
+                if failed:
+                    results[s.name] = SinkResult(s.name, "skipped", error=f"dépendance en échec: {', '.join(failed)}")
+                elif not s.enabled:
+                    results[s.name] = SinkResult(s.name, "disabled")
+                else:
+                    running[pool.submit(_timed, s, [results[d].value for d in s.deps])] = s.name
+
+            if not running:
+                if pending:
+                    # cycle de dépendances : rien ne peut plus démarrer
+                    for s in pending:
+                        results[s.name] = SinkResult(s.name, "skipped", error="dépendance circulaire")
+                    pending.clear()
+                continue
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[running.pop(fut)] = fut.result()
+
+    return {s.name: results[s.name] for s in sinks}
+
+
+def format_summary(results: Dict[str, SinkResult]) -> str:
+    """Tableau texte : sortie, statut, latence, erreur éventuelle."""
+    lines = ["Récapitulatif des sorties :"]
+    for r in results.values():
+        latency = f"{r.latency:6.2f}s" if r.status in ("ok", "error") else "      -"
+        detail = f" — {r.error}" if r.error else ""
+        lines.append(f"  {r.name:<14} {r.status:<8} {latency}{detail}")
+    return "\n".join(lines)
@@ -1,5 +1,6 @@
 import os
 import json
+import argparse
 import datetime as dt
 from typing import List, Tuple, Optional
 
@@ -7,7 +8,6 @@ import numpy as np
 import matplotlib.pyplot as plt
 import requests
 from dotenv import load_dotenv
-from jira import JIRA
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from reportlab.pdfgen import canvas
@@ -19,6 +19,11 @@ from email.mime.base import MIMEBase
 from email import encoders
 import smtplib
 
+from jira_store import JiraIssueStore, sync_issues
+from llm_cache import cached_chat_completion, default_cache
+from sheets_sync import sync_worksheet
+from sinks import Sink, SinkError, check_response, format_summary, run_sinks
+
 # ============== CONFIG / ENV ==============
 load_dotenv()
 
@@ -30,6 +35,10 @@ JIRA_EMAIL = os.getenv("JIRA_EMAIL", "")
 JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN", "")
 JIRA_BOARD_ID = int(os.getenv("JIRA_BOARD_ID", "0"))
 JQL_QUERY = os.getenv("JIRA_JQL", "sprint in openSprints()")
+JIRA_PAGE_SIZE = int(os.getenv("JIRA_PAGE_SIZE", "100"))
+JIRA_MAX_WORKERS = int(os.getenv("JIRA_MAX_WORKERS", "4"))
+JIRA_CACHE_PATH = os.getenv("JIRA_CACHE_PATH", "jira_issues.sqlite3")
+JIRA_CACHE_MAX_AGE_HOURS = float(os.getenv("JIRA_CACHE_MAX_AGE_HOURS", "24"))
 
 GOOGLE_JSON_PATH = os.getenv("GOOGLE_JSON_PATH", "")
 SPREADSHEET_ID = os.getenv("SPREADSHEET_ID", "")
@@ -69,59 +78,29 @@ def get_current_sprint_name(server: str, board_id: int, email: str, api_token: s
         return values[0]["name"] if values else "Aucun sprint actif"
     raise RuntimeError(f"Jira API error {resp.status_code}: {resp.text}")
 
-def get_jira_issues() -> Tuple[List[List], float, float]:
-    """Récupère les issues via JQL + cumule les story points (terminés vs restants)."""
+def get_jira_issues(full_resync: bool = False) -> Tuple[List[List], float, float]:
+    """
+    Récupère les issues via JQL + cumule les story points (terminés vs restants).
+    Synchro incrémentale : seules les issues modifiées depuis le dernier passage sont téléchargées.
+    """
     if not all([JIRA_SERVER, JIRA_EMAIL, JIRA_API_TOKEN]):
         raise RuntimeError("Config Jira incomplète.")
-    jira = JIRA(options={'server': JIRA_SERVER}, basic_auth=(JIRA_EMAIL, JIRA_API_TOKEN))
-    issues = jira.search_issues(JQL_QUERY, maxResults=200)
-
-    data = []
-    completed_sp = 0.0
-    remaining_sp = 0.0
-    done_statuses = {"done", "terminé", "terminée", "résolu", "closed"}
-
-    for issue in issues:
-        fields = issue.fields
-        # Sprint (customfield_10020) → varie selon instances Jira
-        sprint_field = getattr(fields, "customfield_10020", None)
-        if isinstance(sprint_field, list) and sprint_field:
-            sprint_name = getattr(sprint_field[0], "name", str(sprint_field[0]))
-        elif sprint_field is None:
-            sprint_name = "No Sprint"
-        else:
-            sprint_name = str(sprint_field)
-
-        # Story points (customfield_10016) → adapte si besoin
-        story_points = getattr(fields, "customfield_10016", 0) or 0
-        try:
-            story_points = float(story_points)
-        except Exception:
-            story_points = 0.0
-
-        status_name = (fields.status.name or "").strip().lower()
-        if status_name in done_statuses:
-            completed_sp += story_points
-        else:
-            remaining_sp += story_points
-
-        data.append([
-            issue.key,
-            fields.summary,
-            fields.status.name,
-            fields.assignee.displayName if fields.assignee else "Unassigned",
-            sprint_name,
-            fields.priority.name if fields.priority else "",
-            story_points
-        ])
-
+    store = JiraIssueStore(JIRA_CACHE_PATH)
+    try:
+        data, completed_sp, remaining_sp, stats = sync_issues(
+            JIRA_SERVER, JIRA_EMAIL, JIRA_API_TOKEN, JQL_QUERY, store,
+            full_resync=full_resync, max_age=dt.timedelta(hours=JIRA_CACHE_MAX_AGE_HOURS),
+            page_size=JIRA_PAGE_SIZE, max_workers=JIRA_MAX_WORKERS,
+        )
+    finally:
+        store.close()
+    log(stats.summary())
     return data, completed_sp, remaining_sp
 
 # ============== OPENAI INSIGHTS ==============
 def generate_ai_insights(completed: float, remaining: float) -> str:
     if not is_enabled(OPENAI_API_KEY):
         return "OpenAI non configuré : impossible de générer des insights."
-    client = OpenAI(api_key=OPENAI_API_KEY)
     prompt = f"""
 Tu es un coach agile. Données Sprint :
 - Story Points complétés : {completed}
@@ -133,12 +112,14 @@ Tu es un coach agile. Données Sprint :
 Réponse concise, en français.
 """
     try:
-        resp = client.chat.completions.create(
+        # même prompt (données sprint inchangées) → réponse servie par le cache, 0 token
+        content = cached_chat_completion(
+            lambda: OpenAI(api_key=OPENAI_API_KEY),
             model=OPENAI_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
         )
-        return resp.choices[0].message.content.strip()
+        return content.strip()
     except Exception as e:
         return f"[Erreur OpenAI] {e}"
 
@@ -163,6 +144,8 @@ def generate_velocity_chart(completed: float, remaining: float, out_path: str =
     return out_path
 
 # ============== GOOGLE SHEETS ==============
+JIRA_SHEET_HEADER = ['Key', 'Summary', 'Status', 'Assignee', 'Sprint', 'Priority', 'Story Points']
+
 def write_to_google_sheets(jira_data: List[List], completed: float, remaining: float, current_sprint: str):
     if not (is_enabled(GOOGLE_JSON_PATH) and is_enabled(SPREADSHEET_ID)):
         log("Google Sheets non configuré — skip.")
@@ -175,10 +158,8 @@ def write_to_google_sheets(jira_data: List[List], completed: float, remaining: f
     # Sheet Jira
     sh = client.open_by_key(SPREADSHEET_ID)
     sheet_data = sh.worksheet(GSH_JIRA_SHEET)
-    sheet_data.clear()
-    sheet_data.append_row(['Key', 'Summary', 'Status', 'Assignee', 'Sprint', 'Priority', 'Story Points'])
-    if jira_data:
-        sheet_data.append_rows(jira_data, value_input_option="RAW")
+    stats = sync_worksheet(sheet_data, JIRA_SHEET_HEADER, jira_data)
+    log(stats.summary())
 
     # Sheet Predictions
     sheet_pred = sh.worksheet(GSH_PRED_SHEET)
@@ -202,16 +183,13 @@ def write_to_google_sheets(jira_data: List[List], completed: float, remaining: f
 def upload_image_to_imgbb(image_path: str) -> Optional[str]:
     if not (is_enabled(IMGBB_API_KEY) and os.path.exists(image_path)):
         return None
-    try:
-        url = f"https://api.imgbb.com/1/upload?key={IMGBB_API_KEY}"
-        with open(image_path, "rb") as f:
-            resp = requests.post(url, files={"image": f}, timeout=30)
-        if resp.status_code == 200:
-            return resp.json().get("data", {}).get("url")
-        log(f"ImgBB error {resp.status_code}: {resp.text}")
-    except Exception as e:
-        log(f"ImgBB exception: {e}")
-    return None
+    url = f"https://api.imgbb.com/1/upload?key={IMGBB_API_KEY}"
+    with open(image_path, "rb") as f:
+        resp = check_response(requests.post(url, files={"image": f}, timeout=30), "ImgBB", ok=(200,))
+    image_url = resp.json().get("data", {}).get("url")
+    if not image_url:
+        raise SinkError(f"ImgBB: réponse sans URL d'image ({resp.text[:200]})")
+    return image_url
 
 def post_to_notion(insights: str, image_url: Optional[str]):
     if not (is_enabled(NOTION_API_KEY) and is_enabled(NOTION_DATABASE_ID)):
@@ -229,77 +207,54 @@ def post_to_notion(insights: str, image_url: Optional[str]):
     if image_url:
         props["Image URL"] = {"url": image_url}
     payload = {"parent": {"database_id": NOTION_DATABASE_ID}, "properties": props}
-    try:
-        resp = requests.post("https://api.notion.com/v1/pages", headers=headers, json=payload, timeout=30)
-        if resp.status_code not in (200, 201):
-            log(f"Notion error {resp.status_code}: {resp.text}")
-    except Exception as e:
-        log(f"Notion exception: {e}")
+    resp = requests.post("https://api.notion.com/v1/pages", headers=headers, json=payload, timeout=30)
+    check_response(resp, "Notion")
 
-def post_to_miro(chart_path: str, insights: str):
+def create_miro_frame() -> Optional[str]:
+    """Crée le frame Miro du rapport et retourne son id (SinkError si échec)."""
     if not (is_enabled(MIRO_API_KEY) and is_enabled(MIRO_BOARD_ID)):
         log("Miro non configuré — skip.")
-        return
+        return None
     headers = {"Authorization": f"Bearer {MIRO_API_KEY}", "Content-Type": "application/json"}
-
-    # Frame
     frame_payload = {"data": {"title": "📊 Prédictions IA & Vélocité Sprint"},
                      "position": {"x": 0, "y": 0},
                      "geometry": {"width": 1200, "height": 800}}
-    try:
-        fr = requests.post(f"https://api.miro.com/v2/boards/{MIRO_BOARD_ID}/frames",
-                           headers=headers, json=frame_payload, timeout=30)
-        if fr.status_code not in (200, 201):
-            log(f"Miro frame error {fr.status_code}: {fr.text}")
-            return
-        frame_id = fr.json().get("id")
-    except Exception as e:
-        log(f"Miro frame exception: {e}")
+    fr = requests.post(f"https://api.miro.com/v2/boards/{MIRO_BOARD_ID}/frames",
+                       headers=headers, json=frame_payload, timeout=30)
+    frame_id = check_response(fr, "Miro frame").json().get("id")
+    if not frame_id:
+        raise SinkError("Miro frame: réponse sans id")
+    return frame_id
+
+def post_to_miro(frame_id: Optional[str], image_url: Optional[str], insights: str):
+    """Image (URL ImgBB) + texte des insights dans le frame Miro."""
+    if not frame_id:
         return
-
-    # Image → URL
-    image_url = upload_image_to_imgbb(chart_path)
     if not image_url:
-        log("Pas d'URL image — skip Miro image & Notion post.")
+        log("Pas d'URL image — skip Miro image.")
         return
+    headers = {"Authorization": f"Bearer {MIRO_API_KEY}", "Content-Type": "application/json"}
 
     # Image in Miro
     img_payload = {"data": {"url": image_url}, "parent": {"id": frame_id}, "position": {"x": 0, "y": 0}}
-    try:
-        ir = requests.post(f"https://api.miro.com/v2/boards/{MIRO_BOARD_ID}/images",
-                           headers=headers, json=img_payload, timeout=30)
-        if ir.status_code not in (200, 201):
-            log(f"Miro image error {ir.status_code}: {ir.text}")
-            return
-    except Exception as e:
-        log(f"Miro image exception: {e}")
-        return
+    ir = requests.post(f"https://api.miro.com/v2/boards/{MIRO_BOARD_ID}/images",
+                       headers=headers, json=img_payload, timeout=30)
+    check_response(ir, "Miro image")
 
     # Text
     text_payload = {"data": {"content": insights}, "parent": {"id": frame_id},
                     "position": {"x": 0, "y": 300}, "style": {"fontSize": 18}}
-    try:
-        tr = requests.post(f"https://api.miro.com/v2/boards/{MIRO_BOARD_ID}/texts",
-                           headers=headers, json=text_payload, timeout=30)
-        if tr.status_code not in (200, 201):
-            log(f"Miro text error {tr.status_code}: {tr.text}")
-    except Exception as e:
-        log(f"Miro text exception: {e}")
-
-    # Notion (optionnel)
-    post_to_notion(insights, image_url)
+    tr = requests.post(f"https://api.miro.com/v2/boards/{MIRO_BOARD_ID}/texts",
+                       headers=headers, json=text_payload, timeout=30)
+    check_response(tr, "Miro text")
 
 # ============== SLACK ==============
 def send_slack_alert(insights: str):
     if not is_enabled(SLACK_WEBHOOK_URL):
         log("Slack non configuré — skip.")
         return
-    try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json={"text": f"🚀 Prédictions IA Sprint\n{insights}"}, timeout=15)
-        if resp.status_code >= 300:
-            log(f"Slack error {resp.status_code}: {resp.text}")
-    except Exception as e:
-        log(f"Slack exception: {e}")
+    resp = requests.post(SLACK_WEBHOOK_URL, json={"text": f"🚀 Prédictions IA Sprint\n{insights}"}, timeout=15)
+    check_response(resp, "Slack", ok=tuple(range(200, 300)))
 
 # ============== PDF + EMAIL ==============
 def generate_pdf_report(insights: str, chart_file: str) -> str:
@@ -340,20 +295,24 @@ def send_email_with_attachments(pdf_file: str, chart_file: str):
                 encoders.encode_base64(part)
                 part.add_header("Content-Disposition", f"attachment; filename={os.path.basename(file)}")
                 msg.attach(part)
-    try:
-        server = smtplib.SMTP("smtp.gmail.com", 587, timeout=30)
+    # erreurs SMTP propagées : la sortie `email` passe en `error` dans le récapitulatif
+    with smtplib.SMTP("smtp.gmail.com", 587, timeout=30) as server:
         server.starttls()
         server.login(EMAIL_SENDER, EMAIL_PASSWORD)
         server.sendmail(EMAIL_SENDER, EMAIL_RECEIVER, msg.as_string())
-        server.quit()
-        log("Email envoyé ✅")
-    except Exception as e:
-        log(f"Email exception: {e}")
+    log("Email envoyé ✅")
 
 # ============== MAIN ==============
+def parse_args():
+    p = argparse.ArgumentParser(description="Rapport de sprint Jira + prédictions IA")
+    p.add_argument("--full-resync", action="store_true",
+                   help="Ignore le cache local et retélécharge toutes les issues Jira")
+    return p.parse_args()
+
 def main():
+    args = parse_args()
     log("Récupération issues Jira…")
-    jira_data, completed, remaining = get_jira_issues()
+    jira_data, completed, remaining = get_jira_issues(full_resync=args.full_resync)
     log(f"SP complétés: {completed} | restants: {remaining}")
 
     log("Sprint actif…")
@@ -369,24 +328,31 @@ def main():
     log("Insights OpenAI…")
     insights = generate_ai_insights(completed, remaining)
 
-    log("Google Sheets…")
-    try:
-        write_to_google_sheets(jira_data, completed, remaining, current_sprint)
-    except Exception as e:
-        log(f"Google Sheets error: {e}")
-
-    log("Miro + Notion (si configurés)…")
-    try:
-        post_to_miro(chart_path, insights)
-    except Exception as e:
-        log(f"Miro/Notion error: {e}")
-
-    log("Slack (si configuré)…")
-    send_slack_alert(insights)
-
-    log("PDF + Email (si configuré)…")
-    pdf_file = generate_pdf_report(insights, chart_path)
-    send_email_with_attachments(pdf_file, chart_path)
+    # Sorties indépendantes en parallèle ; seules les vraies dépendances sont chaînées
+    # (image Miro/Notion ← URL ImgBB, email ← PDF).
+    miro_on = is_enabled(MIRO_API_KEY) and is_enabled(MIRO_BOARD_ID)
+    notion_on = is_enabled(NOTION_API_KEY) and is_enabled(NOTION_DATABASE_ID)
+    log("Publication (Sheets, Miro, Notion, Slack, PDF, email)…")
+    results = run_sinks([
+        Sink("google_sheets", lambda: write_to_google_sheets(jira_data, completed, remaining, current_sprint),
+             enabled=is_enabled(GOOGLE_JSON_PATH) and is_enabled(SPREADSHEET_ID)),
+        Sink("imgbb", lambda: upload_image_to_imgbb(chart_path),
+             enabled=is_enabled(IMGBB_API_KEY) and (miro_on or notion_on)),
+        Sink("miro_frame", create_miro_frame, enabled=miro_on),
+        Sink("miro", lambda frame_id, image_url: post_to_miro(frame_id, image_url, insights),
+             deps=("miro_frame", "imgbb"), enabled=miro_on),
+        Sink("notion", lambda image_url: post_to_notion(insights, image_url),
+             deps=("imgbb",), enabled=notion_on),
+        Sink("slack", lambda: send_slack_alert(insights), enabled=is_enabled(SLACK_WEBHOOK_URL)),
+        Sink("pdf", lambda: generate_pdf_report(insights, chart_path)),
+        Sink("email", lambda pdf_file: send_email_with_attachments(pdf_file, chart_path),
+             deps=("pdf",), enabled=all([EMAIL_SENDER, EMAIL_PASSWORD, EMAIL_RECEIVER])),
+    ])
+    log(format_summary(results))
+
+    cache = default_cache()
+    if cache is not None:
+        log(f"Cache LLM: {cache.stats.as_dict()}")
 
     log("Terminé ✅")
 
@@ -0,0 +1,128 @@
+import re
+
+import pytest
+
+from src.sheets_sync import sync_worksheet
+
+HEADER = ["Key", "Summary", "Status", "Assignee", "Sprint", "Priority", "Story Points"]
+
+
+class FakeWorksheet:
+    """Feuille gspread en mémoire : grille bornée, compteur d'appels API."""
+
+    def __init__(self, values=None, rows=1000, cols=26):
+        self.row_count = rows
+        self.col_count = cols
+        self.grid = [list(r) for r in (values or [])]
+        self.calls = []
+
+    def get_all_values(self, **kwargs):
+        self.calls.append("get_all_values")
+        rows = [list(r) for r in self.grid]
+        while rows and not any(v != "" for v in rows[-1]):
+            rows.pop()
+        return rows
+
+    def add_rows(self, n):
+        self.calls.append("add_rows")
+        self.row_count += n
+
+    def add_cols(self, n):
+        self.calls.append("add_cols")
+        self.col_count += n
+
+    def batch_update(self, data, value_input_option=None):
+        self.calls.append("batch_update")
+        for item in data:
+            c1, r1, c2, r2 = re.match(r"([A-Z]+)(\d+):([A-Z]+)(\d+)", item["range"]).groups()
+            r1, r2 = int(r1), int(r2)
+            if r2 > self.row_count:
+                raise ValueError("exceeds grid limits")
+            assert len(item["values"]) == r2 - r1 + 1
+            for offset, values in enumerate(item["values"]):
+                r = r1 + offset
+                while len(self.grid) < r:
+                    self.grid.append([])
+                self.grid[r - 1] = list(values)
+
+    def records(self):
+        """Contenu utile de la feuille (hors en-tête, lignes vides ignorées), indexé par clé."""
+        return {r[0]: r for r in self.get_all_values()[1:] if r and r[0] != ""}
+
+
+def row(key, status="To Do", sp=3.0):
+    return [key, f"Résumé {key}", status, "Dev", "Sprint 1", "High", sp]
+
+
+def test_first_sync_writes_header_and_rows_in_one_batch():
+    ws = FakeWorksheet()
+    stats = sync_worksheet(ws, HEADER, [row("A-1"), row("A-2")])
+
+    assert ws.calls == ["get_all_values", "batch_update"]
+    assert ws.get_all_values()[0] == HEADER
+    assert set(ws.records()) == {"A-1", "A-2"}
+    assert (stats.added, stats.updated, stats.removed) == (2, 0, 0)
+    assert stats.api_requests == 2
+    assert stats.ranges == 1
+
+
+def test_unchanged_data_costs_a_single_read():
+    ws = FakeWorksheet([HEADER, ["A-1", "Résumé A-1", "To Do", "Dev", "Sprint 1", "High", 3]])
+    stats = sync_worksheet(ws, HEADER, [row("A-1")])
+
+    assert ws.calls == ["get_all_values"]
+    assert stats.api_requests == 1
+    assert stats.cells_written == 0
+
+
+def test_only_changed_rows_are_written():
+    rows = [row(f"A-{i}") for i in range(1, 11)]
+    ws = FakeWorksheet([HEADER] + rows)
+    new_rows = [list(r) for r in rows]
+    new_rows[4][2] = "Done"
+
+    stats = sync_worksheet(ws, HEADER, new_rows)
+
+    assert stats.updated == 1
+    assert stats.ranges == 1
+    assert stats.cells_written == len(HEADER)
+    assert ws.records()["A-5"][2] == "Done"
+
+
+def test_removed_rows_are_filled_and_tail_cleared():
+    ws = FakeWorksheet([HEADER] + [row(f"A-{i}") for i in range(1, 6)])
+    desired = [row("A-1"), row("A-3"), row("A-5"), row("B-1")]
+
+    stats = sync_worksheet(ws, HEADER, desired)
+
+    assert (stats.added, stats.removed) == (1, 2)
+    assert ws.calls == ["get_all_values", "batch_update"]
+    assert set(ws.records()) == {"A-1", "A-3", "A-5", "B-1"}
+    # tableau contigu : aucune ligne vide au milieu
+    assert len(ws.get_all_values()) == len(desired) + 1
+
+
+def test_grid_is_extended_before_writing():
+    ws = FakeWorksheet(rows=3)
+    stats = sync_worksheet(ws, HEADER, [row(f"A-{i}") for i in range(1, 6)])
+
+    assert ws.calls == ["get_all_values", "add_rows", "batch_update"]
+    assert stats.write_requests == 2
+    assert len(ws.records()) == 5
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_changes_converge(seed):
+    import random
+
+    rnd = random.Random(seed)
+    ws = FakeWorksheet([HEADER] + [row(f"A-{i}") for i in range(50)])
+    desired = [row(f"A-{i}", sp=float(rnd.randint(0, 3))) for i in range(50) if rnd.random() > 0.3]
+    desired += [row(f"B-{i}") for i in range(rnd.randint(0, 20))]
+    rnd.shuffle(desired)
+
+    sync_worksheet(ws, HEADER, desired)
+    second = sync_worksheet(ws, HEADER, desired)
+
+    assert ws.records() == {r[0]: r for r in desired}
+    assert second.api_requests == 1
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.sinks import Sink, SinkError, check_response, run_sinks
+
+
+def test_check_response_raises_on_http_error():
+    ok = SimpleNamespace(status_code=201, text="")
+    assert check_response(ok, "Notion") is ok
+    with pytest.raises(SinkError, match="ImgBB HTTP 400"):
+        check_response(SimpleNamespace(status_code=400, text="bad key"), "ImgBB", ok=(200,))
+
+
+def test_failed_upload_skips_its_dependents():
+    def upload():
+        check_response(SimpleNamespace(status_code=500, text="boom"), "ImgBB")
+
+    posted = []
+    results = run_sinks([
+        Sink("imgbb", upload),
+        Sink("notion", lambda url: posted.append(url), deps=("imgbb",)),
+        Sink("slack", lambda: "sent"),
+    ])
+    assert results["imgbb"].status == "error" and "HTTP 500" in results["imgbb"].error
+    assert results["notion"].status == "skipped" and posted == []
+    assert results["slack"].status == "ok"
@@ -0,0 +1,48 @@
+"""
+Pilote l'app Streamlit jobcrewai sans navigateur (streamlit.testing AppTest) : saisie des champs, clic, génération.
+
+    python drive_jobcrewai.py --url http://127.0.0.1:8000/offre.html   # depuis le dossier jobcrewai
+
+Code retour 1 si l'app lève une exception ou si un fichier attendu n'est pas généré.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from streamlit.testing.v1 import AppTest
+
+OUTPUT_FILES = ("exigences_offre.md", "profil_candidat.md", "cv_cible.md", "materiels_entretien.md")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Exécute jobcrewai_streamlit.py via AppTest.")
+    parser.add_argument("--url", required=True, help="URL de l'offre d'emploi (page servie localement)")
+    parser.add_argument("--github", default="https://github.com/lorifin")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    for f in OUTPUT_FILES:
+        if os.path.exists(f):
+            os.remove(f)
+
+    at = AppTest.from_file("jobcrewai_streamlit.py", default_timeout=args.timeout).run()
+    at.sidebar.text_input[0].input(os.environ.get("OPENAI_API_KEY", "sk-bench"))
+    at.main.text_input[0].input(args.url)
+    at.main.text_input[1].input(args.github)
+    at.button[0].click().run()
+
+    if at.exception:
+        print(f"❌ Exception dans l'app : {at.exception[0].value}")
+        return 1
+    missing = [f for f in OUTPUT_FILES if not os.path.exists(f)]
+    if missing:
+        print(f"❌ Fichiers non générés : {', '.join(missing)}")
+        return 1
+    print("✅ 4 fichiers générés")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Faux serveur OpenAI local (/v1/chat/completions, /v1/embeddings) qui rejoue des réponses enregistrées.
+
+Fixtures JSONL, une entrée par ligne :
+- enregistrée : {"key": <sha256 de la requête>, "response": <corps JSON OpenAI>} — écrite en mode record ;
+- règle écrite à la main : {"match": "<sous-chaîne des messages>", "content": "<réponse>", "max_uses": 1}.
+
+Ordre de résolution d'un chat : clé exacte → règle correspondante → réponse enregistrée suivante
+(prompts non déterministes : dates, ids) → réponse générique. En mode `strict`, l'absence
+de réponse enregistrée ou de règle renvoie une 500 au lieu de la réponse générique.
+
+Mode record : la requête est relayée à l'API réelle (`upstream`, clé OPENAI_API_KEY du processus
+qui lance le serveur) et la réponse ajoutée au fichier de fixtures.
+
+Les pages de `pages` sont servies en GET (ex. offre d'emploi lue par ScrapeWebsiteTool).
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+EMBEDDING_DIM = 1536
+REACT_FINAL = "Thought: I now can give a great answer\nFinal Answer: "
+DEFAULT_CONTENT = (
+    "## Synthèse (réponse de benchmark)\n\n"
+    "- Avancement conforme au plan, deux points de vigilance identifiés.\n"
+    "- Risque principal : dépendance externe non confirmée.\n"
+    "- Actions : clarifier le périmètre, sécuriser la capacité, suivre les retards chaque semaine.\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _messages_text(body: Dict[str, Any]) -> str:
+    parts = []
+    for m in body.get("messages") or []:
+        content = m.get("content")
+        if isinstance(content, list):  # contenu multi-parties
+            content = " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+        parts.append(content or "")
+    return "\n".join(parts)
+
+
+def request_key(body: Dict[str, Any]) -> str:
+    """Empreinte d'une requête chat : modèle, messages, outils et format de réponse."""
+    payload = {k: body.get(k) for k in ("model", "messages", "tools", "functions", "response_format")}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> List[float]:
+    """Vecteur déterministe et normalisé dérivé du texte."""
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    raw = [(seed[i % len(seed)] ^ (i * 31 % 256)) / 255.0 - 0.5 for i in range(dim)]
+    norm = sum(v * v for v in raw) ** 0.5 or 1.0
+    return [v / norm for v in raw]
+
+
+class FakeOpenAI:
+    """
+    Sert chat completions et embeddings ; compte requêtes et tokens (usage enregistré, sinon estimé).
+    `mode` = "replay" ou "record" ; `latency` simule le temps de génération par requête.
+    """
+
+    def __init__(self, fixtures: Optional[str] = None, mode: str = "replay", strict: bool = False,
+                 latency: float = 0.0, upstream: str = "https://api.openai.com/v1",
+                 pages: Optional[Dict[str, str]] = None) -> None:
+        self.fixtures = fixtures
+        self.mode = mode
+        self.strict = strict
+        self.latency = latency
+        self.upstream = upstream.rstrip("/")
+        self.pages = pages or {}
+        self.requests = 0
+        self.by_route: Dict[str, int] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.replayed = 0      # réponses enregistrées ou règles
+        self.generic = 0       # aucune fixture : réponse générique
+        self.recorded = 0
+        self._recorded: Dict[str, Dict[str, Any]] = {}
+        self._sequence: List[Dict[str, Any]] = []
+        self._rules: List[Dict[str, Any]] = []
+        self._used: set = set()
+        self._lock = threading.Lock()
+        self._load()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOpenAI":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "by_route": dict(self.by_route),
+                    "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens,
+                    "replayed": self.replayed, "generic": self.generic, "recorded": self.recorded}
+
+    # ---------- Fixtures ----------
+    def _load(self) -> None:
+        if not self.fixtures or not os.path.exists(self.fixtures):
+            return
+        with open(self.fixtures, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "key" in entry:
+                    self._recorded[entry["key"]] = entry["response"]
+                    self._sequence.append(entry)
+                else:
+                    self._rules.append({**entry, "uses": 0})
+
+    def _record(self, key: str, response: Dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.fixtures) or ".", exist_ok=True)
+        with open(self.fixtures, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "response": response}, ensure_ascii=False) + "\n")
+        self.recorded += 1
+
+    def _replay(self, key: str, text: str) -> Optional[Any]:
+        """Réponse enregistrée (dict) ou contenu de règle (str) ; None si rien ne correspond."""
+        if key in self._recorded:
+            self._used.add(key)
+            return self._recorded[key]
+        for rule in self._rules:
+            if rule["match"] in text and rule["uses"] < rule.get("max_uses", float("inf")):
+                rule["uses"] += 1
+                return rule["content"]
+        for entry in self._sequence:
+            if entry["key"] not in self._used:
+                self._used.add(entry["key"])
+                return entry["response"]
+        return None
+
+    # ---------- Réponses ----------
+    def _completion(self, body: Dict[str, Any], content: str, text: str) -> Dict[str, Any]:
+        if "Final Answer" in text and "Final Answer:" not in content and "Action:" not in content:
+            content = REACT_FINAL + content  # format attendu par le parseur ReAct de CrewAI
+        prompt, completion = estimate_tokens(text), estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-bench-{self.requests}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"), "system_fingerprint": None,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "logprobs": None, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion},
+        }
+
+    def _upstream(self, route: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        req = urllib.request.Request(
+            f"{self.upstream}{route}", data=json.dumps({**body, "stream": False}).encode("utf-8"),
+            headers={"Content-Type": "application/json",
+                     "Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY', '')}"})
+        with urllib.request.urlopen(req, timeout=300) as resp:
+            return json.loads(resp.read())
+
+    def chat(self, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key, text = request_key(body), _messages_text(body)
+        with self._lock:
+            found = self._replay(key, text) if self.mode == "replay" else None
+        if self.mode == "record":
+            response = self._upstream("/chat/completions", body)
+            with self._lock:
+                self._record(key, response)
+        elif found is None:
+            if self.strict:
+                return None
+            with self._lock:
+                self.generic += 1
+            response = self._completion(body, DEFAULT_CONTENT, text)
+        else:
+            with self._lock:
+                self.replayed += 1
+            response = found if isinstance(found, dict) else self._completion(body, found, text)
+        usage = response.get("usage") or {}
+        with self._lock:
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+        return response
+
+    def embeddings(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        inputs = body.get("input")
+        if isinstance(inputs, str) or (isinstance(inputs, list) and inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        data, tokens = [], 0
+        for i, item in enumerate(inputs or []):
+            text = item if isinstance(item, str) else " ".join(map(str, item))
+            tokens += estimate_tokens(text)
+            vector = fake_embedding(text, int(body.get("dimensions") or EMBEDDING_DIM))
+            if body.get("encoding_format") == "base64":  # défaut du SDK openai ≥ 1.x
+                vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        with self._lock:
+            self.prompt_tokens += tokens
+        return {"object": "list", "data": data, "model": body.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _count(self, route: str) -> None:
+                with fake._lock:
+                    fake.requests += 1
+                    fake.by_route[route] = fake.by_route.get(route, 0) + 1
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, response: Dict[str, Any], include_usage: bool) -> None:
+                """Réponse complète découpée en un seul chunk SSE (clients en mode stream)."""
+                choice = response["choices"][0]
+                base = {k: response[k] for k in ("id", "created", "model")}
+                chunks = [
+                    {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": choice["message"], "finish_reason": None}]},
+                    {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": choice.get("finish_reason", "stop")}]},
+                ]
+                if include_usage:
+                    chunks.append({**base, "object": "chat.completion.chunk", "choices": [],
+                                   "usage": response.get("usage")})
+                payload = "".join(f"data: {json.dumps(c, ensure_ascii=False)}\n\n" for c in chunks)
+                self._send(200, (payload + "data: [DONE]\n\n").encode("utf-8"), "text/event-stream")
+
+            def do_GET(self):  # noqa: N802
+                path = urlparse(self.path).path
+                self._count(path)
+                if path in fake.pages:
+                    self._send(200, fake.pages[path].encode("utf-8"), "text/html; charset=utf-8")
+                else:
+                    self._send(404, b'{"error": {"message": "not found"}}')
+
+            def do_POST(self):  # noqa: N802
+                path = urlparse(self.path).path
+                route = path[path.index("/v1") + 3:] if "/v1" in path else path
+                self._count(route)
+                time.sleep(fake.latency)
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                if route == "/embeddings":
+                    self._send(200, json.dumps(fake.embeddings(body)).encode("utf-8"))
+                    return
+                if route != "/chat/completions":
+                    self._send(404, b'{"error": {"message": "route non simulee"}}')
+                    return
+                response = fake.chat(body)
+                if response is None:
+                    self._send(500, b'{"error": {"message": "aucune fixture pour cette requete (strict)"}}')
+                elif body.get("stream"):
+                    self._stream(response, bool((body.get("stream_options") or {}).get("include_usage")))
+                else:
+                    self._send(200, json.dumps(response, ensure_ascii=False).encode("utf-8"))
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,255 @@
+"""
+Benchmarks hors-ligne de bout en bout : chaque pipeline tourne contre des stand-ins locaux
+(Jira, Trello, OpenAI) dans une copie temporaire de son projet, sans aucun accès réseau.
+
+    python benchmarks/run_benchmarks.py                                  # les 5 pipelines
+    python benchmarks/run_benchmarks.py --only progress_report --trello-cards 400
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json   # code retour 1 si régression
+    python benchmarks/run_benchmarks.py --mode record --only planification_projet   # enregistre les réponses LLM réelles
+
+Mesures par pipeline : temps mural, pic de RSS du sous-processus (os.wait4), requêtes servies
+par chaque stand-in, tokens prompt / complétion vus par le faux OpenAI.
+Les projets épinglent des versions de crewai différentes : `--python progress_report=.venv-ma/bin/python`
+choisit l'interpréteur d'un pipeline. Sortie JSON : benchmarks/results/latest.json.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FIXTURES = os.path.join(HERE, "fixtures")
+
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(ROOT, "ai-dashboards", "benchmarks"))
+sys.path.insert(0, os.path.join(ROOT, "crewai-outbound", "multiagents", "benchmarks"))
+
+from fake_jira import FakeJira, make_issues  # noqa: E402
+from fake_openai import FakeOpenAI  # noqa: E402
+from fake_trello import BOARD_ID, FakeTrello, make_board  # noqa: E402
+
+# Variables du shell appelant jamais transmises : un pipeline ne doit joindre que les stand-ins
+SCRUBBED_PREFIXES = ("OPENAI_", "JIRA_", "TRELLO_", "DLAI_", "SLACK_", "SERPER_", "NOTION_", "MIRO_", "IMGBB_",
+                     "EMAIL_", "GOOGLE_", "SPREADSHEET_", "GSH_", "LLM_CACHE_", "TRACE_FILE", "COSTS_")
+COPY_IGNORE = shutil.ignore_patterns(".env", "outputs", "__pycache__", "*.sqlite3", "cache", "*.pdf", "*.png")
+
+
+@dataclass
+class Pipeline:
+    name: str
+    project: str                    # dossier du projet, relatif à la racine du dépôt
+    command: List[str]              # lancé depuis la copie du projet ; {openai} {jira} {trello} {fixtures} remplacés
+    env: Dict[str, str] = field(default_factory=dict)
+    jira: bool = False
+    trello: bool = False
+    mkdirs: List[str] = field(default_factory=list)
+
+
+PIPELINES: Dict[str, Pipeline] = {p.name: p for p in [
+    Pipeline("sprint_ai_report", "ai-dashboards", ["src/sprint_ai_report.py", "--full-resync"],
+             env={"JIRA_SERVER": "{jira}", "JIRA_EMAIL": "bench@example.com", "JIRA_API_TOKEN": "bench",
+                  "JIRA_JQL": "project = BENCH", "JIRA_BOARD_ID": "0", "OPENAI_MODEL": "gpt-4o-mini"},
+             jira=True),
+    Pipeline("progress_report", "crewai-outbound/multiagents", ["progress_report.py", "--board-id", BOARD_ID],
+             env={"TRELLO_API_KEY": "bench", "TRELLO_API_TOKEN": "bench", "DLAI_TRELLO_BASE_URL": "{trello}",
+                  "TRELLO_HTTP_CACHE_DISABLED": "1"},
+             trello=True),
+    Pipeline("outbound_commercial", "crewai-outbound/outbound_commercial",
+             ["src/main.py", "--leads-file", "{fixtures}/leads.csv", "--concurrency", "2"]),
+    Pipeline("planification_projet", "crewai-outbound/planification_projet", ["-m", "src.pipeline"],
+             mkdirs=["outputs/tables"]),
+    Pipeline("jobcrewai", "crewai-outbound/jobcrewai",
+             [os.path.join(HERE, "drive_jobcrewai.py"), "--url", "{openai}/offre.html"]),
+]}
+
+
+@dataclass
+class BenchResult:
+    pipeline: str
+    ok: bool
+    returncode: int
+    wall_sec: float
+    peak_rss_mb: float
+    requests: Dict[str, int]
+    prompt_tokens: int
+    completion_tokens: int
+    llm_replayed: int
+    llm_generic: int
+    log: str
+
+
+def _peak_rss_mb(rusage) -> float:
+    # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return round(rusage.ru_maxrss * scale / (1024 * 1024), 1)
+
+
+def _child_env(extra: Dict[str, str]) -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if not k.startswith(SCRUBBED_PREFIXES)}
+    env.update({
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_MODEL_NAME": "gpt-4o-mini",
+        "CREWAI_TELEMETRY": "false",
+        "OTEL_SDK_DISABLED": "true",
+        "LLM_CACHE_DISABLED": "1",   # chaque run paie ses appels LLM : on mesure le pipeline, pas le cache
+        "MPLBACKEND": "Agg",
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.update(extra)
+    return env
+
+
+def run_pipeline(p: Pipeline, args: argparse.Namespace, results_dir: str) -> BenchResult:
+    workdir = tempfile.mkdtemp(prefix=f"bench-{p.name}-")
+    project = os.path.join(workdir, os.path.basename(p.project))
+    shutil.copytree(os.path.join(ROOT, p.project), project, ignore=COPY_IGNORE)
+    for d in p.mkdirs:
+        os.makedirs(os.path.join(project, d), exist_ok=True)
+
+    with open(os.path.join(FIXTURES, "offre.html"), encoding="utf-8") as f:
+        pages = {"/offre.html": f.read()}
+    log_path = os.path.join(results_dir, f"{p.name}.log")
+
+    with ExitStack() as stack:
+        llm = stack.enter_context(FakeOpenAI(os.path.join(FIXTURES, f"{p.name}.jsonl"), mode=args.mode,
+                                             strict=args.strict, latency=args.llm_latency, pages=pages))
+        urls = {"openai": llm.url, "fixtures": FIXTURES}
+        jira = trello = None
+        if p.jira:
+            jira = stack.enter_context(FakeJira(make_issues(args.jira_issues), latency=args.http_latency))
+            urls["jira"] = jira.url
+        if p.trello:
+            trello = stack.enter_context(FakeTrello(make_board(args.trello_cards), latency=args.http_latency))
+            urls["trello"] = trello.url
+
+        env = _child_env({k: v.format(**urls) for k, v in p.env.items()})
+        env["OPENAI_BASE_URL"] = env["OPENAI_API_BASE"] = f"{llm.url}/v1"  # SDK openai / langchain, litellm
+        python = args.python.get(p.name, sys.executable)
+        command = [python] + [c.format(**urls) for c in p.command]
+
+        print(f"▶️  {p.name} …", flush=True)
+        with open(log_path, "w", encoding="utf-8") as log:
+            t0 = time.perf_counter()
+            proc = subprocess.Popen(command, cwd=project, env=env, stdout=log, stderr=subprocess.STDOUT)
+            killer = threading.Timer(args.timeout, proc.kill)
+            killer.start()
+            try:
+                _, status, rusage = os.wait4(proc.pid, 0)
+            finally:
+                killer.cancel()
+            wall = time.perf_counter() - t0
+        proc.returncode = returncode = os.waitstatus_to_exitcode(status)
+
+        llm_stats = llm.stats()
+        requests = {"openai": llm_stats["requests"]}
+        if jira is not None:
+            requests["jira"] = jira.requests
+        if trello is not None:
+            requests["trello"] = trello.requests
+
+    if args.keep:
+        print(f"   copie conservée : {project}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return BenchResult(
+        pipeline=p.name, ok=returncode == 0, returncode=returncode, wall_sec=round(wall, 2),
+        peak_rss_mb=_peak_rss_mb(rusage), requests=requests,
+        prompt_tokens=llm_stats["prompt_tokens"], completion_tokens=llm_stats["completion_tokens"],
+        llm_replayed=llm_stats["replayed"], llm_generic=llm_stats["generic"], log=log_path,
+    )
+
+
+# ---------- Comparaison à une référence ----------
+def compare(results: List[BenchResult], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Métriques au-delà de référence × (1 + tolérance), avec un écart d'au moins 1."""
+    regressions = []
+    base = {r["pipeline"]: r for r in baseline.get("results", [])}
+    for r in results:
+        ref = base.get(r.pipeline)
+        if ref is None:
+            continue
+        checks = {"wall_sec": (r.wall_sec, ref["wall_sec"]), "peak_rss_mb": (r.peak_rss_mb, ref["peak_rss_mb"]),
+                  "prompt_tokens": (r.prompt_tokens, ref["prompt_tokens"]),
+                  "completion_tokens": (r.completion_tokens, ref["completion_tokens"])}
+        checks.update({f"requests.{k}": (v, ref["requests"].get(k, 0)) for k, v in r.requests.items()})
+        for metric, (value, old) in checks.items():
+            if value > old * (1 + tolerance) and value - old >= 1:
+                regressions.append(f"{r.pipeline} {metric}: {old} → {value}")
+    return regressions
+
+
+def _parse_python(values: List[str]) -> Dict[str, str]:
+    out = {}
+    for v in values:
+        name, _, path = v.partition("=")
+        if name not in PIPELINES or not path:
+            raise SystemExit(f"--python attend <pipeline>=<interpréteur> (pipelines : {', '.join(PIPELINES)})")
+        out[name] = path
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks hors-ligne des pipelines (stand-ins Jira / Trello / OpenAI).")
+    parser.add_argument("--only", nargs="+", choices=list(PIPELINES), help="Sous-ensemble de pipelines")
+    parser.add_argument("--mode", choices=("replay", "record"), default="replay",
+                        help="record : relaie les appels LLM à l'API réelle (OPENAI_API_KEY) et les enregistre")
+    parser.add_argument("--strict", action="store_true", help="Échec si un appel LLM n'a pas de fixture")
+    parser.add_argument("--jira-issues", type=int, default=500)
+    parser.add_argument("--trello-cards", type=int, default=200)
+    parser.add_argument("--http-latency", type=float, default=0.02, help="Latence simulée Jira / Trello (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Latence simulée par appel LLM (s)")
+    parser.add_argument("--timeout", type=float, default=900, help="Durée max d'un pipeline (s)")
+    parser.add_argument("--python", action="append", default=[], metavar="PIPELINE=PYTHON",
+                        help="Interpréteur d'un pipeline (venv dédiée)")
+    parser.add_argument("--output", default=os.path.join(HERE, "results", "latest.json"))
+    parser.add_argument("--baseline", help="Résultats de référence (JSON d'un run précédent)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Marge avant régression (0.2 = +20 %%)")
+    parser.add_argument("--keep", action="store_true", help="Conserve les copies temporaires des projets")
+    args = parser.parse_args()
+    args.python = _parse_python(args.python)
+
+    results_dir = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(results_dir, exist_ok=True)
+    results = [run_pipeline(PIPELINES[name], args, results_dir) for name in (args.only or PIPELINES)]
+
+    print(f"\n{'pipeline':<22} {'ok':>3} {'temps (s)':>10} {'RSS (Mo)':>9} {'tokens in/out':>15}  requêtes")
+    for r in results:
+        reqs = " ".join(f"{k}={v}" for k, v in r.requests.items())
+        print(f"{r.pipeline:<22} {'✅' if r.ok else '❌':>3} {r.wall_sec:>10.2f} {r.peak_rss_mb:>9.1f} "
+              f"{f'{r.prompt_tokens}/{r.completion_tokens}':>15}  {reqs}")
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        print(f"❌ {r.pipeline} : code {r.returncode}, voir {r.log}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0],
+                   "params": {"jira_issues": args.jira_issues, "trello_cards": args.trello_cards,
+                              "http_latency": args.http_latency, "llm_latency": args.llm_latency},
+                   "results": [asdict(r) for r in results]}, f, ensure_ascii=False, indent=2)
+    print(f"📄 {args.output}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"⚠️  Régression : {line}")
+        if not regressions:
+            print("✅ Aucune régression par rapport à la référence")
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
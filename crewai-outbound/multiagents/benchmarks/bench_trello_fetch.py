@@ -0,0 +1,73 @@
+"""
+Benchmark de la collecte d'un board Trello contre un faux serveur local.
+
+    python benchmarks/bench_trello_fetch.py --latency 0.02 --sizes 50 400 2000
+    python benchmarks/bench_trello_fetch.py --server-rate 50 --rate 40     # avec 429 côté serveur
+
+Compare, par taille de board, le chemin carte par carte (`get_cards_basic` + `enrich_cards_with_details`)
+séquentiel (1 worker) et en pool, au chemin vrac (`enrich_board`) : requêtes HTTP (dont 429),
+temps mural, et vérifie que les résultats sont identiques. La ligne « vrac+cache » est un second run
+vrac avec le cache HTTP conditionnel déjà rempli (réponses 304).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_trello import BOARD_ID, FakeTrello, make_board  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+from trello import TrelloClient, TrelloConfig, enrich_board, enrich_cards_with_details  # noqa: E402
+
+
+def per_card(client: TrelloClient):
+    return enrich_cards_with_details(client, client.get_cards_basic())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark collecte board Trello (faux serveur local).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 400, 2_000])
+    parser.add_argument("--comments", type=int, default=3, help="Commentaires par carte")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latence simulée par requête (s)")
+    parser.add_argument("--workers", type=int, default=8, help="Threads du chemin carte par carte en pool")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Seau à jetons client (requêtes/s)")
+    parser.add_argument("--server-rate", type=int, default=None, help="Limite du faux serveur (requêtes/s, 429 au-delà)")
+    args = parser.parse_args()
+
+    paths = (("séquentiel", per_card, 1), ("pool", per_card, args.workers), ("vrac", enrich_board, args.workers))
+    print(f"{'cartes':>7} {'chemin':>11} {'requêtes':>9} {'429':>5} {'temps (s)':>10}")
+    for size in args.sizes:
+        board = make_board(size, comments_per_card=args.comments)
+        results = {}
+        for name, fetch, workers in paths:
+            with FakeTrello(board, latency=args.latency, rate_limit=args.server_rate) as fake:
+                client = TrelloClient(TrelloConfig("bench", "token", BOARD_ID, base_url=fake.url),
+                                      max_workers=workers, rate_per_sec=args.rate)
+                t0 = time.perf_counter()
+                results[name] = fetch(client)
+                elapsed = time.perf_counter() - t0
+                print(f"{size:>7} {name:>11} {fake.requests:>9} {fake.throttled:>5} {elapsed:>10.2f}")
+        with FakeTrello(board, latency=args.latency) as fake, tempfile.TemporaryDirectory() as tmp:
+            cache = HttpCache(os.path.join(tmp, "http_cache.sqlite3"))
+            for run in range(2):
+                fake.requests = fake.not_modified = 0
+                client = TrelloClient(TrelloConfig("bench", "token", BOARD_ID, base_url=fake.url),
+                                      rate_per_sec=args.rate, http_cache=cache)
+                t0 = time.perf_counter()
+                results["vrac+cache"] = enrich_board(client)
+                elapsed = time.perf_counter() - t0
+            cache.close()
+            print(f"{size:>7} {'vrac+cache':>11} {fake.requests:>9} {'':>5} {elapsed:>10.2f}"
+                  f"   ({fake.not_modified} × 304 au 2e run)")
+        for name in ("pool", "vrac", "vrac+cache"):
+            assert results[name] == results["séquentiel"], f"le chemin {name} diverge du chemin carte par carte"
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Faux serveur Trello local (API REST /1) pour benchmarks hors-ligne."""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+BOARD_ID = "board0000000000000000001"
+LIST_NAMES = ["Backlog", "À faire", "En cours", "En revue", "Bloqué", "Terminé"]
+
+
+def make_board(n_cards: int, comments_per_card: int = 3) -> Dict[str, Any]:
+    """Board synthétique déterministe : listes, cartes, actions commentCard (plus récentes en premier)."""
+    lists = [{"id": f"list{i:020d}", "name": name} for i, name in enumerate(LIST_NAMES)]
+    cards, actions = [], []
+    for i in range(n_cards):
+        card_id = f"card{i:020d}"
+        cards.append({
+            "id": card_id,
+            "name": f"Carte {i}",
+            "idList": lists[i % len(lists)]["id"],
+            "due": f"2024-0{1 + i % 9}-15T12:00:00.000Z" if i % 3 else None,
+            "dateLastActivity": f"2024-0{1 + i % 9}-{1 + i % 28:02d}T09:00:00.000Z",
+            "labels": [{"name": "Urgent", "color": "red"}] if i % 4 == 0 else [],
+            "shortUrl": f"https://trello.com/c/{i:08d}",
+            "attachments": [],
+        })
+        for j in range(comments_per_card):
+            actions.append({
+                "id": f"act{len(actions):021d}",
+                "type": "commentCard",
+                "date": f"2024-01-01T{j % 24:02d}:{i % 60:02d}:00.000Z",
+                "data": {"text": f"Commentaire {j} sur la carte {i}", "card": {"id": card_id}},
+                "memberCreator": {"fullName": f"Membre {j % 4}"},
+            })
+    actions.reverse()  # ids croissants = chronologique ; Trello renvoie le plus récent d'abord
+    return {"id": BOARD_ID, "name": "Board bench", "lists": lists, "cards": cards, "actions": actions}
+
+
+class FakeTrello:
+    """
+    Sert un board synthétique sur les routes utilisées par `TrelloClient`.
+    `latency` simule l'aller-retour réseau ; `requests` compte les appels, `by_route` les ventile.
+    `rate_limit` (requêtes/s) renvoie des 429 avec Retry-After au-delà, comptés dans `throttled`.
+    Chaque réponse porte un ETag ; If-None-Match identique → 304 sans corps, compté dans `not_modified`.
+    """
+
+    def __init__(self, board: Dict[str, Any], latency: float = 0.02, rate_limit: Optional[int] = None) -> None:
+        self.board = board
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self._window: Deque[float] = deque()
+        self.by_route: Counter = Counter()
+        self._cards = {c["id"]: c for c in board["cards"]}
+        self._lists = {lst["id"]: lst for lst in board["lists"]}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeTrello":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _actions(self, actions: List[Dict[str, Any]], query: Dict[str, List[str]], limit_key: str) -> List[Dict]:
+        limit = min(int(query.get(limit_key, ["50"])[0]), 1000)
+        before = query.get("before", [None])[0]
+        if before:
+            actions = [a for a in actions if a["id"] < before]
+        return actions[:limit]
+
+    def route(self, path: str, query: Dict[str, List[str]]):
+        """(nom de route, payload) ou (None, None) si route inconnue."""
+        board = self.board
+        if path == f"/1/boards/{board['id']}":
+            payload: Dict[str, Any] = {"id": board["id"], "name": board["name"]}
+            if query.get("cards", ["none"])[0] != "none":
+                payload["cards"] = board["cards"]
+            if query.get("lists", ["none"])[0] != "none":
+                payload["lists"] = board["lists"]
+            if query.get("actions"):
+                payload["actions"] = self._actions(board["actions"], query, "actions_limit")
+            return "board", payload
+        if path == f"/1/boards/{board['id']}/cards":
+            return "board_cards", board["cards"]
+        if path == f"/1/boards/{board['id']}/actions":
+            return "board_actions", self._actions(board["actions"], query, "limit")
+        m = re.fullmatch(r"/1/cards/(\w+)/actions", path)
+        if m and m.group(1) in self._cards:
+            card_actions = [a for a in board["actions"] if a["data"]["card"]["id"] == m.group(1)]
+            return "card_actions", self._actions(card_actions, query, "limit")
+        m = re.fullmatch(r"/1/cards/(\w+)", path)
+        if m and m.group(1) in self._cards:
+            return "card", self._cards[m.group(1)]
+        m = re.fullmatch(r"/1/lists/(\w+)", path)
+        if m and m.group(1) in self._lists:
+            return "list", self._lists[m.group(1)]
+        return None, None
+
+    def _over_limit(self) -> bool:
+        """Fenêtre glissante d'une seconde (appelé sous verrou)."""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self._window and now - self._window[0] > 1.0:
+            self._window.popleft()
+        if len(self._window) >= self.rate_limit:
+            self.throttled += 1
+            return True
+        self._window.append(now)
+        return False
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                time.sleep(fake.latency)
+                parsed = urlparse(self.path)
+                name, payload = fake.route(parsed.path, parse_qs(parsed.query))
+                with fake._lock:
+                    fake.requests += 1
+                    fake.by_route[name or "404"] += 1
+                    throttled = fake._over_limit()
+                if throttled:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if name is None:
+                    self.send_error(404)
+                    return
+                body = json.dumps(payload).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    with fake._lock:
+                        fake.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,199 @@
+# Module partagé — copie canonique : crewai-outbound/planification_projet/src/costs.py
+# Ne pas modifier les copies : python scripts/sync_shared_modules.py
+"""
+Comptabilité des coûts LLM par modèle.
+
+Tarifs en USD par million de tokens, avec trois taux distincts : entrée, entrée en cache
+(prompt caching OpenAI, facturé moins cher) et sortie. Les tokens en cache sont inclus
+dans `prompt_tokens` côté API : seuls `prompt_tokens - cached_prompt_tokens` paient le taux plein.
+
+`CostLedger` agrège l'usage de plusieurs crews (thread-safe) et peut être rejoué sur plusieurs runs
+(`append_jsonl` / `from_jsonl`). Un modèle absent de la table donne un coût `None` (et un warning),
+jamais un chiffre inventé. Tarifs complétables via COSTS_PRICING_FILE (JSON {modèle: {input, cached_input, output}}).
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    input: float         # USD / 1M tokens d'entrée
+    cached_input: float  # USD / 1M tokens d'entrée servis depuis le cache
+    output: float        # USD / 1M tokens de sortie
+
+
+# Tarifs publics OpenAI (USD / 1M tokens) — à vérifier lors des changements de grille
+PRICING: Dict[str, ModelPrice] = {
+    "gpt-5": ModelPrice(1.25, 0.125, 10.00),
+    "gpt-5-mini": ModelPrice(0.25, 0.025, 2.00),
+    "gpt-5-nano": ModelPrice(0.05, 0.005, 0.40),
+    "gpt-4.1": ModelPrice(2.00, 0.50, 8.00),
+    "gpt-4.1-mini": ModelPrice(0.40, 0.10, 1.60),
+    "gpt-4.1-nano": ModelPrice(0.10, 0.025, 0.40),
+    "gpt-4o": ModelPrice(2.50, 1.25, 10.00),
+    "gpt-4o-mini": ModelPrice(0.15, 0.075, 0.60),
+    "o1": ModelPrice(15.00, 7.50, 60.00),
+    "o1-mini": ModelPrice(1.10, 0.55, 4.40),
+    "o3": ModelPrice(2.00, 0.50, 8.00),
+    "o3-mini": ModelPrice(1.10, 0.55, 4.40),
+    "o4-mini": ModelPrice(1.10, 0.275, 4.40),
+    "gpt-4-turbo": ModelPrice(10.00, 10.00, 30.00),
+    "gpt-4": ModelPrice(30.00, 30.00, 60.00),
+    "gpt-3.5-turbo": ModelPrice(0.50, 0.50, 1.50),
+}
+
+_warned: set = set()
+
+
+def _load_overrides() -> None:
+    path = os.getenv("COSTS_PRICING_FILE")
+    if not path:
+        return
+    with open(path, encoding="utf-8") as f:
+        for model, p in json.load(f).items():
+            PRICING[model] = ModelPrice(float(p["input"]), float(p.get("cached_input", p["input"])),
+                                        float(p["output"]))
+
+
+_load_overrides()
+
+
+def resolve_price(model: Optional[str]) -> Optional[ModelPrice]:
+    """Tarif d'un modèle : nom exact, sans préfixe fournisseur (`openai/…`), ou snapshot daté (`gpt-4o-2024-08-06`)."""
+    if not model:
+        return None
+    name = model.split("/")[-1].lower()
+    if name in PRICING:
+        return PRICING[name]
+    # préfixe le plus long : « gpt-4o-mini-2024-07-18 » → gpt-4o-mini (et non gpt-4o)
+    candidates = [m for m in PRICING if name.startswith(m + "-")]
+    return PRICING[max(candidates, key=len)] if candidates else None
+
+
+def usage_dict(usage: Any) -> Dict[str, int]:
+    """Compteurs de tokens d'un usage CrewAI (dict en 0.28, objet UsageMetrics ensuite)."""
+    if usage is None:
+        return {}
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else usage.dict() if hasattr(usage, "dict") else {}
+    return {k: int(usage.get(k) or 0) for k in
+            ("prompt_tokens", "cached_prompt_tokens", "completion_tokens", "total_tokens", "successful_requests")}
+
+
+def cost_usd(model: Optional[str], prompt_tokens: int, completion_tokens: int,
+             cached_prompt_tokens: int = 0) -> Optional[float]:
+    """Coût en USD, ou None si le modèle n'a pas de tarif connu."""
+    price = resolve_price(model)
+    if price is None:
+        if model not in _warned:
+            _warned.add(model)
+            warnings.warn(f"Tarif inconnu pour le modèle {model!r} : coût non calculé (COSTS_PRICING_FILE).")
+        return None
+    cached = min(cached_prompt_tokens, prompt_tokens)
+    return ((prompt_tokens - cached) * price.input + cached * price.cached_input
+            + completion_tokens * price.output) / 1_000_000
+
+
+@dataclass
+class ModelUsage:
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    requests: int = 0
+    runs: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class CostLedger:
+    """Usage cumulé par (modèle, libellé) ; libellé = board, projet, crew… au choix de l'appelant."""
+    entries: Dict[str, Dict[str, ModelUsage]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def _accumulate(self, model: str, label: str, usage: ModelUsage) -> None:
+        with self._lock:
+            u = self.entries.setdefault(model, {}).setdefault(label, ModelUsage())
+            u.prompt_tokens += usage.prompt_tokens
+            u.cached_prompt_tokens += usage.cached_prompt_tokens
+            u.completion_tokens += usage.completion_tokens
+            u.requests += usage.requests
+            u.runs += usage.runs
+
+    def add(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, cached_prompt_tokens: int = 0,
+            requests: int = 0, label: str = "default") -> Optional[float]:
+        """Ajoute l'usage d'un run ; retourne son coût (None si modèle inconnu)."""
+        self._accumulate(model, label, ModelUsage(prompt_tokens, cached_prompt_tokens, completion_tokens, requests, 1))
+        return cost_usd(model, prompt_tokens, completion_tokens, cached_prompt_tokens)
+
+    def add_usage(self, model: str, usage: Any, label: str = "default") -> Optional[float]:
+        """Ajoute `crew.usage_metrics` (ou un dict équivalent)."""
+        u = usage_dict(usage)
+        return self.add(model, u.get("prompt_tokens", 0), u.get("completion_tokens", 0),
+                        u.get("cached_prompt_tokens", 0), u.get("successful_requests", 0), label=label)
+
+    def _rows(self) -> Iterable[tuple]:
+        with self._lock:
+            return [(m, lbl, ModelUsage(**asdict(u))) for m, by_label in self.entries.items()
+                    for lbl, u in by_label.items()]
+
+    def total_cost(self) -> Optional[float]:
+        """Somme des coûts ; None si un modèle utilisé n'a pas de tarif (total partiel trompeur)."""
+        total = 0.0
+        for model, _, u in self._rows():
+            c = cost_usd(model, u.prompt_tokens, u.completion_tokens, u.cached_prompt_tokens)
+            if c is None:
+                return None
+            total += c
+        return total
+
+    def summary(self) -> Dict[str, Any]:
+        by_model: Dict[str, Dict[str, Any]] = {}
+        by_label: Dict[str, Dict[str, Any]] = {}
+        for model, label, u in self._rows():
+            c = cost_usd(model, u.prompt_tokens, u.completion_tokens, u.cached_prompt_tokens)
+            for key, bucket in ((model, by_model), (label, by_label)):
+                row = bucket.setdefault(key, {"prompt_tokens": 0, "cached_prompt_tokens": 0,
+                                              "completion_tokens": 0, "runs": 0, "cost_usd": 0.0})
+                row["prompt_tokens"] += u.prompt_tokens
+                row["cached_prompt_tokens"] += u.cached_prompt_tokens
+                row["completion_tokens"] += u.completion_tokens
+                row["runs"] += u.runs
+                row["cost_usd"] = None if c is None or row["cost_usd"] is None else round(row["cost_usd"] + c, 6)
+        total = self.total_cost()
+        return {"total_cost_usd": None if total is None else round(total, 6),
+                "by_model": by_model, "by_label": by_label}
+
+    def merge(self, other: "CostLedger") -> None:
+        for model, label, u in other._rows():
+            self._accumulate(model, label, u)
+
+    def append_jsonl(self, path: str) -> None:
+        """Ajoute l'usage de ce ledger à un historique JSONL (une ligne par (modèle, libellé))."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for model, label, u in self._rows():
+                f.write(json.dumps({"model": model, "label": label, **asdict(u)}, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "CostLedger":
+        """Ledger cumulé de tous les runs enregistrés par `append_jsonl`."""
+        ledger = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                model, label = row.pop("model"), row.pop("label")
+                ledger._accumulate(model, label, ModelUsage(**row))
+        return ledger
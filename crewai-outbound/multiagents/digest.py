@@ -0,0 +1,158 @@
+# digest.py
+"""
+Synthèse déterministe d'un board enrichi, donnée à l'agent à la place des cartes brutes.
+
+Compteurs (en retard, sans activité récente, non démarrées, en cours, terminées), WIP par liste,
+cartes les plus actives avec leurs derniers commentaires tronqués. La synthèse est réduite
+jusqu'à tenir dans un budget de tokens (estimation ~4 caractères / token).
+"""
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Mots-clés des noms de listes → statut. Fragments de regex appliqués à des mots entiers (minuscules,
+# accents conservés) : « Contest » n'est pas « test », « Livres à lire » n'est pas « livré ».
+DONE_KEYWORDS = ("done", r"termin[ée]e?s?", r"finie?s?", r"livr(?:é|ee)e?s?", "closed", r"archiv[ée]e?s?")
+NOT_STARTED_KEYWORDS = ("backlog", r"to[- ]?do", r"[àa] faire", r"id[ée]es?", "icebox")
+IN_PROGRESS_KEYWORDS = ("en cours", "doing", "in progress", "revue", "review", r"tests?", "testing", "qa",
+                        r"bloqu[ée]e?s?", "blocked")
+_STATUS_PATTERNS = tuple(
+    (status, re.compile(r"(?<!\w)(?:" + "|".join(keywords) + r")(?!\w)"))
+    for status, keywords in (("done", DONE_KEYWORDS), ("not_started", NOT_STARTED_KEYWORDS),
+                             ("in_progress", IN_PROGRESS_KEYWORDS))
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def list_status(list_name: str) -> str:
+    name = unicodedata.normalize("NFC", (list_name or "").lower())
+    for status, pattern in _STATUS_PATTERNS:
+        if pattern.search(name):
+            return status
+    return "in_progress"  # liste inconnue : considérée comme travail en cours
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _clip(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + "…"
+
+
+@dataclass
+class DigestStats:
+    cards: int
+    raw_tokens: int
+    digest_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.raw_tokens - self.digest_tokens)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "tokens_saved": self.tokens_saved}
+
+
+def _card_brief(card: Dict[str, Any], comments: int, comment_chars: int) -> Dict[str, Any]:
+    brief = {
+        "id": card.get("id"),
+        "name": card.get("name"),
+        "list": card.get("list_name"),
+        "due": card.get("due"),
+        "labels": card.get("labels") or [],
+        "url": card.get("shortUrl"),
+        "n_comments": len(card.get("comments") or []),
+    }
+    if comments:
+        # Trello renvoie les commentaires du plus récent au plus ancien
+        brief["recent_comments"] = [
+            f"{(c.get('date') or '')[:10]} {c.get('member') or '?'}: {_clip(c.get('text') or '', comment_chars)}"
+            for c in (card.get("comments") or [])[:comments]
+        ]
+    return brief
+
+
+def _build(cards: List[Dict[str, Any]], now: datetime, stale_days: int, top_n: int, comments: int,
+           comment_chars: int, max_items: int) -> Dict[str, Any]:
+    counts = {"total": len(cards), "done": 0, "not_started": 0, "in_progress": 0, "overdue": 0, "stale": 0}
+    wip: Dict[str, int] = {}
+    overdue: List[Tuple[datetime, Dict[str, Any]]] = []
+    stale: List[Tuple[datetime, Dict[str, Any]]] = []
+    stale_before = now - timedelta(days=stale_days)
+
+    for card in cards:
+        status = list_status(card.get("list_name") or "")
+        counts[status] += 1
+        wip[card.get("list_name") or "?"] = wip.get(card.get("list_name") or "?", 0) + 1
+        if status == "done":
+            continue
+        due = _parse_date(card.get("due"))
+        if due and due < now:
+            counts["overdue"] += 1
+            overdue.append((due, card))
+        last = _parse_date(card.get("last_activity"))
+        if last and last < stale_before:
+            counts["stale"] += 1
+            stale.append((last, card))
+
+    epoch = datetime.min.replace(tzinfo=timezone.utc)
+    active = sorted(cards, key=lambda c: (len(c.get("comments") or []), _parse_date(c.get("last_activity")) or epoch),
+                    reverse=True)
+    return {
+        "generated_at": now.isoformat(timespec="seconds"),
+        "counts": counts,
+        "wip_by_list": dict(sorted(wip.items(), key=lambda kv: -kv[1])),
+        "overdue": [_card_brief(c, 0, 0) for _, c in sorted(overdue, key=lambda t: t[0])[:max_items]],
+        "stale": [_card_brief(c, 0, 0) for _, c in sorted(stale, key=lambda t: t[0])[:max_items]],
+        "most_active": [_card_brief(c, comments, comment_chars) for c in active[:top_n]],
+        "note": "Détails complets d'une carte : outil « Collecteur Carte Trello » avec son id.",
+    }
+
+
+def build_digest(cards: List[Dict[str, Any]], token_budget: int = 3000, now: Optional[datetime] = None,
+                 stale_days: int = 7, top_n: int = 10, comments_per_card: int = 3,
+                 comment_chars: int = 280, max_items: int = 15) -> Tuple[Dict[str, Any], DigestStats]:
+    """
+    (synthèse, stats). Tant que la synthèse dépasse `token_budget`, on réduit dans l'ordre :
+    longueur des commentaires, nombre de commentaires, nombre de cartes actives, listes de cartes détaillées.
+    Les compteurs et le WIP par liste sont toujours conservés.
+    """
+    now = now or datetime.now(timezone.utc)
+    raw_tokens = estimate_tokens(json.dumps(cards, ensure_ascii=False, default=str))
+    params = {"top_n": top_n, "comments": comments_per_card, "comment_chars": comment_chars, "max_items": max_items}
+
+    while True:
+        digest = _build(cards, now, stale_days, **params)
+        tokens = estimate_tokens(json.dumps(digest, ensure_ascii=False))
+        if tokens <= token_budget:
+            break
+        if params["comment_chars"] > 80:
+            params["comment_chars"] //= 2
+        elif params["comments"] > 0:
+            params["comments"] -= 1
+        elif params["top_n"] > 3:
+            params["top_n"] -= max(1, params["top_n"] // 3)
+        elif params["max_items"] > 3:
+            params["max_items"] -= max(1, params["max_items"] // 3)
+        else:
+            break  # minimum atteint : compteurs + quelques cartes, même au-delà du budget
+
+    digest["truncated"] = params != {"top_n": top_n, "comments": comments_per_card,
+                                     "comment_chars": comment_chars, "max_items": max_items}
+    stats = DigestStats(cards=len(cards), raw_tokens=raw_tokens,
+                        digest_tokens=estimate_tokens(json.dumps(digest, ensure_ascii=False)))
+    return digest, stats
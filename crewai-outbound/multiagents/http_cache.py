@@ -0,0 +1,127 @@
+"""
+Cache disque des requêtes GET conditionnelles (ETag / Last-Modified) du client Trello.
+
+Une réponse 200 portant un ETag ou un Last-Modified est stockée ; la requête suivante envoie
+If-None-Match / If-Modified-Since et un 304 est servi depuis le disque (pas de corps transféré).
+Clé = SHA-256 de l'URL + paramètres : la clé et le token Trello ne sont jamais stockés en clair.
+Stockage SQLite borné en octets, éviction LRU.
+
+Variables d'environnement : TRELLO_HTTP_CACHE_PATH (défaut .trello_http_cache.sqlite3),
+TRELLO_HTTP_CACHE_MAX_MB (défaut 50), TRELLO_HTTP_CACHE_DISABLED=1 pour le couper.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass
+class HttpCacheStats:
+    hits: int = 0          # 304 servis depuis le disque
+    misses: int = 0        # 200 (corps complet transféré)
+    stored: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0   # corps non retransférés grâce aux 304
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps([url, sorted((params or {}).items())], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class HttpCache:
+    """Entrées clé → (ETag, Last-Modified, corps), partagées entre threads."""
+
+    def __init__(self, path: str = ".trello_http_cache.sqlite3", max_bytes: int = 50 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.stats = HttpCacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_http_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """En-têtes conditionnels pour une entrée connue ({} sinon)."""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ?", (key,)).fetchone()
+        if not found:
+            return {}
+        headers = {}
+        if found[0]:
+            headers["If-None-Match"] = found[0]
+        if found[1]:
+            headers["If-Modified-Since"] = found[1]
+        return headers
+
+    def not_modified(self, key: str) -> Optional[bytes]:
+        """Corps stocké pour un 304 (None si l'entrée a été évincée entre-temps)."""
+        with self._lock:
+            found = self._conn.execute("SELECT body, size FROM responses WHERE key = ?", (key,)).fetchone()
+            if not found:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.stats.hits += 1
+            self.stats.bytes_saved += found[1]
+            return found[0]
+
+    def store(self, key: str, etag: Optional[str], last_modified: Optional[str], body: bytes) -> None:
+        """Enregistre une réponse 200 (comptée comme miss) si elle porte un validateur."""
+        with self._lock:
+            self.stats.misses += 1
+            if not (etag or last_modified) or len(body) > self.max_bytes:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (key, etag, last_modified, body, len(body), time.time()))
+            self.stats.stored += 1
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            while total > self.max_bytes:
+                oldest: Tuple[str, int] = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 1").fetchone()
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (oldest[0],))
+                total -= oldest[1]
+                self.stats.evictions += 1
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def default_http_cache() -> Optional[HttpCache]:
+    """Cache configuré par l'environnement (None si désactivé)."""
+    if os.getenv("TRELLO_HTTP_CACHE_DISABLED", "0") == "1":
+        return None
+    return HttpCache(
+        path=os.getenv("TRELLO_HTTP_CACHE_PATH", ".trello_http_cache.sqlite3"),
+        max_bytes=int(float(os.getenv("TRELLO_HTTP_CACHE_MAX_MB", "50")) * 1024 * 1024),
+    )
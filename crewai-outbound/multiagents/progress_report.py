@@ -5,15 +5,14 @@ import argparse
 import json
 import os
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 # Imports en haut
 
@@ -28,6 +27,12 @@ from typing import Type
 
 
 from helper import load_env
+from costs import CostLedger, usage_dict
+from digest import build_digest
+from http_cache import default_http_cache
+from trello import BoardSnapshot, TrelloClient, TrelloConfig
+import tracing
+from tracing import instrument_crew, span
 
 # CrewAI
 from crewai import Agent, Task, Crew
@@ -62,108 +67,34 @@ def read_yaml_if_exists(path: str | Path) -> Optional[dict]:
     return None
 
 
-# -----------------------------
-# Trello API Client robuste
-# -----------------------------
-@dataclass
-class TrelloConfig:
-    api_key: str
-    api_token: str
-    board_id: str
-    base_url: str = os.getenv("DLAI_TRELLO_BASE_URL", "https://api.trello.com")
-
-
-class TrelloClient:
-    """Client Trello avec session, timeouts et retries."""
-
-    def __init__(self, cfg: TrelloConfig, timeout: float = 10.0, max_retries: int = 3) -> None:
-        self.cfg = cfg
-        self.timeout = timeout
-        self.session = requests.Session()
-        retries = Retry(
-            total=max_retries,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=frozenset(["GET"])
-        )
-        adapter = HTTPAdapter(max_retries=retries)
-        self.session.mount("https://", adapter)
-        self.session.mount("http://", adapter)
-
-    def _params(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        base = {"key": self.cfg.api_key, "token": self.cfg.api_token}
-        if extra:
-            base.update(extra)
-        return base
-
-    def get_cards_basic(self) -> List[Dict[str, Any]]:
-        """Cartes du board (infos principales)."""
-        url = f"{self.cfg.base_url}/1/boards/{self.cfg.board_id}/cards"
-        params = self._params({
-            "fields": "name,idList,due,dateLastActivity,labels,shortUrl",
-            "attachments": "true",
-        })
-        r = self.session.get(url, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
-
-    def get_card_comments(self, card_id: str) -> List[Dict[str, Any]]:
-        """Commentaires d'une carte."""
-        url = f"{self.cfg.base_url}/1/cards/{card_id}/actions"
-        params = self._params({"filter": "commentCard", "limit": 1000})
-        r = self.session.get(url, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        return r.json()
-
-    def get_list_name(self, list_id: str) -> str:
-        """Nom d'une liste depuis son id."""
-        url = f"{self.cfg.base_url}/1/lists/{list_id}"
-        params = self._params({"fields": "name"})
-        r = self.session.get(url, params=params, timeout=self.timeout)
-        r.raise_for_status()
-        data = r.json()
-        return data.get("name", list_id)
-
-
-def enrich_cards_with_details(client: TrelloClient, cards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Ajoute list_name + comments à chaque carte."""
-    list_name_cache: Dict[str, str] = {}
-    enriched: List[Dict[str, Any]] = []
-
-    for c in cards:
-        list_id = c.get("idList", "")
-        if list_id not in list_name_cache:
-            try:
-                list_name_cache[list_id] = client.get_list_name(list_id)
-            except Exception:
-                list_name_cache[list_id] = list_id  # fallback
-        list_name = list_name_cache[list_id]
-
-        comments: List[Dict[str, Any]] = []
+class BoardContext:
+    """
+    Board courant des outils, propre à chaque thread : les mêmes agents et outils servent
+    plusieurs boards en parallèle (mode --boards), chaque crew lisant l'instantané de son board.
+    Les tâches de la crew sont synchrones : les outils s'exécutent dans le thread qui fait le kickoff.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    @contextmanager
+    def use(self, snapshot: BoardSnapshot, run_stats: Dict[str, Any]):
+        self._local.snapshot, self._local.run_stats = snapshot, run_stats
         try:
-            raw_comments = client.get_card_comments(c["id"])
-            for a in raw_comments:
-                if a.get("type") == "commentCard":
-                    comments.append({
-                        "date": a.get("date"),
-                        "member": (a.get("memberCreator", {}) or {}).get("fullName"),
-                        "text": ((a.get("data", {}) or {}).get("text") or "").strip()
-                    })
-        except Exception:
-            # tolérance aux erreurs réseau
-            comments = []
-
-        enriched.append({
-            "id": c.get("id"),
-            "name": c.get("name"),
-            "list_name": list_name,
-            "due": c.get("due"),
-            "last_activity": c.get("dateLastActivity"),
-            "labels": [lbl.get("name") or lbl.get("color") for lbl in (c.get("labels") or [])],
-            "shortUrl": c.get("shortUrl"),
-            "comments": comments
-        })
-    return enriched
+            yield
+        finally:
+            self._local.snapshot = self._local.run_stats = None
+
+    @property
+    def snapshot(self) -> BoardSnapshot:
+        snapshot = getattr(self._local, "snapshot", None)
+        if snapshot is None:
+            raise RuntimeError("Aucun board actif pour ce thread (BoardContext.use).")
+        return snapshot
+
+    @property
+    def run_stats(self) -> Dict[str, Any]:
+        return getattr(self._local, "run_stats", None) or {}
 
 
 class NoArgs(BaseModel):
@@ -180,19 +111,19 @@ class CardDataFetcherTool(BaseTool):
     description: str = "Récupère les détails d'une carte Trello par id (liste, dates, labels, commentaires)."
     args_schema: Type[BaseModel] = CardArgs
 
-    _client: TrelloClient = PrivateAttr()
+    _context: BoardContext = PrivateAttr()
 
-    def __init__(self, client: TrelloClient):
+    def __init__(self, context: BoardContext):
         super().__init__()
-        self._client = client
+        self._context = context
 
     def _run(self, card_id: str) -> dict:
         try:
-            cards = self._client.get_cards_basic()
-            card = next((c for c in cards if c.get("id") == card_id), None)
+            # lookup dans l'instantané du run (index id → carte), pas de nouvel appel board
+            card = self._context.snapshot.card(card_id)
             if not card:
                 return {"error": f"Carte {card_id} introuvable sur le board."}
-            return enrich_cards_with_details(self._client, [card])[0]
+            return card
         except Exception as e:
             return {"error": f"Échec récupération carte {card_id}: {e}"}
 
@@ -201,19 +132,31 @@ class CardDataFetcherTool(BaseTool):
 # Outil BOARD (pas d'arguments)
 class BoardDataFetcherTool(BaseTool):
     name: str = "Collecteur Board Trello"
-    description: str = "Récupère les cartes d'un board Trello avec détails utiles (listes, dates, labels, commentaires)."
+    description: str = (
+        "Synthèse du board Trello : compteurs (en retard, sans activité, non démarrées, en cours), "
+        "WIP par liste, cartes en retard / inactives, cartes les plus actives avec derniers commentaires."
+    )
     args_schema: Type[BaseModel] = NoArgs
 
-    _client: TrelloClient = PrivateAttr()
+    _context: BoardContext = PrivateAttr()
+    _token_budget: int = PrivateAttr()
 
-    def __init__(self, client: TrelloClient):
+    def __init__(self, context: BoardContext, token_budget: int = 3000):
         super().__init__()              # initialise le modèle Pydantic
-        self._client = client           # attribut privé autorisé
+        self._context = context         # attribut privé autorisé
+        self._token_budget = token_budget
 
-    def _run(self) -> list[dict]:
+    def _run(self) -> dict | list[dict]:
         try:
-            cards = self._client.get_cards_basic()
-            return enrich_cards_with_details(self._client, cards)
+            # cartes + listes + commentaires en quelques requêtes board, chargés une fois par run
+            cards = self._context.snapshot.cards()
+            if self._token_budget <= 0:
+                return cards  # budget 0 : cartes brutes (ancien comportement)
+            # synthèse locale sous budget de tokens plutôt que toutes les cartes et commentaires verbatim
+            with span("board digest", "cpu", cards=len(cards)):
+                digest, stats = build_digest(cards, token_budget=self._token_budget)
+            self._context.run_stats["board_digest"] = stats.as_dict()
+            return digest
         except Exception as e:
             return [{
                 "id": "fallback-card",
@@ -250,8 +193,11 @@ def load_configs_or_defaults() -> Tuple[dict, dict]:
 
     tasks_cfg = read_yaml_if_exists("config/tasks.yaml") or {
         "data_collection": {
-            "description": "Récupère les cartes + détails (listes, dates, labels, commentaires).",
-            "expected_output": "JSON [{id, name, list_name, due, last_activity, labels[], comments[]}]"
+            "description": (
+                "Récupère la synthèse du board (compteurs, WIP par liste, retards, cartes actives) "
+                "et les détails des cartes critiques si besoin."
+            ),
+            "expected_output": "Synthèse JSON du board + détails des cartes critiques"
         },
         "data_analysis": {
             "description": (
@@ -273,13 +219,15 @@ def load_configs_or_defaults() -> Tuple[dict, dict]:
 # -----------------------------
 # Création Crew, Agents & Tasks
 # -----------------------------
-def build_crew(trello_client: TrelloClient, model_name: str) -> Crew:
+def build_crew(context: BoardContext, model_name: str, digest_budget: int = 3000) -> Crew:
+    """Crew indépendante du board : les outils lisent le board actif via `context.use(...)`."""
     agents_cfg, tasks_cfg = load_configs_or_defaults()
 
     os.environ["OPENAI_MODEL_NAME"] = model_name
 
-    board_tool = BoardDataFetcherTool(trello_client)
-    card_tool = CardDataFetcherTool(trello_client)
+    # un seul instantané par board et par run : les deux outils le partagent via le contexte
+    board_tool = BoardDataFetcherTool(context, token_budget=digest_budget)
+    card_tool = CardDataFetcherTool(context)
 
     data_collection_agent = Agent(
         config=agents_cfg["data_collection_agent"],
@@ -329,6 +277,108 @@ def send_to_slack_if_configured(text: str, file_path: Optional[Path] = None) ->
         print(f"ℹ️ Slack non configuré/erreur: {e}")
 
 
+# -----------------------------
+# Exécution & sorties
+# -----------------------------
+def write_outputs(out_dir: Path, result: Any, crew: Crew, elapsed: float, ledger: CostLedger, model: str,
+                  label: str = "default", extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Écrit rapport_sprint.md + usage_metrics.json dans `out_dir` ; l'usage est ajouté au `ledger`."""
+    md_path = out_dir / "rapport_sprint.md"
+    usage_path = out_dir / "usage_metrics.json"
+
+    # Le résultat CrewAI expose souvent .raw (markdown) et .usage_metrics
+    markdown = getattr(result, "raw", None) or str(result)
+
+    md_path.write_text(markdown, encoding="utf-8")
+    print(f"✅ Rapport Markdown : {md_path}")
+
+    # Coûts & métriques : tarif du modèle, entrée / entrée en cache / sortie facturées séparément
+    usage = getattr(crew, "usage_metrics", None)
+    usage_payload: Dict[str, Any] = {"elapsed_sec": round(elapsed, 2), "model": model}
+    usage_payload.update(usage_dict(usage))
+    cost = ledger.add_usage(model, usage, label=label)
+    usage_payload["estimated_cost_usd"] = None if cost is None else round(cost, 6)
+    usage_payload.update(extra or {})  # board_digest : raw_tokens / digest_tokens / tokens_saved …
+
+    usage_path.write_text(json.dumps(usage_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"📊 Métriques usage : {usage_path}")
+    return usage_payload
+
+
+def load_board_ids(spec: str) -> List[str]:
+    """`--boards` : fichier (un id par ligne, # commentaire) ou liste séparée par des virgules."""
+    if os.path.isfile(spec):
+        lines = Path(spec).read_text(encoding="utf-8").splitlines()
+        ids = [line.split("#", 1)[0].strip() for line in lines]
+    else:
+        ids = [part.strip() for part in spec.split(",")]
+    return list(dict.fromkeys(i for i in ids if i))
+
+
+def run_boards(board_ids: List[str], trello_client: TrelloClient, context: BoardContext, crew: Crew,
+               out_root: Path, ledger: CostLedger, model: str, parallel: int = 4,
+               fetch_workers: int = 8) -> Dict[str, Any]:
+    """
+    Mode --boards : agents et outils construits une fois, une copie de la crew par board.
+    Les boards sont préchargés en parallèle (`fetch_workers`) pendant que `parallel` crews tournent.
+    """
+    snapshots = {b: BoardSnapshot(trello_client.for_board(b)) for b in board_ids}
+
+    def _fetch(snapshot: BoardSnapshot) -> float:
+        t0 = time.time()
+        with span(f"fetch board {snapshot.client.cfg.board_id}", "fetch"):
+            snapshot.cards()
+        return time.time() - t0
+
+    def _run(board_id: str) -> Dict[str, Any]:
+        row: Dict[str, Any] = {"board_id": board_id, "status": "ok"}
+        t0 = time.time()
+        try:
+            row["fetch_sec"] = round(fetches[board_id].result(), 2)  # attend le préchargement du board
+            run_stats: Dict[str, Any] = {}
+            board_crew = crew.copy()  # crewai : état de kickoff propre à chaque copie, outils partagés
+            instrument_crew(board_crew)  # les tâches copiées ne portent pas l'instrumentation du modèle
+            t1 = time.time()
+            with context.use(snapshots[board_id], run_stats), span(f"crew board {board_id}", "crew"):
+                result = board_crew.kickoff()
+            row["crew_sec"] = round(time.time() - t1, 2)
+            usage = write_outputs(ensure_dir(out_root / board_id), result, board_crew, time.time() - t0,
+                                  ledger, model, label=board_id, extra=run_stats)
+            row.update({k: usage.get(k) for k in ("total_tokens", "estimated_cost_usd")})
+        except Exception as e:
+            row.update({"status": "error", "error": str(e)})
+            print(f"❌ Board {board_id} : {e}")
+        row["elapsed_sec"] = round(time.time() - t0, 2)
+        return row
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as fetch_pool, \
+            ThreadPoolExecutor(max_workers=max(1, parallel)) as crew_pool:
+        fetches = {b: fetch_pool.submit(_fetch, snapshots[b]) for b in board_ids}
+        rows = list(crew_pool.map(_run, board_ids))
+
+    ok = [r for r in rows if r["status"] == "ok"]
+    return {
+        "boards": len(rows),
+        "ok": len(ok),
+        "failed": len(rows) - len(ok),
+        "elapsed_sec": round(time.time() - t0, 2),
+        "total_tokens": sum(r.get("total_tokens") or 0 for r in ok),
+        "estimated_cost_usd": ledger.summary()["total_cost_usd"],
+        "costs": ledger.summary(),
+        "per_board": rows,
+    }
+
+
+def report_trace() -> None:
+    tracer = tracing.get_tracer()
+    if tracer is None:
+        return
+    path = tracer.export()
+    timings = ", ".join(f"{cat} {v['total_sec']}s/{int(v['count'])}" for cat, v in tracer.summary().items())
+    print(f"⏱️ Trace : {path} ({timings})")
+
+
 # -----------------------------
 # Main
 # -----------------------------
@@ -346,61 +396,84 @@ def main() -> int:
     # Args
     parser = argparse.ArgumentParser(description="Génère un rapport de progression projet depuis Trello avec CrewAI.")
     parser.add_argument("--board-id", type=str, default=os.getenv("TRELLO_BOARD_ID"), help="ID du board Trello")
+    parser.add_argument("--boards", type=str, help="Plusieurs boards : ids séparés par des virgules ou fichier (un id par ligne)")
+    parser.add_argument("--parallel", type=int, default=int(os.getenv("BOARDS_PARALLEL", "4")),
+                        help="Mode --boards : crews exécutées en parallèle")
+    parser.add_argument("--fetch-workers", type=int, default=int(os.getenv("BOARDS_FETCH_WORKERS", "8")),
+                        help="Mode --boards : boards Trello préchargés en parallèle")
     parser.add_argument("--model", type=str, default=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"), help="Modèle OpenAI")
+    parser.add_argument("--digest-budget", type=int, default=int(os.getenv("BOARD_DIGEST_TOKEN_BUDGET", "3000")),
+                        help="Budget (tokens) de la synthèse du board donnée à l'agent ; 0 = cartes brutes")
+    parser.add_argument("--trace", type=str, default=os.getenv("TRACE_FILE"),
+                        help="Fichier Chrome Trace JSON (tâches, outils, HTTP Trello, appels LLM) — Perfetto / chrome://tracing")
     args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
 
-    if not args.board_id:
-        print("❌ TRELLO_BOARD_ID manquant (argument --board-id ou variable d'environnement).")
+    board_ids = load_board_ids(args.boards) if args.boards else []
+    if not board_ids and not args.board_id:
+        print("❌ TRELLO_BOARD_ID manquant (argument --board-id / --boards ou variable d'environnement).")
         return 1
 
     # Trello client
     trello_cfg = TrelloConfig(
         api_key=os.getenv("TRELLO_API_KEY", ""),
         api_token=os.getenv("TRELLO_API_TOKEN", ""),
-        board_id=args.board_id,
+        board_id=board_ids[0] if board_ids else args.board_id,
         base_url=os.getenv("DLAI_TRELLO_BASE_URL", "https://api.trello.com")
     )
-    trello_client = TrelloClient(trello_cfg)
-
-    # Crew
-    crew = build_crew(trello_client, args.model)
+    # GET conditionnels (ETag / Last-Modified) : les cartes inchangées depuis le run précédent reviennent en 304
+    http_cache = default_http_cache()
+    trello_client = TrelloClient(trello_cfg, http_cache=http_cache)
+
+    # Crew (agents & outils construits une seule fois, quel que soit le nombre de boards)
+    context = BoardContext()
+    crew = build_crew(context, args.model, digest_budget=args.digest_budget)
+    instrument_crew(crew)
+    out_dir = ensure_dir("outputs")
+    ledger = CostLedger()
+    # historique cumulé des coûts (tous runs) : CostLedger.from_jsonl(...)
+    ledger_path = os.getenv("COSTS_LEDGER_PATH", str(out_dir / "costs_ledger.jsonl"))
+
+    if board_ids:
+        rollup = run_boards(board_ids, trello_client, context, crew, out_dir, ledger, args.model,
+                            parallel=args.parallel, fetch_workers=args.fetch_workers)
+        ledger.append_jsonl(ledger_path)
+        if http_cache is not None:
+            rollup["trello_http_cache"] = http_cache.stats.as_dict()
+        rollup_path = out_dir / "rollup_metrics.json"
+        rollup_path.write_text(json.dumps(rollup, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"📊 {rollup['ok']}/{rollup['boards']} boards en {rollup['elapsed_sec']}s → {rollup_path}")
+        send_to_slack_if_configured(
+            text=f"🎯 Rapports Sprint prêts : {rollup['ok']}/{rollup['boards']} boards "
+                 f"({rollup['elapsed_sec']}s, ~${rollup['estimated_cost_usd']})."
+        )
+        report_trace()
+        print("🚀 Terminé.")
+        return 0 if rollup["failed"] == 0 else 2
 
     # Exécution
+    run_stats: Dict[str, Any] = {}
     t0 = time.time()
-    result = crew.kickoff()
+    with context.use(BoardSnapshot(trello_client), run_stats), span("crew", "crew"):
+        result = crew.kickoff()
     elapsed = time.time() - t0
 
     # Sorties
-    out_dir = ensure_dir("outputs")
-    md_path = out_dir / "rapport_sprint.md"
-    usage_path = out_dir / "usage_metrics.json"
-
-    # Le résultat CrewAI expose souvent .raw (markdown) et .usage_metrics
-    markdown = getattr(result, "raw", None) or str(result)
-
-    md_path.write_text(markdown, encoding="utf-8")
-    print(f"✅ Rapport Markdown : {md_path}")
-
-    # Coûts & métriques (estimation simple si usage dispo)
-    usage = getattr(crew, "usage_metrics", None)
-    usage_payload: Dict[str, Any] = {"elapsed_sec": round(elapsed, 2)}
-    if usage and hasattr(usage, "dict"):
-        u = usage.dict()
-        usage_payload.update(u)
-        # estimation: $0.150 / 1M tokens (exemple) -> adapte si besoin
-        total_tokens = (u.get("prompt_tokens") or 0) + (u.get("completion_tokens") or 0)
-        cost_usd = 0.150 * (total_tokens / 1_000_000)
-        usage_payload["estimated_cost_usd"] = round(cost_usd, 6)
-
-    usage_path.write_text(json.dumps(usage_payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"📊 Métriques usage : {usage_path}")
+    if http_cache is not None:
+        run_stats["trello_http_cache"] = http_cache.stats.as_dict()
+    write_outputs(out_dir, result, crew, elapsed, ledger, args.model, label=args.board_id, extra=run_stats)
+    ledger.append_jsonl(ledger_path)
+    if "board_digest" in run_stats:
+        print(f"✂️ Synthèse board : {run_stats['board_digest']['tokens_saved']} tokens économisés")
 
     # Slack (optionnel)
     send_to_slack_if_configured(
         text=f"🎯 Synthèse Sprint prête. Durée exécution: {round(elapsed,1)}s",
-        file_path=md_path
+        file_path=out_dir / "rapport_sprint.md"
     )
 
+    report_trace()
     print("🚀 Terminé.")
     return 0
 
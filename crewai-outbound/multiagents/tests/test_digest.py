@@ -0,0 +1,23 @@
+import pytest
+
+from digest import list_status
+
+
+@pytest.mark.parametrize("name, status", [
+    ("Done", "done"), ("Terminé", "done"), ("Livrés", "done"), ("Archive", "done"),
+    ("Backlog", "not_started"), ("À faire", "not_started"), ("To-Do", "not_started"), ("Idées", "not_started"),
+    ("En cours", "in_progress"), ("QA", "in_progress"), ("Tests", "in_progress"), ("Bloqué", "in_progress"),
+])
+def test_known_list_names(name, status):
+    assert list_status(name) == status
+
+
+@pytest.mark.parametrize("name", ["Livres à lire", "Contest", "Aquaqa", "Fournitures"])
+def test_keywords_match_whole_words_only(name):
+    # aucun mot-clé entier : liste inconnue → en cours (et surtout pas « terminé »)
+    assert list_status(name) == "in_progress"
+
+
+def test_backlog_with_lookalike_word_stays_not_started():
+    assert list_status("Backlog aquatique") == "not_started"
+    assert list_status("Contest backlog") == "not_started"
@@ -0,0 +1,206 @@
+# Module partagé — copie canonique : crewai-outbound/planification_projet/src/tracing.py
+# Ne pas modifier les copies : python scripts/sync_shared_modules.py
+"""
+Traces locales des chemins chauds : tâches CrewAI, outils, appels HTTP, appels LLM.
+
+Chaque span est un événement « complete » (ph = X) du format Chrome Trace, exporté dans un fichier JSON
+ouvrable tel quel dans https://ui.perfetto.dev ou chrome://tracing — pas de collecteur à déployer.
+Un thread = une ligne (tid) : en mode parallèle, chaque board / lead a sa propre piste.
+
+Activation : `tracing.enable("outputs/trace.json")` ou variable TRACE_FILE (export automatique à la sortie).
+Désactivé, `span()` ne coûte qu'un test de booléen.
+
+    from tracing import instrument_crew, span
+    instrument_crew(crew)                 # tâches + outils des agents + appels OpenAI
+    with span("trello GET", "http", path=path):
+        ...
+"""
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+
+class Tracer:
+    """Collecte thread-safe des spans terminés, en microsecondes depuis le démarrage du traceur."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.events: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def now_us(self) -> float:
+        return (time.perf_counter() - self._t0) * 1e6
+
+    def record(self, name: str, cat: str, start_us: float, dur_us: float, args: Dict[str, Any]) -> None:
+        event = {"name": name, "cat": cat, "ph": "X", "ts": round(start_us, 1), "dur": round(dur_us, 1),
+                 "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+        with self._lock:
+            self.events.append(event)
+
+    def export(self, path: Optional[str] = None) -> str:
+        path = path or self.path
+        with self._lock:
+            events = list(self.events)
+        threads = {e["tid"] for e in events}
+        names = {t.ident: t.name for t in threading.enumerate()}
+        meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                 "args": {"name": names.get(tid, f"thread-{tid}")}} for tid in threads]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+        return path
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Durée totale (s) et nombre de spans par catégorie."""
+        out: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for e in self.events:
+                row = out.setdefault(e["cat"], {"count": 0, "total_sec": 0.0})
+                row["count"] += 1
+                row["total_sec"] = round(row["total_sec"] + e["dur"] / 1e6, 3)
+        return out
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable(path: str) -> Tracer:
+    """Active la collecte ; le fichier est écrit à la sortie du processus (ou via `get_tracer().export()`)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+        atexit.register(_tracer.export)
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def _span(tracer: Tracer, name: str, cat: str, args: Dict[str, Any]):
+    start = tracer.now_us()
+    try:
+        yield args  # l'appelant peut compléter les args (statut HTTP, tokens…)
+    except BaseException as e:
+        args["error"] = repr(e)[:200]
+        raise
+    finally:
+        tracer.record(name, cat, start, tracer.now_us() - start, args)
+
+
+def span(name: str, cat: str = "app", **args: Any):
+    """Context manager de span (no-op si le traçage est désactivé)."""
+    tracer = _tracer
+    if tracer is None:
+        return nullcontext(args)
+    return _span(tracer, name, cat, args)
+
+
+def traced(name: str, cat: str = "app"):
+    """Décorateur : un span par appel."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            with span(name, cat):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+
+# ---------- Instrumentation CrewAI / OpenAI ----------
+def _wrap_instance(obj: Any, method: str, name: str, cat: str) -> bool:
+    """Remplace `obj.method` par une version tracée (modèles pydantic : sans passer par la validation)."""
+    fn = getattr(obj, method, None)
+    if fn is None or getattr(fn, "__traced__", False):
+        return False
+
+    @functools.wraps(fn)
+    def wrapper(*a, **kw):
+        with span(name, cat):
+            return fn(*a, **kw)
+
+    wrapper.__traced__ = True  # type: ignore[attr-defined]
+    object.__setattr__(obj, method, wrapper)
+    return True
+
+
+def _task_name(task: Any) -> str:
+    name = getattr(task, "name", None) or os.path.basename(getattr(task, "output_file", None) or "")
+    return name or " ".join((getattr(task, "description", "") or "task").split())[:60]
+
+
+def instrument_tasks(tasks) -> None:
+    """Span par exécution de tâche (cœur commun sync/async : `_execute_core` crewai ≥ 0.51, `_execute` en 0.28)."""
+    for task in tasks:
+        for method in ("_execute_core", "_execute"):
+            if hasattr(task, method):
+                _wrap_instance(task, method, f"task: {_task_name(task)}", "task")
+                break
+
+
+def instrument_tools(tools) -> None:
+    """Span par appel d'outil (`_run`)."""
+    for tool in tools or []:
+        _wrap_instance(tool, "_run", f"tool: {getattr(tool, 'name', type(tool).__name__)}", "tool")
+
+
+_openai_patched = False
+_patch_lock = threading.Lock()
+
+
+def instrument_openai() -> None:
+    """Span par appel chat completion / embeddings du SDK openai (utilisé par langchain et litellm)."""
+    global _openai_patched
+    with _patch_lock:
+        if _openai_patched:
+            return
+        try:
+            from openai.resources.chat.completions import Completions
+            from openai.resources.embeddings import Embeddings
+        except Exception:
+            return  # SDK openai absent : rien à tracer
+        for cls, label in ((Completions, "chat.completions"), (Embeddings, "embeddings")):
+            original = cls.create
+
+            @functools.wraps(original)
+            def create(self, *a, _original=original, _label=label, **kw):
+                with span(f"llm: {_label}", "llm", model=kw.get("model")) as args:
+                    resp = _original(self, *a, **kw)
+                    usage = getattr(resp, "usage", None)
+                    if usage is not None:
+                        args["prompt_tokens"] = getattr(usage, "prompt_tokens", None)
+                        args["completion_tokens"] = getattr(usage, "completion_tokens", None)
+                    return resp
+
+            cls.create = create
+        _openai_patched = True
+
+
+def instrument_crew(crew: Any) -> None:
+    """Tâches de la crew, outils de ses agents et de ses tâches, appels OpenAI. No-op si désactivé."""
+    if not enabled():
+        return
+    tasks = list(getattr(crew, "tasks", None) or [])
+    instrument_tasks(tasks)
+    for agent in getattr(crew, "agents", None) or []:
+        instrument_tools(getattr(agent, "tools", None))
+    for task in tasks:
+        instrument_tools(getattr(task, "tools", None))
+    instrument_openai()
+
+
+if os.getenv("TRACE_FILE"):
+    enable(os.environ["TRACE_FILE"])
@@ -0,0 +1,332 @@
+# trello.py
+from __future__ import annotations
+
+import copy
+import dataclasses
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from http_cache import HttpCache, request_key
+from tracing import span
+
+CARD_FIELDS = "name,idList,due,dateLastActivity,labels,shortUrl"
+ACTIONS_PAGE = 1000  # plafond Trello pour /boards/{id}/actions
+# Trello : 100 requêtes / 10 s par token → marge sous la limite
+RATE_PER_SEC = float(os.getenv("TRELLO_RATE_PER_SEC", "9"))
+MAX_WORKERS = int(os.getenv("TRELLO_MAX_WORKERS", "8"))
+
+
+# -----------------------------
+# Trello API Client robuste
+# -----------------------------
+@dataclass
+class TrelloConfig:
+    api_key: str
+    api_token: str
+    board_id: str
+    base_url: str = os.getenv("DLAI_TRELLO_BASE_URL", "https://api.trello.com")
+
+
+class TokenBucket:
+    """
+    Seau à jetons partagé par les threads : `rate` requêtes/s en régime, rafales jusqu'à `capacity`.
+    `pause(s)` (429 reçu) suspend tous les appelants jusqu'à la fin du délai.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._resume_at:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._resume_at - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._resume_at
+
+
+@dataclass
+class BoardData:
+    """Board complet récupéré en vrac : cartes, noms de listes, commentaires groupés par carte."""
+    cards: List[Dict[str, Any]]
+    list_names: Dict[str, str]
+    comments_by_card: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    comments_complete: bool = True  # False si la pagination des actions a été tronquée (max_pages)
+
+
+class TrelloClient:
+    """
+    Client Trello avec session, timeouts et retries.
+    Sûr entre threads : un seul `requests.Session` (pool de `max_workers` connexions keep-alive) et un seau
+    à jetons commun ; les 429 sont traités ici (Retry-After) plutôt que par urllib3, pour ralentir tous les threads.
+    Avec `http_cache`, chaque GET est conditionnel (ETag / Last-Modified) et un 304 est servi depuis le disque.
+    """
+
+    def __init__(self, cfg: TrelloConfig, timeout: float = 10.0, max_retries: int = 3,
+                 max_workers: int = MAX_WORKERS, rate_per_sec: float = RATE_PER_SEC,
+                 http_cache: Optional[HttpCache] = None) -> None:
+        self.cfg = cfg
+        self.http_cache = http_cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate_per_sec, capacity=max(1.0, rate_per_sec))
+        self.throttled = 0  # nombre de 429 reçus
+        self._stats_lock = threading.Lock()
+        self.session = requests.Session()
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"])
+        )
+        adapter = HTTPAdapter(max_retries=retries, pool_connections=1, pool_maxsize=max(10, max_workers))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def for_board(self, board_id: str) -> "TrelloClient":
+        """Client pour un autre board partageant session, seau à jetons et cache HTTP (même token = même quota)."""
+        clone = copy.copy(self)
+        clone.cfg = dataclasses.replace(self.cfg, board_id=board_id)
+        return clone
+
+    def _params(self, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        base = {"key": self.cfg.api_key, "token": self.cfg.api_token}
+        if extra:
+            base.update(extra)
+        return base
+
+    @staticmethod
+    def _retry_after(r: requests.Response, attempt: int) -> float:
+        try:
+            return max(0.0, float(r.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            return min(10.0, 0.5 * 2 ** attempt)
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        url, params = f"{self.cfg.base_url}{path}", self._params(params)
+        key = request_key(url, params) if self.http_cache is not None else None
+        headers = self.http_cache.validators(key) if key else {}
+        with span("trello GET", "http", path=path) as trace_args:
+            for attempt in range(self.max_retries + 1):
+                with span("rate limit wait", "http"):
+                    self.bucket.acquire()
+                r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                trace_args.update(status=r.status_code, attempts=attempt + 1)
+                if r.status_code == 304 and key:
+                    body = self.http_cache.not_modified(key)
+                    if body is not None:
+                        return json.loads(body)
+                    headers = {}  # entrée évincée entre-temps : on redemande le corps
+                    continue
+                if r.status_code != 429 or attempt == self.max_retries:
+                    break
+                with self._stats_lock:
+                    self.throttled += 1
+                self.bucket.pause(self._retry_after(r, attempt))
+            r.raise_for_status()
+            if key:
+                self.http_cache.store(key, r.headers.get("ETag"), r.headers.get("Last-Modified"), r.content)
+            trace_args["bytes"] = len(r.content)
+            return r.json()
+
+    def get_cards_basic(self) -> List[Dict[str, Any]]:
+        """Cartes du board (infos principales)."""
+        return self._get(f"/1/boards/{self.cfg.board_id}/cards", {
+            "fields": CARD_FIELDS,
+            "attachments": "true",
+        })
+
+    def get_card(self, card_id: str) -> Dict[str, Any]:
+        """Une carte par id (mêmes champs que `get_cards_basic`)."""
+        return self._get(f"/1/cards/{card_id}", {"fields": CARD_FIELDS, "attachments": "true"})
+
+    def get_card_comments(self, card_id: str) -> List[Dict[str, Any]]:
+        """Commentaires d'une carte."""
+        return self._get(f"/1/cards/{card_id}/actions", {"filter": "commentCard", "limit": 1000})
+
+    def get_list_name(self, list_id: str) -> str:
+        """Nom d'une liste depuis son id."""
+        data = self._get(f"/1/lists/{list_id}", {"fields": "name"})
+        return data.get("name", list_id)
+
+    def map_concurrent(self, fn, items: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """{item: fn(item)} sur le pool du client ; `default` pour un item en erreur (tolérance réseau)."""
+        def _safe(item: str) -> Any:
+            try:
+                return fn(item)
+            except Exception:
+                return default
+
+        items = list(dict.fromkeys(items))
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(items) or 1))) as pool:
+            return dict(zip(items, pool.map(_safe, items)))
+
+    def get_cards_comments(self, card_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Commentaires de plusieurs cartes en parallèle ([] pour une carte en erreur)."""
+        return self.map_concurrent(self.get_card_comments, card_ids, default=[])
+
+    # ---------- Chemin vrac (quelques requêtes par board au lieu d'une par carte) ----------
+    def get_board_comments(self, before: Optional[str] = None, limit: int = ACTIONS_PAGE) -> List[Dict[str, Any]]:
+        """Une page d'actions commentCard du board, de la plus récente à la plus ancienne."""
+        params: Dict[str, Any] = {"filter": "commentCard", "limit": limit, "memberCreator_fields": "fullName"}
+        if before:
+            params["before"] = before
+        return self._get(f"/1/boards/{self.cfg.board_id}/actions", params)
+
+    def get_board_bulk(self, max_pages: int = 20) -> BoardData:
+        """
+        Cartes + listes + premiers commentaires en une requête (ressources imbriquées du board),
+        puis pages suivantes de /boards/{id}/actions (`before` = id de la plus ancienne action reçue).
+        """
+        board = self._get(f"/1/boards/{self.cfg.board_id}", {
+            "fields": "name",
+            "cards": "open",
+            "card_fields": CARD_FIELDS,
+            "card_attachments": "true",
+            "lists": "all",
+            "list_fields": "name",
+            "actions": "commentCard",
+            "actions_limit": ACTIONS_PAGE,
+            "action_memberCreator_fields": "fullName",
+        })
+        actions = list(board.get("actions") or [])
+        page, pages = actions, 1
+        while len(page) >= ACTIONS_PAGE and pages < max_pages:
+            page = self.get_board_comments(before=page[-1]["id"])
+            actions.extend(page)
+            pages += 1
+
+        comments_by_card: Dict[str, List[Dict[str, Any]]] = {}
+        for a in actions:
+            card_id = (((a.get("data") or {}).get("card")) or {}).get("id")
+            if card_id and a.get("type", "commentCard") == "commentCard":
+                comments_by_card.setdefault(card_id, []).append(a)
+
+        return BoardData(
+            cards=board.get("cards") or [],
+            list_names={lst["id"]: lst.get("name", lst["id"]) for lst in board.get("lists") or []},
+            comments_by_card=comments_by_card,
+            comments_complete=len(page) < ACTIONS_PAGE,
+        )
+
+
+# -----------------------------
+# Mise en forme des cartes
+# -----------------------------
+def format_comment(action: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "date": action.get("date"),
+        "member": (action.get("memberCreator", {}) or {}).get("fullName"),
+        "text": ((action.get("data", {}) or {}).get("text") or "").strip()
+    }
+
+
+def format_card(card: Dict[str, Any], list_name: str, comments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "id": card.get("id"),
+        "name": card.get("name"),
+        "list_name": list_name,
+        "due": card.get("due"),
+        "last_activity": card.get("dateLastActivity"),
+        "labels": [lbl.get("name") or lbl.get("color") for lbl in (card.get("labels") or [])],
+        "shortUrl": card.get("shortUrl"),
+        "comments": comments
+    }
+
+
+def enrich_cards_with_details(client: TrelloClient, cards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ajoute list_name + comments à chaque carte (une requête par carte, en parallèle sous rate limit)."""
+    list_names = client.map_concurrent(client.get_list_name, [c.get("idList", "") for c in cards])
+    raw_comments = client.get_cards_comments([c["id"] for c in cards])
+
+    enriched: List[Dict[str, Any]] = []
+    for c in cards:
+        list_id = c.get("idList", "")
+        comments = [format_comment(a) for a in raw_comments.get(c["id"]) or [] if a.get("type") == "commentCard"]
+        enriched.append(format_card(c, list_names.get(list_id) or list_id, comments))
+    return enriched
+
+
+def enrich_board(client: TrelloClient, board: Optional[BoardData] = None) -> List[Dict[str, Any]]:
+    """Même résultat que `enrich_cards_with_details` sur tout le board, jointure en mémoire du chemin vrac."""
+    board = board or client.get_board_bulk()
+    comments_by_card = board.comments_by_card
+    if not board.comments_complete:
+        # trop d'actions pour la pagination board : repli carte par carte, en parallèle
+        print(f"ℹ️ Historique des commentaires tronqué : récupération par carte ({len(board.cards)} cartes).")
+        comments_by_card = client.get_cards_comments([c["id"] for c in board.cards])
+    return [
+        format_card(
+            c,
+            board.list_names.get(c.get("idList", ""), c.get("idList", "")),
+            [format_comment(a) for a in comments_by_card.get(c.get("id")) or [] if a.get("type", "commentCard") == "commentCard"],
+        )
+        for c in board.cards
+    ]
+
+
+# -----------------------------
+# Instantané du board (partagé par les outils d'un run)
+# -----------------------------
+class BoardSnapshot:
+    """
+    Board enrichi chargé une fois par run (chemin vrac), indexé par id de carte.
+    Les outils de la crew lisent tous cet instantané : un lookup carte est O(1) et sans réseau.
+    Une carte absente (archivée, créée depuis) est lue via `get_card` puis ajoutée à l'index.
+    """
+
+    def __init__(self, client: TrelloClient) -> None:
+        self.client = client
+        self._cards: Optional[List[Dict[str, Any]]] = None
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def cards(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._cards is None:
+                self._cards = enrich_board(self.client)
+                self._index = {c["id"]: c for c in self._cards}
+            return self._cards
+
+    def card(self, card_id: str) -> Optional[Dict[str, Any]]:
+        self.cards()
+        card = self._index.get(card_id)
+        if card is None:
+            try:
+                raw = self.client.get_card(card_id)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code in (400, 404):
+                    return None
+                raise
+            card = enrich_cards_with_details(self.client, [raw])[0]
+            with self._lock:
+                self._index[card_id] = card
+        return card
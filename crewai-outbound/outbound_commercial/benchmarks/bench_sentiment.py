@@ -0,0 +1,84 @@
+"""
+Benchmark du scoring de sentiment local (lexique) vs labels de référence.
+
+    python benchmarks/bench_sentiment.py                      # hors-ligne
+    python benchmarks/bench_sentiment.py --record             # ré-étiquette le corpus via GPT (OPENAI_API_KEY)
+
+Le corpus (`fixtures/sentiment_corpus.jsonl`, champs `text` + `ref_label`) est livré avec des labels
+annotés à la main : ce ne sont PAS des sorties du LLM. `--record` les remplace par ceux de
+`analyse_sentiments_batch` et marque chaque ligne `"ref_source": "llm"`.
+Affiche le débit local (textes/s), l'accord global avec les labels de référence (source indiquée),
+et pour chaque seuil de confiance : part des textes routés vers GPT et accord sur ceux tranchés localement.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sentiment_lexicon import score_sentiment  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).with_name("fixtures") / "sentiment_corpus.jsonl"
+
+
+def load_corpus(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record(path: Path, corpus: list[dict]) -> None:
+    from sentiment import analyse_sentiments_batch
+
+    labels = analyse_sentiments_batch([row["text"] for row in corpus])
+    with path.open("w", encoding="utf-8") as f:
+        for row, label in zip(corpus, labels):
+            f.write(json.dumps({"text": row["text"], "ref_label": label, "ref_source": "llm"},
+                               ensure_ascii=False) + "\n")
+    print(f"✅ {len(corpus)} labels LLM enregistrés dans {path}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark sentiment local vs labels de référence.")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--repeat", type=int, default=200, help="Répétitions du corpus pour mesurer le débit")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.0, 0.5, 0.6, 0.75, 0.9])
+    parser.add_argument("--record", action="store_true", help="Ré-étiquette le corpus via GPT avant le benchmark")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if args.record:
+        record(args.corpus, corpus)
+        corpus = load_corpus(args.corpus)
+
+    texts = [row["text"] for row in corpus]
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for text in texts:
+            score_sentiment(text)
+    elapsed = time.perf_counter() - t0
+    print(f"Débit local : {len(texts) * args.repeat / elapsed:,.0f} textes/s ({len(texts)} textes × {args.repeat})")
+
+    scored = [(score_sentiment(row["text"]), row["ref_label"]) for row in corpus]
+    agree = sum(1 for (label, _), ref in scored if label == ref)
+    sources = sorted({row.get("ref_source", "main") for row in corpus})
+    source = {"main": "annotés à la main", "llm": "produits par le LLM"}
+    print(f"Accord global avec les labels de référence ({', '.join(source.get(s, s) for s in sources)}) : "
+          f"{agree}/{len(scored)} ({agree / len(scored):.0%})")
+
+    print(f"\n{'seuil':>6} {'vers GPT':>9} {'tranchés':>9} {'accord local':>13}")
+    for threshold in args.thresholds:
+        local = [(label, ref) for (label, conf), ref in scored if conf >= threshold]
+        routed = len(scored) - len(local)
+        ok = sum(1 for label, ref in local if label == ref)
+        rate = f"{ok / len(local):.0%}" if local else "-"
+        print(f"{threshold:>6.2f} {routed / len(scored):>9.0%} {len(local):>9} {rate:>13}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import csv, hashlib, json, os, re, time, unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+from loguru import logger
+
+# Colonnes acceptées dans le fichier de leads (CSV ou JSONL) → clés d'inputs de la crew
+FIELD_ALIASES = {
+    "lead_name": ("lead_name", "lead"),
+    "industry": ("industry",),
+    "key_decision_maker": ("key_decision_maker", "dm"),
+    "position": ("position",),
+    "milestone": ("milestone",),
+}
+
+def _pick(row: dict, names) -> str:
+    for name in names:
+        if row.get(name):
+            return str(row[name]).strip()
+    return ""
+
+def load_leads(path: str) -> List[dict]:
+    """Lit un CSV (en-têtes) ou un JSONL et normalise chaque lead en dict d'inputs."""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    leads = []
+    for n, row in enumerate(rows, start=1):
+        lead = {key: _pick(row, names) for key, names in FIELD_ALIASES.items()}
+        missing = [k for k, v in lead.items() if not v]
+        if missing:
+            raise ValueError(f"{path} ligne {n}: champs manquants {missing}")
+        leads.append(lead)
+    return leads
+
+def lead_slug(lead: dict) -> str:
+    """
+    Identifiant stable d'un lead → nom de dossier de sortie (et clé de reprise via status.json).
+    Entreprise + décideur lisibles, suffixés d'une empreinte de tous les inputs : deux leads pour
+    le même contact avec un autre jalon (ou autre champ) ont chacun leur dossier.
+    """
+    raw = f"{lead['lead_name']}--{lead['key_decision_maker']}"
+    raw = unicodedata.normalize("NFKD", raw).encode("ascii", "ignore").decode("ascii").lower()
+    digest = hashlib.sha1(json.dumps(lead, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^a-z0-9-]+', '-', raw).strip('-')[:70]}-{digest}"
+
+def usage_tokens(crew) -> int:
+    """Total de tokens d'une crew (dict en crewai 0.28, objet UsageMetrics ensuite)."""
+    usage = getattr(crew, "usage_metrics", None) or {}
+    if not isinstance(usage, dict):
+        usage = usage.dict() if hasattr(usage, "dict") else {}
+    return int(usage.get("total_tokens") or 0)
+
+@dataclass
+class BatchSummary:
+    total: int = 0
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    tokens: int = 0
+    elapsed_sec: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        minutes = self.elapsed_sec / 60 if self.elapsed_sec else 0
+        return {
+            "total": self.total, "done": self.done, "skipped": self.skipped, "failed": self.failed,
+            "elapsed_sec": round(self.elapsed_sec, 1),
+            "leads_per_min": round(self.done / minutes, 2) if minutes else 0.0,
+            "tokens_per_lead": round(self.tokens / self.done) if self.done else 0,
+            "tokens_total": self.tokens,
+            "errors": self.errors,
+        }
+
+def _write_json(path: str, payload) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp, path)  # écriture atomique : un crash ne laisse pas de status.json tronqué
+
+def is_done(lead_dir: str) -> bool:
+    try:
+        with open(os.path.join(lead_dir, "status.json"), encoding="utf-8") as f:
+            return json.load(f).get("status") == "done"
+    except (OSError, ValueError):
+        return False
+
+def run_leads(leads: List[dict], run_one: Callable[[dict, str], dict], out_root: str = "outputs/leads",
+              concurrency: int = 2) -> BatchSummary:
+    """
+    Exécute `run_one(lead, lead_dir)` pour chaque lead, `concurrency` à la fois, dans un seul process.
+    Reprise : un lead dont `status.json` vaut `done` est sauté ; les leads en erreur sont rejoués.
+    `run_one` retourne un dict (au moins `tokens`) enregistré dans status.json.
+    """
+    summary = BatchSummary(total=len(leads))
+    todo = []
+    for lead in leads:
+        lead_dir = os.path.join(out_root, lead_slug(lead))
+        if is_done(lead_dir):
+            summary.skipped += 1
+            continue
+        os.makedirs(lead_dir, exist_ok=True)
+        todo.append((lead, lead_dir))
+    logger.info(f"{len(todo)} leads à traiter ({summary.skipped} déjà faits), concurrence={concurrency}")
+
+    def _job(lead: dict, lead_dir: str) -> dict:
+        t0 = time.time()
+        info = run_one(lead, lead_dir) or {}
+        info.update({"status": "done", "elapsed_sec": round(time.time() - t0, 2), "inputs": lead})
+        _write_json(os.path.join(lead_dir, "status.json"), info)
+        return info
+
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(_job, lead, lead_dir): (lead, lead_dir) for lead, lead_dir in todo}
+        for fut in as_completed(futures):
+            lead, lead_dir = futures[fut]
+            try:
+                info = fut.result()
+                summary.done += 1
+                summary.tokens += int(info.get("tokens") or 0)
+                logger.info(f"✅ {lead['lead_name']} / {lead['key_decision_maker']} ({info['elapsed_sec']}s)")
+            except Exception as e:
+                summary.failed += 1
+                summary.errors[lead_slug(lead)] = str(e)
+                _write_json(os.path.join(lead_dir, "status.json"), {"status": "error", "error": str(e), "inputs": lead})
+                logger.error(f"❌ {lead['lead_name']} / {lead['key_decision_maker']}: {e}")
+    summary.elapsed_sec = time.time() - t0
+
+    _write_json(os.path.join(out_root, "summary.json"), summary.as_dict())
+    return summary
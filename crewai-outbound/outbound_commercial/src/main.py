@@ -1,5 +1,5 @@
 from __future__ import annotations
-import os, argparse, json, time
+import os, argparse, time
 from dotenv import load_dotenv
 from loguru import logger
 
@@ -13,31 +13,161 @@ from tools import build_tools
 from agents import build_agents
 from tasks import build_tasks
 from workflow import build_crew, run_workflow
-from sentiment import analyse_sentiment_gpt
+from sentiment import analyse_sentiment
+from batch import load_leads, run_leads, usage_tokens
+from prospect_cache import ProspectCache, output_text
+from runlog import RunLog
+import tracing
+from tracing import instrument_crew, span
+
+LEAD_ARGS = ("lead", "industry", "key_decision_maker", "position", "milestone")
 
 def parse_args():
     p = argparse.ArgumentParser(description="Outbound IA avec CrewAI")
-    p.add_argument("--lead", required=True, help="Nom du prospect (entreprise)")
-    p.add_argument("--industry", required=True, help="Secteur d’activité")
-    p.add_argument("--dm", dest="key_decision_maker", required=True, help="Décideur clé")
-    p.add_argument("--position", required=True, help="Poste du décideur")
-    p.add_argument("--milestone", required=True, help="Événement / actualité à exploiter")
+    p.add_argument("--lead", help="Nom du prospect (entreprise)")
+    p.add_argument("--industry", help="Secteur d’activité")
+    p.add_argument("--dm", dest="key_decision_maker", help="Décideur clé")
+    p.add_argument("--position", help="Poste du décideur")
+    p.add_argument("--milestone", help="Événement / actualité à exploiter")
     p.add_argument("--instructions_dir", default="data/instructions", help="Dossier des inputs locaux")
-    return p.parse_args()
+    p.add_argument("--leads-file", help="CSV ou JSONL de leads (lead, industry, dm, position, milestone) : mode batch")
+    p.add_argument("--concurrency", type=int, default=2, help="Mode batch : nombre de leads traités en parallèle")
+    p.add_argument("--prospect-max-age-days", type=float,
+                   default=float(os.getenv("PROSPECT_CACHE_MAX_AGE_DAYS", "7")),
+                   help="Réutilise le rapport prospect d'une entreprise s'il a moins de N jours (0 = pas de cache)")
+    p.add_argument("--refresh-prospect", action="store_true",
+                   help="Ignore les rapports prospect existants et relance la recherche web")
+    p.add_argument("--trace", default=os.getenv("TRACE_FILE"),
+                   help="Fichier Chrome Trace JSON (tâches, outils, appels LLM) à ouvrir dans Perfetto")
+    args = p.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+    if not args.leads_file:
+        missing = [f"--{a}" if a != "key_decision_maker" else "--dm" for a in LEAD_ARGS if not getattr(args, a)]
+        if missing:
+            p.error(f"arguments requis sans --leads-file : {', '.join(missing)}")
+    return args
 
 def ensure_dirs():
     os.makedirs("outputs", exist_ok=True)
     os.makedirs("data/instructions", exist_ok=True)
 
+def extract_campaign_text(result):
+    """Texte de campagne dans le résultat de la crew (fallbacks robustes)."""
+    if isinstance(result, str):
+        return result
+    campaign_text = None
+    for key in ("tasks", "results", "output"):
+        if isinstance(result, dict) and key in result:
+            maybe = result[key]
+            if isinstance(maybe, list) and len(maybe) >= 2 and isinstance(maybe[1], dict):
+                campaign_text = maybe[1].get("output") or maybe[1].get("result") or None
+                if campaign_text:
+                    break
+            if isinstance(maybe, str):
+                campaign_text = maybe
+    return campaign_text or getattr(result, "raw", None)
+
+def build_prospect_cache(args):
+    if args.prospect_max_age_days <= 0:
+        return None
+    return ProspectCache(os.getenv("PROSPECT_CACHE_DIR", "data/cache/prospects"),
+                         max_age_days=args.prospect_max_age_days,
+                         not_before=time.time() if args.refresh_prospect else 0.0)
+
+def build_run_log() -> RunLog:
+    return RunLog(os.getenv("RUN_LOG_PATH", os.path.join("outputs", "runs.jsonl")),
+                  max_bytes=int(float(os.getenv("RUN_LOG_MAX_MB", "20")) * 1024 * 1024))
+
+def run_lead(inputs: dict, output_dir: str, tools_common, search_tool, prospect_cache=None, run_log=None):
+    """
+    Une crew pour un lead ; retourne (crew, résultat, rapport_en_cache).
+    Si un rapport récent existe pour (entreprise, secteur), seule la campagne est générée.
+    Les événements (tâches, outils, tokens, sorties) sont journalisés au fil de l'eau dans `run_log`.
+    """
+    lead_name, industry = inputs["lead_name"], inputs["industry"]
+    report, claimed = None, False
+    if prospect_cache:
+        report = prospect_cache.get(lead_name, industry)
+        if report is None:
+            # un seul worker recherche une entreprise donnée ; les autres attendent puis relisent le cache
+            claimed = prospect_cache.claim(lead_name, industry)
+            report = prospect_cache.get(lead_name, industry)
+            if report and claimed:
+                prospect_cache.release(lead_name, industry)
+                claimed = False
+
+    try:
+        agents = build_agents()
+        if report:
+            logger.info(f"♻️ Rapport prospect en cache pour {lead_name} : recherche web sautée")
+            with open(os.path.join(output_dir, "prospect_report.md"), "w", encoding="utf-8") as f:
+                f.write(report)
+            tasks = build_tasks(*agents, tools_common=tools_common, search_tool=search_tool,
+                                output_dir=output_dir, cached_report=True)
+            inputs = {**inputs, "prospect_report": report}
+        else:
+            def _store_report(output):
+                # appelé dès la fin du profilage : les leads en attente repartent sans attendre la campagne
+                text = output_text(output)
+                if prospect_cache and text:
+                    prospect_cache.put(lead_name, industry, text)
+                    prospect_cache.release(lead_name, industry)
+
+            tasks = build_tasks(*agents, tools_common=tools_common, search_tool=search_tool,
+                                output_dir=output_dir, on_prospect_report=_store_report)
+        recorder = run_log.start_run(inputs, output_dir=output_dir, prospect_report_cached=bool(report)) \
+            if run_log else None
+        if recorder:
+            recorder.instrument(tasks)
+        crew = build_crew(agents, tasks, step_callback=recorder.step_callback if recorder else None)
+        instrument_crew(crew)  # no-op sans --trace / TRACE_FILE
+        try:
+            with span(f"lead {lead_name}", "crew", prospect_report_cached=bool(report)):
+                result = run_workflow(crew, inputs)
+        except Exception as e:
+            if recorder:
+                recorder.usage(crew)
+                recorder.event("run_error", error=repr(e))
+            raise
+        if recorder:
+            recorder.usage(crew)
+            recorder.event("run_end", result=result)
+        return crew, result, bool(report)
+    finally:
+        if claimed:
+            prospect_cache.release(lead_name, industry)
+
+def run_batch(args, tools_common, search_tool):
+    """Mode --leads-file : tous les leads dans ce process, un dossier de sortie par lead, reprise sur crash."""
+    leads = load_leads(args.leads_file)
+    prospect_cache = build_prospect_cache(args)
+    run_log = build_run_log()
+
+    def _one(lead: dict, lead_dir: str) -> dict:
+        crew, result, cached = run_lead(lead, lead_dir, tools_common, search_tool, prospect_cache, run_log)
+        campaign_text = extract_campaign_text(result)
+        sentiment = analyse_sentiment(campaign_text, model=os.getenv("OPENAI_MODEL_NAME")) if campaign_text else None
+        return {"tokens": usage_tokens(crew), "sentiment": sentiment, "prospect_report_cached": cached}
+
+    summary = run_leads(leads, _one, out_root=os.path.join("outputs", "leads"), concurrency=args.concurrency)
+    stats = summary.as_dict()
+    print(f"\n=== Batch : {stats['done']} traités, {stats['skipped']} déjà faits, {stats['failed']} en erreur ===")
+    print(f"Débit : {stats['leads_per_min']} leads/min | {stats['tokens_per_lead']} tokens/lead "
+          f"| durée {stats['elapsed_sec']}s")
+    print("✅ Résultats dans ./outputs/leads (summary.json pour le récapitulatif, journal : outputs/runs.jsonl)")
+    if tracing.enabled():
+        logger.info(f"Trace : {tracing.get_tracer().export()} {tracing.get_tracer().summary()}")
+
 def main():
     ensure_dirs()
     args = parse_args()
     settings = load_settings()
 
     tools_common, search_tool = build_tools(args.instructions_dir, settings.serper_api_key)
-    agents = build_agents()
-    tasks = build_tasks(*agents, tools_common=tools_common, search_tool=search_tool)
-    crew = build_crew(agents, tasks)
+    if args.leads_file:
+        run_batch(args, tools_common, search_tool)
+        return
 
     inputs = {
         "lead_name": args.lead,
@@ -47,36 +177,21 @@ def main():
         "milestone": args.milestone,
     }
 
-    result = run_workflow(crew, inputs)
-
-    # Sauvegarde brute de l’exécution
-    ts = int(time.time())
-    with open(f"outputs/run_{ts}.json", "w", encoding="utf-8") as f:
-        try:
-            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
-        except TypeError:
-            f.write(str(result))
-
-    # Extraction du texte de campagne (fallbacks robustes)
-    campaign_text = None
-    for key in ("tasks", "results", "output"):
-        if isinstance(result, dict) and key in result:
-            maybe = result[key]
-            if isinstance(maybe, list) and len(maybe) >= 2 and isinstance(maybe[1], dict):
-                campaign_text = maybe[1].get("output") or maybe[1].get("result") or None
-                if campaign_text:
-                    break
-            if isinstance(maybe, str):
-                campaign_text = maybe
+    # événements du run ajoutés au fil de l'eau dans outputs/runs.jsonl (conservés même en cas de crash)
+    _, result, _ = run_lead(inputs, "outputs", tools_common, search_tool, build_prospect_cache(args), build_run_log())
 
+    campaign_text = extract_campaign_text(result)
     if campaign_text:
-        # sentiment via OpenAI SDK moderne
-        sentiment = analyse_sentiment_gpt(campaign_text, model=os.getenv("OPENAI_MODEL_NAME"))
+        # sentiment : lexique local, GPT seulement si confiance insuffisante
+        with span("sentiment", "sentiment"):
+            sentiment = analyse_sentiment(campaign_text, model=os.getenv("OPENAI_MODEL_NAME"))
         logger.info(f"Sentiment détecté: {sentiment}")
-        print("\n=== Sentiment (GPT) ===\n", sentiment)
+        print("\n=== Sentiment ===\n", sentiment)
     else:
         logger.warning("Impossible de localiser le texte de campagne dans le résultat.")
 
+    if tracing.enabled():
+        logger.info(f"Trace : {tracing.get_tracer().export()} {tracing.get_tracer().summary()}")
     print("\n✅ Terminé. Fichiers créés dans ./outputs")
 
 if __name__ == "__main__":
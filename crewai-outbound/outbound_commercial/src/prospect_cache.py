@@ -0,0 +1,80 @@
+from __future__ import annotations
+import hashlib, json, os, threading, time, unicodedata
+from typing import Dict, Optional
+
+def output_text(output) -> Optional[str]:
+    """Texte brut d'un TaskOutput (`raw_output` en crewai 0.28, `raw` ensuite)."""
+    if output is None:
+        return None
+    if isinstance(output, str):
+        return output
+    return getattr(output, "raw", None) or getattr(output, "raw_output", None) or str(output)
+
+def _norm(value: str) -> str:
+    value = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(value.lower().split())
+
+class ProspectCache:
+    """
+    Rapports de profilage prospect sur disque, clé = (lead_name, industry) normalisés.
+    Un rapport plus vieux que `max_age_days` est ignoré (recherche web relancée).
+    `not_before` (timestamp) ignore aussi les rapports antérieurs : --refresh-prospect rafraîchit chaque
+    entreprise une fois, puis les leads suivants de la même entreprise réutilisent le nouveau rapport.
+    En concurrence, un seul worker fait la recherche d'une entreprise : les autres attendent son rapport.
+    """
+
+    def __init__(self, cache_dir: str = "data/cache/prospects", max_age_days: float = 7.0,
+                 not_before: float = 0.0) -> None:
+        self.cache_dir = cache_dir
+        self.max_age_sec = max_age_days * 86400
+        self.not_before = not_before
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(lead_name: str, industry: str) -> str:
+        return hashlib.sha256(f"{_norm(lead_name)}|{_norm(industry)}".encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, lead_name: str, industry: str) -> Optional[str]:
+        try:
+            with open(self._path(self.key(lead_name, industry)), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        created_at = entry.get("created_at", 0)
+        if created_at < self.not_before or time.time() - created_at > self.max_age_sec:
+            return None
+        return entry.get("report") or None
+
+    def put(self, lead_name: str, industry: str, report: str) -> None:
+        path = self._path(self.key(lead_name, industry))
+        entry = {"lead_name": lead_name, "industry": industry, "created_at": time.time(), "report": report}
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    def claim(self, lead_name: str, industry: str, timeout: float = 1800) -> bool:
+        """
+        True si l'appelant doit faire la recherche (et appeler `release` ensuite).
+        False si un autre worker vient de la faire : le rapport est alors lisible via `get`
+        (sauf échec de ce worker, auquel cas `get` retourne None).
+        """
+        key = self.key(lead_name, industry)
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is None:
+                self._inflight[key] = threading.Event()
+                return True
+        event.wait(timeout)
+        return False
+
+    def release(self, lead_name: str, industry: str) -> None:
+        with self._lock:
+            event = self._inflight.pop(self.key(lead_name, industry), None)
+        if event:
+            event.set()
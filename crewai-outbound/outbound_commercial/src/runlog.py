@@ -0,0 +1,187 @@
+"""
+Journal d'exécution en JSONL, écrit au fil de l'eau (un événement = une ligne, flush immédiat).
+
+    run_start / task_start / tool_call / task_end / usage / run_end (ou run_error)
+
+Un run interrompu garde tout ce qui s'est passé avant le crash. Le fichier tourne par taille
+(`runs.jsonl` → `runs.jsonl.1` → … `runs.jsonl.N`). Lecture en flux, filtrable par lead et par date :
+
+    python src/runlog.py --lead "Change Agile" --since 2025-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Union
+
+from loguru import logger
+
+DEFAULT_PATH = os.path.join("outputs", "runs.jsonl")
+MAX_FIELD_CHARS = 4000  # observations d'outils tronquées : le log reste lisible
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+def _clip(value, limit: int = MAX_FIELD_CHARS):
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit] + f"… [+{len(text) - limit} car.]"
+
+def _task_label(task) -> str:
+    name = getattr(task, "name", None) or os.path.basename(getattr(task, "output_file", None) or "")
+    return name or (getattr(task, "description", "") or "")[:60]
+
+
+class RunLog:
+    """Fichier JSONL partagé par tous les runs du process (écritures sérialisées par un verrou)."""
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = 20 * 1024 * 1024, backups: int = 5) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, event: str, **fields) -> None:
+        line = json.dumps({"ts": _now(), "event": event, **fields}, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                if os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self._rotate()
+            except OSError:
+                pass  # fichier pas encore créé
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def start_run(self, lead: Optional[dict] = None, **fields) -> "RunRecorder":
+        recorder = RunRecorder(self, uuid.uuid4().hex[:12], (lead or {}).get("lead_name"))
+        recorder.event("run_start", inputs=lead or {}, **fields)
+        return recorder
+
+
+class RunRecorder:
+    """Événements d'un run (run_id + lead ajoutés à chaque ligne) et callbacks CrewAI associés."""
+
+    def __init__(self, log: RunLog, run_id: str, lead: Optional[str]) -> None:
+        self.log = log
+        self.run_id = run_id
+        self.lead = lead
+
+    def event(self, event: str, **fields) -> None:
+        self.log.write(event, run_id=self.run_id, lead=self.lead, **fields)
+
+    def step_callback(self, step) -> None:
+        """`Crew(step_callback=...)` : AgentFinish, ou liste de (AgentAction, observation) par appel d'outil."""
+        if isinstance(step, list):
+            for item in step:
+                action, observation = item if isinstance(item, tuple) and len(item) == 2 else (item, None)
+                self.event("tool_call", tool=getattr(action, "tool", None),
+                           tool_input=_clip(getattr(action, "tool_input", "")),
+                           observation=_clip(observation) if observation is not None else None)
+        elif getattr(step, "tool", None):
+            self.event("tool_call", tool=step.tool, tool_input=_clip(getattr(step, "tool_input", "")))
+
+    def instrument(self, tasks) -> None:
+        """task_start à l'envoi de chaque tâche, task_end (avec la sortie) via son callback."""
+        for task in tasks:
+            label = _task_label(task)
+            execute, callback = task.execute, getattr(task, "callback", None)
+
+            def _execute(*args, _execute=execute, _label=label, _task=task, **kwargs):
+                agent = kwargs.get("agent") or (args[0] if args else None) or getattr(_task, "agent", None)
+                self.event("task_start", task=_label, agent=getattr(agent, "role", None))
+                return _execute(*args, **kwargs)
+
+            def _done(output, _callback=callback, _label=label):
+                text = getattr(output, "raw", None) or getattr(output, "raw_output", None) or str(output)
+                self.event("task_end", task=_label, output=text)
+                if _callback:
+                    _callback(output)
+
+            # Task est un modèle pydantic : on remplace les attributs d'instance sans passer par la validation
+            object.__setattr__(task, "execute", _execute)
+            object.__setattr__(task, "callback", _done)
+
+    def usage(self, crew) -> None:
+        usage = getattr(crew, "usage_metrics", None) or {}
+        if not isinstance(usage, dict):
+            usage = usage.dict() if hasattr(usage, "dict") else {}
+        self.event("usage", **usage)
+
+
+# ---------- Lecture ----------
+def _as_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+    if value is None:
+        return None
+    dt = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def log_files(path: str = DEFAULT_PATH) -> List[str]:
+    """Fichiers du journal, du plus ancien (dernière rotation) au plus récent."""
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    return list(reversed(rotated)) + ([path] if os.path.exists(path) else [])
+
+def iter_events(path: str = DEFAULT_PATH, lead: Optional[str] = None, since=None, until=None,
+                event: Optional[str] = None, run_id: Optional[str] = None) -> Iterator[dict]:
+    """Événements filtrés, lus ligne à ligne (mémoire constante quelle que soit la taille du journal)."""
+    since_dt, until_dt = _as_datetime(since), _as_datetime(until)
+    lead_key = lead.casefold() if lead else None
+    for file in log_files(path):
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    continue  # dernière ligne tronquée par un crash
+                if lead_key and (ev.get("lead") or "").casefold() != lead_key:
+                    continue
+                if event and ev.get("event") != event:
+                    continue
+                if run_id and ev.get("run_id") != run_id:
+                    continue
+                if since_dt or until_dt:
+                    ts = _as_datetime(ev.get("ts"))
+                    if (since_dt and ts < since_dt) or (until_dt and ts > until_dt):
+                        continue
+                yield ev
+
+def iter_runs(path: str = DEFAULT_PATH, lead: Optional[str] = None, since=None, until=None) -> Iterator[dict]:
+    """Un événement run_start par run correspondant aux filtres."""
+    return iter_events(path, lead=lead, since=since, until=until, event="run_start")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Lecture du journal d'exécution JSONL")
+    p.add_argument("--path", default=DEFAULT_PATH)
+    p.add_argument("--lead")
+    p.add_argument("--since", help="Date/heure ISO (UTC par défaut)")
+    p.add_argument("--until")
+    p.add_argument("--event", help="Type d'événement (run_start, task_end, tool_call…)")
+    p.add_argument("--run-id")
+    args = p.parse_args()
+    n = 0
+    for ev in iter_events(args.path, lead=args.lead, since=args.since, until=args.until,
+                          event=args.event, run_id=args.run_id):
+        print(json.dumps(ev, ensure_ascii=False))
+        n += 1
+    logger.info(f"{n} événement(s)")
+
+if __name__ == "__main__":
+    main()
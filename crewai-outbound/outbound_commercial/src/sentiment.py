@@ -1,15 +1,174 @@
 from __future__ import annotations
 from tenacity import retry, stop_after_attempt, wait_exponential
-from openai import OpenAI
+from openai import BadRequestError, OpenAI, RateLimitError
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+import json
 import os
+import threading
+import time
 
+import httpx
+
+from llm_cache import cached_chat_completion
+from sentiment_lexicon import score_sentiment
+
+LABELS = ("POSITIF", "NEUTRE", "NEGATIF")
+# En dessous de ce seuil, le score lexical local est confirmé par GPT
+MIN_CONFIDENCE = float(os.getenv("SENTIMENT_MIN_CONFIDENCE", "0.6"))
+
+@lru_cache(maxsize=1)
 def build_openai_client() -> OpenAI:
-    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    """Un seul client (et un seul pool HTTP keep-alive) par processus, partagé par les threads."""
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=httpx.Client(limits=limits, timeout=60.0))
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10))
 def analyse_sentiment_gpt(text: str, model: str = None) -> str:
-    client = build_openai_client()
     mdl = model or os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo")
     msg = f"Analyse le sentiment (réponds uniquement par POSITIF, NEUTRE ou NEGATIF) :\n\n{text}"
-    resp = client.chat.completions.create(model=mdl, messages=[{"role": "user", "content": msg}])
-    return resp.choices[0].message.content.strip().upper()
+    # texte déjà noté → servi par le cache local (le client n'est construit qu'en cas de miss)
+    content = cached_chat_completion(build_openai_client, model=mdl, messages=[{"role": "user", "content": msg}])
+    return content.strip().upper()
+
+
+# ---------- Mode batch ----------
+_BATCH_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "sentiments",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "items": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "label": {"type": "string", "enum": list(LABELS)},
+                        },
+                        "required": ["id", "label"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["items"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+class RateLimitGate:
+    """
+    Sémaphore de concurrence + pause globale : un 429 reçu par un worker
+    suspend l'envoi de nouvelles requêtes par tous les workers jusqu'à la fin du délai.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        self._sem = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def __enter__(self) -> "RateLimitGate":
+        self._sem.acquire()
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return self
+            time.sleep(delay)
+
+    def __exit__(self, *exc) -> None:
+        self._sem.release()
+
+    def backoff(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+def _retry_after(err: RateLimitError, default: float = 5.0) -> float:
+    try:
+        return float(err.response.headers.get("retry-after", default))
+    except Exception:
+        return default
+
+def _score_batch(texts: List[str], model: str, gate: RateLimitGate, attempts: int = 5) -> List[Optional[str]]:
+    """Un appel structuré pour plusieurs textes ; None pour un id absent/invalide dans la réponse."""
+    numbered = "\n\n".join(f"### id={i}\n{t}" for i, t in enumerate(texts))
+    messages = [
+        {"role": "system", "content": "Tu classes le sentiment de textes commerciaux : POSITIF, NEUTRE ou NEGATIF."},
+        {"role": "user", "content": (
+            f"Donne un label pour chacun des {len(texts)} textes (id de 0 à {len(texts) - 1}). "
+            'Réponds en JSON : {"items": [{"id": 0, "label": "POSITIF"}, ...]}\n\n' + numbered)},
+    ]
+    # `attempts` borne les 429 seulement ; le repli de format (une fois au plus) ne consomme pas de tentative.
+    # La boucle ne sort que par `break` (content assigné) ou en relançant l'erreur.
+    response_format = _BATCH_SCHEMA
+    rate_limited = 0
+    while True:
+        try:
+            with gate:
+                content = cached_chat_completion(build_openai_client, model=model, messages=messages,
+                                                 response_format=response_format, temperature=0)
+            break
+        except BadRequestError:
+            # modèle sans Structured Outputs (ex: gpt-3.5-turbo) → simple mode JSON
+            if response_format is not _BATCH_SCHEMA:
+                raise
+            response_format = {"type": "json_object"}
+        except RateLimitError as e:
+            rate_limited += 1
+            if rate_limited >= attempts:
+                raise
+            gate.backoff(_retry_after(e))
+
+    labels: List[Optional[str]] = [None] * len(texts)
+    try:
+        for item in json.loads(content).get("items", []):
+            i, label = item.get("id"), str(item.get("label", "")).upper()
+            if isinstance(i, int) and 0 <= i < len(texts) and label in LABELS:
+                labels[i] = label
+    except (ValueError, AttributeError):
+        pass
+    return labels
+
+def analyse_sentiments_batch(texts: List[str], model: str = None, batch_size: int = 20,
+                             max_concurrency: int = 4) -> List[str]:
+    """
+    Labels POSITIF/NEUTRE/NEGATIF pour une liste de textes, dans l'ordre d'entrée.
+    Les textes sont regroupés par `batch_size` dans une requête à sortie structurée ; les lots partent
+    en parallèle (au plus `max_concurrency` en vol). Un item manquant dans une réponse repasse en unitaire.
+    """
+    mdl = model or os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo")
+    gate = RateLimitGate(max_concurrency)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+        scored = list(pool.map(lambda b: _score_batch(b, mdl, gate), batches))
+
+    labels = [label for batch in scored for label in batch]
+    return [label or analyse_sentiment_gpt(text, model=mdl) for text, label in zip(texts, labels)]
+
+
+# ---------- Chemin rapide local + repli LLM ----------
+def analyse_sentiment(text: str, model: str = None, min_confidence: float = MIN_CONFIDENCE) -> str:
+    """Score lexical hors-ligne ; appel GPT seulement si la confiance est sous `min_confidence`."""
+    label, confidence = score_sentiment(text)
+    if confidence >= min_confidence:
+        return label
+    return analyse_sentiment_gpt(text, model=model)
+
+def analyse_sentiments(texts: List[str], model: str = None, min_confidence: float = MIN_CONFIDENCE,
+                       batch_size: int = 20, max_concurrency: int = 4) -> List[str]:
+    """Version liste : seuls les textes incertains partent dans `analyse_sentiments_batch`."""
+    local = [score_sentiment(t) for t in texts]
+    unsure = [i for i, (_, confidence) in enumerate(local) if confidence < min_confidence]
+    labels = [label for label, _ in local]
+    if unsure:
+        remote = analyse_sentiments_batch([texts[i] for i in unsure], model=model,
+                                          batch_size=batch_size, max_concurrency=max_concurrency)
+        for i, label in zip(unsure, remote):
+            labels[i] = label
+    return labels
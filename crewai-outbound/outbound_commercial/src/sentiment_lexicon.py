@@ -0,0 +1,98 @@
+"""
+Scoring de sentiment hors-ligne (lexique de polarité français + négation + intensifieurs).
+
+Retourne le même label que le chemin GPT (POSITIF / NEUTRE / NEGATIF) et une confiance dans [0, 1] :
+seuls les textes sous le seuil de confiance ont besoin d'un appel LLM.
+"""
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+# Poids de polarité (formes sans accents, minuscules)
+POSITIVE: Dict[str, float] = {w: 1.0 for w in """
+    accelerer accompagner adore aider aime ambition amelioration ameliorer apprecie atout avantage
+    beneficier benefice bienvenue bravo brillant certifie clair confiance convaincu cooperation croissance
+    dynamique economie economiser efficace efficacite elegant enthousiasme essor excellent exceptionnel
+    expertise facile facilite felicitations feliciter fiable fierte fluide formidable fort gagner gain
+    garantie genial gratuit heureux ideal impact impressionnant innovant innovation inspirant interessant
+    leader merci meilleur opportunite optimiser optimisation partenariat passionnant performant performance
+    plaisir positif precieux pret prometteur qualite rapide ravi recommande reconnu reussi reussite robuste
+    rentable rentabilite satisfait securise serein simple simplifier solide succes super transformer
+    utile valeur valoriser victoire ravis enthousiaste excellente accelerez boostez gagnez optimisez
+    progression progres record remarquable soutien strategique
+    bon bonne parfait top content contente satisfaisant encourageant agreable reactif
+""".split()}
+POSITIVE.update({"felicitations": 1.5, "bravo": 1.5, "excellent": 1.5, "excellente": 1.5, "ravi": 1.5,
+                 "ravis": 1.5, "exceptionnel": 1.5, "succes": 1.5, "reussite": 1.5})
+
+NEGATIVE: Dict[str, float] = {w: 1.0 for w in """
+    abandon alerte annulation annuler arnaque bloque blocage bug catastrophe choque colere complique
+    crise critique decevant decu defaillance deficit degradation desole difficile difficulte dommage
+    douteux echec echouer ennui erreur faible faillite frustrant frustration grave honte impossible
+    inacceptable incident inquiet inquietude insatisfait inutile lent lenteur licenciement litige mauvais
+    mecontent negatif panne perdre perte plainte probleme rate reclamation regret regrettable retard
+    risque rupture sanction stress triste urgence penalite menace deception retards pertes problemes
+    mediocre nul pire
+    souci mal preoccupant inquietant dysfonctionnement insuffisant bancal galere
+""".split()}
+NEGATIVE.update({"catastrophe": 2.0, "inacceptable": 2.0, "arnaque": 2.0, "faillite": 1.5, "pire": 1.5,
+                 "nul": 1.5, "decevant": 1.5, "mecontent": 1.5})
+
+NEGATORS = {"ne", "n", "pas", "jamais", "aucun", "aucune", "sans", "ni", "guere"}
+INTENSIFIERS = {"tres": 1.5, "vraiment": 1.5, "extremement": 2.0, "particulierement": 1.3, "hautement": 1.5,
+                "totalement": 1.3, "tellement": 1.5, "trop": 1.3}
+_TOKEN = re.compile(r"[a-z]+")
+# locutions réécrites avant découpage (texte sans accents) : « pas mal » n'est pas une négation de « mal »
+IDIOMS = (
+    (re.compile(r"\bpas mal d(?:e|es|')\s*"), "beaucoup de "),  # quantité : neutre
+    (re.compile(r"\bpas mal\b"), "bon"),                         # appréciation : positif
+)
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFD", text.lower())
+    return "".join(c for c in text if unicodedata.category(c) != "Mn")
+
+
+def _lookup(tok: str) -> Tuple[float, float]:
+    """(poids positif, poids négatif) du token ou de sa forme sans suffixe flexionnel."""
+    for cand in (tok, tok[:-1] if tok.endswith(("s", "x", "e")) else None,
+                 tok[:-2] if tok.endswith(("es", "ez")) else None):
+        if cand and (cand in POSITIVE or cand in NEGATIVE):
+            return POSITIVE.get(cand, 0.0), NEGATIVE.get(cand, 0.0)
+    return 0.0, 0.0
+
+
+def score_sentiment(text: str) -> Tuple[str, float]:
+    """(label, confiance). La négation (fenêtre de 3 tokens) inverse la polarité, l'intensifieur l'amplifie."""
+    folded = _fold(text or "")
+    for pattern, repl in IDIOMS:
+        folded = pattern.sub(repl, folded)
+    tokens: List[str] = _TOKEN.findall(folded)
+    pos = neg = 0.0
+    for i, tok in enumerate(tokens):
+        p, n = _lookup(tok)
+        if not (p or n):
+            continue
+        window = tokens[max(0, i - 3):i]
+        boost = max([INTENSIFIERS.get(w, 1.0) for w in window] or [1.0])
+        if any(w in NEGATORS for w in window):
+            p, n = n * 0.8, p * 0.8         # « pas mauvais » est moins fort que « bon »
+        pos += p * boost
+        neg += n * boost
+
+    polar = pos + neg
+    if polar == 0:
+        # texte factuel sans marqueur : neutre, d'autant plus sûr que le texte est long
+        return "NEUTRE", 0.8 if len(tokens) >= 8 else 0.5
+
+    ratio = (pos - neg) / polar               # -1 (tout négatif) … +1 (tout positif)
+    strength = 1.0 - math.exp(-polar / 2.0)   # plus de marqueurs → plus de certitude
+    if ratio >= 0.5:
+        return "POSITIF", round(strength * ratio, 3)
+    if ratio <= -0.5:
+        return "NEGATIF", round(strength * -ratio, 3)
+    return "NEUTRE", round((1.0 - abs(ratio)) * 0.6, 3)  # signaux mixtes : à confirmer par le LLM
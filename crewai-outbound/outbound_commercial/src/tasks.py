@@ -1,8 +1,39 @@
 from __future__ import annotations
 from crewai import Task
-from typing import List
+from typing import Callable, List, Optional
+import os
+
+CAMPAGNE_DESCRIPTION = (
+    "personnalisée à l’attention de {key_decision_maker} ({position}) en rebondissant "
+    "sur leur {milestone}. Inclus :\n"
+    "- 3 emails (intro, relance valeur, relance preuve)\n"
+    "- 1 message LinkedIn (connexion)\n"
+    "- 1 message LinkedIn (follow-up)\n"
+    "- 3 objets d’email A/B testables\n"
+    "Contraintes : ton bref, orienté ROI, preuve sociale, CTA clair; 120-150 mots/email."
+)
+
+def build_tasks(agent_commercial, agent_chef_commercial, tools_common: List, search_tool,
+                output_dir: str = "outputs", cached_report: bool = False,
+                on_prospect_report: Optional[Callable] = None):
+    """
+    (profilage_prospect, campagne_personnalisee), ou (campagne_personnalisee,) seule si
+    `cached_report` : la campagne part alors du rapport en cache passé dans l'input {prospect_report}.
+    `on_prospect_report(task_output)` est appelé dès que le profilage est terminé.
+    """
+    if cached_report:
+        campagne_personnalisee = Task(
+            description=(
+                "Voici le rapport de profilage (récent) de {lead_name} :\n\n{prospect_report}\n\n"
+                "À partir de ce rapport, rédige une campagne multicanale " + CAMPAGNE_DESCRIPTION
+            ),
+            expected_output="Un fichier Markdown 'campaign_email.md' contenant la séquence.",
+            tools=[t for t in [search_tool] if t],
+            agent=agent_chef_commercial,
+            output_file=os.path.join(output_dir, "campaign_email.md")
+        )
+        return (campagne_personnalisee,)
 
-def build_tasks(agent_commercial, agent_chef_commercial, tools_common: List, search_tool):
     profilage_prospect = Task(
         description=(
             "Analyse en profondeur {lead_name}, une entreprise du secteur {industry}. "
@@ -19,26 +50,21 @@ def build_tasks(agent_commercial, agent_chef_commercial, tools_common: List, sea
         ),
         tools=tools_common,
         agent=agent_commercial,
-        output_file="outputs/prospect_report.md",
-        async_execution=True
+        output_file=os.path.join(output_dir, "prospect_report.md"),
+        async_execution=True,
+        callback=on_prospect_report
     )
 
     campagne_personnalisee = Task(
         description=(
             "À partir du rapport généré pour {lead_name}, rédige une campagne multicanale "
-            "personnalisée à l’attention de {key_decision_maker} ({position}) en rebondissant "
-            "sur leur {milestone}. Inclus :\n"
-            "- 3 emails (intro, relance valeur, relance preuve)\n"
-            "- 1 message LinkedIn (connexion)\n"
-            "- 1 message LinkedIn (follow-up)\n"
-            "- 3 objets d’email A/B testables\n"
-            "Contraintes : ton bref, orienté ROI, preuve sociale, CTA clair; 120-150 mots/email."
+            + CAMPAGNE_DESCRIPTION
         ),
-        expected_output="Un fichier Markdown 'outputs/campaign_email.md' contenant la séquence.",
+        expected_output="Un fichier Markdown 'campaign_email.md' contenant la séquence.",
         tools=[t for t in [search_tool] if t],
         agent=agent_chef_commercial,
         context=[profilage_prospect],
-        output_file="outputs/campaign_email.md"
+        output_file=os.path.join(output_dir, "campaign_email.md")
     )
 
     return profilage_prospect, campagne_personnalisee
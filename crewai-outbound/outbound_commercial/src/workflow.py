@@ -2,15 +2,16 @@ from __future__ import annotations
 from crewai import Crew
 from loguru import logger
 
-def build_crew(agents, tasks):
+def build_crew(agents, tasks, step_callback=None):
+    """`tasks` : (profilage, campagne) ou (campagne,) quand le rapport prospect vient du cache."""
     (agent_commercial, agent_chef_commercial) = agents
-    (profilage_prospect, campagne_personnalisee) = tasks
 
     crew = Crew(
         agents=[agent_commercial, agent_chef_commercial],
-        tasks=[profilage_prospect, campagne_personnalisee],
+        tasks=list(tasks),
         verbose=True,
-        memory=True
+        memory=True,
+        step_callback=step_callback
     )
     return crew
 
@@ -159,8 +159,13 @@ result = crew.kickoff(inputs=inputs)
 # ====== Coûts & métriques d'usage (exemple de calcul) ======
 import pandas as pd
 
-costs = 0.150 * (crew.usage_metrics.prompt_tokens + crew.usage_metrics.completion_tokens) / 1_000_000
-print(f"Coût estimé par exécution : ${costs:.4f}")
+from costs import cost_usd, usage_dict
+
+# Tarif du modèle : tokens d'entrée, d'entrée en cache et de sortie facturés séparément
+usage = usage_dict(crew.usage_metrics)
+costs = cost_usd(os.environ['OPENAI_MODEL_NAME'], usage['prompt_tokens'], usage['completion_tokens'],
+                 usage['cached_prompt_tokens'])
+print(f"Coût estimé par exécution : ${costs:.4f}" if costs is not None else "Coût estimé : tarif du modèle inconnu")
 
 df_usage_metrics = pd.DataFrame([crew.usage_metrics.dict()])
 df_usage_metrics  # affichage dans le notebook
@@ -205,3 +210,12 @@ with open("outputs/tables/project_plan.json", "w", encoding="utf-8") as f:
     json.dump(plan, f, ensure_ascii=False, indent=2)
 
 print("[OK] Écrit : outputs/tables/tasks.csv, milestones.csv, project_plan.json")
+
+# ---- Historique Parquet (listes typées, partition run_date) : relu par export.load_plans() ----
+from export import export_plan
+
+try:
+    run_id = export_plan(result.pydantic, project=project)
+    print(f"[OK] Plan {run_id} ajouté à outputs/dataset/")
+except RuntimeError as e:
+    print(f"[AVERTISSEMENT] {e}")
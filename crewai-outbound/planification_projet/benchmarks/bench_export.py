@@ -0,0 +1,70 @@
+"""
+Benchmark : relecture d'un trimestre de plans, CSV par run vs dataset Parquet partitionné.
+
+    python benchmarks/bench_export.py --runs 500 --tasks 50
+
+Chaque run est écrit deux fois : tasks.csv propre au run (listes jointes par "; ")
+et ajout au dataset Parquet. On mesure ensuite la relecture complète des deux côtés.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_scheduler import make_plan  # noqa: E402
+from src.export import export_plans, load_plans  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Relecture d'un trimestre de plans : CSV vs Parquet.")
+    parser.add_argument("--runs", type=int, default=500, help="Runs répartis sur 90 jours")
+    parser.add_argument("--tasks", type=int, default=50, help="Tâches par plan")
+    args = parser.parse_args()
+
+    plan = make_plan(args.tasks, team=8)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with tempfile.TemporaryDirectory() as root:
+        t0 = time.perf_counter()
+        for day in range(90):
+            runs = [r for r in range(args.runs) if r % 90 == day]
+            if not runs:
+                continue
+            export_plans([plan] * len(runs), root=root, projects=[f"P{r}" for r in runs],
+                         run_at=start + timedelta(days=day))
+            for r in runs:
+                rows = pd.DataFrame([t.model_dump() for t in plan.tasks])
+                for col in ("required_resources", "dependencies"):
+                    rows[col] = rows[col].apply("; ".join)
+                rows.to_csv(os.path.join(root, f"tasks_{r}.csv"), index=False)
+        write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        frames = [pd.read_csv(p) for p in sorted(glob.glob(os.path.join(root, "tasks_*.csv")))]
+        csv_df = pd.concat(frames, ignore_index=True)
+        csv_df["required_resources"] = csv_df["required_resources"].str.split("; ")
+        csv_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pq_df = load_plans("tasks", root=root, start="2025-01-01", end="2025-03-31")
+        pq_sec = time.perf_counter() - t0
+
+    assert len(csv_df) == len(pq_df) == args.runs * args.tasks
+    print(f"{args.runs} runs × {args.tasks} tâches (écriture {write:.1f}s)")
+    print(f"{'format':>8} {'lignes':>8} {'relecture (ms)':>15}")
+    print(f"{'CSV':>8} {len(csv_df):>8} {csv_sec * 1e3:>15.1f}")
+    print(f"{'Parquet':>8} {len(pq_df):>8} {pq_sec * 1e3:>15.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark : KPI Codir de N BU × T trimestres, calcul historique par BU vs moteur vectorisé.
+
+    python benchmarks/bench_kpi_codir.py --bus 50 --quarters 8
+
+"Historique" : un filtre du DataFrame par (BU, trimestre) puis les .sum() / idxmin du script
+rapport_codir.py, répétés pour chaque rapport. "Vectorisé" : src.kpi_codir, un groupby pour tout.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.kpi_codir import load_kpis, read_codir_csv  # noqa: E402
+
+
+def make_csv(path: str, bus: int, quarters: int, seed: int = 0) -> int:
+    rng = np.random.default_rng(seed)
+    months = pd.period_range("2023-01", periods=3 * quarters, freq="M").astype(str)
+    df = pd.DataFrame({"BU": np.repeat([f"BU{b:03d}" for b in range(bus)], len(months)),
+                       "Mois": np.tile(months, bus)})
+    df["Objectif (€)"] = rng.integers(80, 120, len(df)) * 1000
+    df["CA réalisé (€)"] = (df["Objectif (€)"] * rng.uniform(0.7, 1.2, len(df))).round()
+    df["Pipe (€)"] = rng.integers(10, 60, len(df)) * 1000
+    df["Opportunités"] = "Upsell"
+    df["Risques/Blocages"] = "Délais"
+    df.to_csv(path, index=False)
+    return len(df)
+
+
+def legacy(path: str) -> int:
+    df = read_codir_csv(path)
+    n = 0
+    for bu in df["bu"].unique():
+        for q in df.loc[df["bu"] == bu, "trimestre"].unique():
+            part = df[(df["bu"] == bu) & (df["trimestre"] == q)]
+            ca, obj, pipe, mois = part["ca"], part["objectif"], part["pipe"], part["mois"]
+            delta_total = float(ca.sum() - obj.sum())
+            tx_real = float(ca.sum() / max(obj.sum(), 1)) * 100
+            mois_bas = mois[(ca - obj).idxmin()]
+            _ = (delta_total, tx_real, mois_bas, pipe.sum())
+            n += 1
+    return n
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="KPI Codir multi-BU : boucle par BU vs vectorisé.")
+    parser.add_argument("--bus", type=int, default=50)
+    parser.add_argument("--quarters", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data_codir.csv")
+        rows = make_csv(path, args.bus, args.quarters)
+
+        t0 = time.perf_counter()
+        n_legacy = legacy(path)
+        legacy_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        kpis = load_kpis(path)
+        reports = kpis.latest()
+        vec_sec = time.perf_counter() - t0
+
+    assert n_legacy == len(kpis.quarters) == args.bus * args.quarters and len(reports) == args.bus
+    print(f"{args.bus} BU × {args.quarters} trimestres ({rows} lignes)")
+    print(f"{'moteur':>10} {'KPI':>6} {'temps (ms)':>11}")
+    print(f"{'par BU':>10} {n_legacy:>6} {legacy_sec * 1e3:>11.1f}")
+    print(f"{'vectorisé':>10} {len(kpis.quarters):>6} {vec_sec * 1e3:>11.1f}  (+ {len(reports)} BuKpis)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
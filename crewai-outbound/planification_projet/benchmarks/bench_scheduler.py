@@ -0,0 +1,60 @@
+"""
+Benchmark de l'ordonnanceur local (CPM + lissage de ressources) sur des plans synthétiques.
+
+    python benchmarks/bench_scheduler.py --sizes 100 1000 10000 --team 12
+
+Plans déterministes : 1 à 3 dépendances vers les 50 tâches précédentes, 1 à 2 personnes par tâche.
+Affiche le temps CPM, le temps de lissage, la durée du chemin critique et celle du planning lissé.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.models.plan import Milestone, ProjectPlan, TaskEstimate  # noqa: E402
+from src.scheduler import compute_cpm, level_resources, schedule_plan  # noqa: E402
+
+
+def make_plan(n: int, team: int, seed: int = 42) -> ProjectPlan:
+    rng = random.Random(seed)
+    people = [f"Personne {k}" for k in range(team)]
+    tasks = []
+    for i in range(n):
+        window = range(max(0, i - 50), i)
+        deps = rng.sample(list(window), k=min(len(window), rng.randint(1, 3))) if i else []
+        tasks.append(TaskEstimate(task_name=f"T{i}", estimated_time_hours=float(rng.randint(1, 40)),
+                                  required_resources=rng.sample(people, k=rng.randint(1, 2)),
+                                  dependencies=[f"T{d}" for d in deps]))
+    milestones = [Milestone(milestone_name=f"Jalon {k}", tasks=[f"T{i}" for i in range(k, n, 10)])
+                  for k in range(min(10, n))]
+    return ProjectPlan(tasks=tasks, milestones=milestones)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ordonnanceur CPM + lissage de ressources.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--team", type=int, default=12, help="Nombre de personnes disponibles")
+    args = parser.parse_args()
+
+    print(f"{'tâches':>7} {'CPM (ms)':>9} {'lissage (ms)':>13} {'total (ms)':>11} {'chemin crit. (h)':>17} {'lissé (h)':>10}")
+    for size in args.sizes:
+        plan = make_plan(size, args.team)
+        t0 = time.perf_counter()
+        cpm = compute_cpm(plan.tasks)
+        t1 = time.perf_counter()
+        level_resources(plan.tasks, cpm)
+        t2 = time.perf_counter()
+        scheduled = schedule_plan(plan)
+        t3 = time.perf_counter()
+        print(f"{size:>7} {(t1 - t0) * 1e3:>9.1f} {(t2 - t1) * 1e3:>13.1f} {(t3 - t2) * 1e3:>11.1f} "
+              f"{scheduled.critical_path_hours:>17.0f} {scheduled.makespan_hours:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
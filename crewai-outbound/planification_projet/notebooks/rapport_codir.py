@@ -1,18 +1,23 @@
 from pathlib import Path
-import os, urllib.request
+import argparse, os, re, sys, urllib.request
 from datetime import datetime
-import pandas as pd
+from textwrap import dedent
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from fpdf import FPDF
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from kpi_codir import DEFAULT_BU, BuKpis, gpt_prompt, load_kpis, summary_table
+
 # --- chemins (remonte à la racine du repo) ---
 BASE = Path(__file__).resolve().parents[3]  # .../portfolio-ai-tools/
 CSV_PATH = BASE / "outputs/tables/data_codir.csv"
+KPI_PATH = BASE / "outputs/tables/kpi_codir.csv"
 ART_DIR  = BASE / "outputs/artifacts"
 REP_DIR  = BASE / "outputs/reports"
-ART_DIR.mkdir(parents=True, exist_ok=True)
-REP_DIR.mkdir(parents=True, exist_ok=True)
+FONT_PATH = Path(__file__).with_name("fonts").joinpath("DejaVuSans.ttf")
 
 # --- ENV ---
 load_dotenv(BASE / ".env")
@@ -21,60 +26,51 @@ SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID", "")
 OPENAI_API_KEY   = os.getenv("OPENAI_API_KEY", "")
 USE_GPT          = os.getenv("USE_GPT", "0") == "1"
 
-# --- données ---
-assert CSV_PATH.exists(), f"CSV introuvable: {CSV_PATH}"
-df = pd.read_csv(CSV_PATH)
+CSV_COLUMNS = ["Mois", "CA réalisé (€)", "Objectif (€)", "Pipe (€)", "Opportunités", "Risques/Blocages"]
+
+
+def _suffix(k: BuKpis, multi: bool) -> str:
+    """Un seul rapport : noms de fichiers historiques ; plusieurs : suffixe BU / trimestre."""
+    if not multi:
+        return ""
+    return "_" + re.sub(r"[^\w-]+", "-", f"{k.bu}_{k.trimestre}").strip("-")
+
 
 # --- graphe ---
-mois = df["Mois"]; ca = df["CA réalisé (€)"]; obj = df["Objectif (€)"]; pipe = df["Pipe (€)"]
-plt.figure(figsize=(8,5))
-plt.plot(mois, ca, marker='o', label='CA Réalisé')
-plt.plot(mois, obj, marker='o', linestyle='--', label='Objectif')
-plt.bar(mois, pipe, alpha=0.2, label='Pipe')
-plt.title("Synthèse Commerciale Trimestrielle"); plt.ylabel("Montant (€)"); plt.legend(); plt.tight_layout()
-img_path = ART_DIR / "ventes_graph.png"; plt.savefig(img_path); plt.close()
-print(f"✅ Graphe: {img_path}")
-
-# --- Synthèse offline (par défaut) ---
-delta_total = float(ca.sum() - obj.sum())
-tx_real = float(ca.sum() / max(obj.sum(), 1)) * 100
-mois_bas = mois[(ca - obj).idxmin()]
-synthese_codir = (
-    f"Réalisation à {tx_real:.1f}% de l'objectif "
-    f"({ca.sum():,.0f}€ vs {obj.sum():,.0f}€, écart {delta_total:,.0f}€). "
-    f"Mois le plus sous-performant : {mois_bas}. "
-    f"Pipe total : {pipe.sum():,.0f}€ à sécuriser."
-)
+def build_chart(k: BuKpis, img_path: Path) -> Path:
+    m = k.mois
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.plot(m["Mois"], m["CA réalisé (€)"], marker='o', label='CA Réalisé')
+    ax.plot(m["Mois"], m["Objectif (€)"], marker='o', linestyle='--', label='Objectif')
+    ax.bar(m["Mois"], m["Pipe (€)"], alpha=0.2, label='Pipe')
+    title = "Synthèse Commerciale Trimestrielle" if k.bu == DEFAULT_BU else f"Synthèse Commerciale — {k.bu} {k.trimestre}"
+    ax.set_title(title); ax.set_ylabel("Montant (€)"); ax.legend(); fig.tight_layout()
+    fig.savefig(img_path); plt.close(fig)
+    return img_path
+
 
 # --- (Option) GPT si USE_GPT=1 et clé dispo ---
-if USE_GPT and OPENAI_API_KEY:
+def synthese_gpt(k: BuKpis) -> str:
+    synthese = k.synthese()
+    if not (USE_GPT and OPENAI_API_KEY):
+        return synthese
     try:
         from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        prompt = (
-            "Voici les indicateurs commerciaux du trimestre.\n"
-            f"Mois : {', '.join(df['Mois'])}\n"
-            f"CA réalisé : {', '.join(str(x) for x in df['CA réalisé (€)'])}\n"
-            f"Objectif : {', '.join(str(x) for x in df['Objectif (€)'])}\n"
-            f"Pipe : {', '.join(str(x) for x in df['Pipe (€)'])}\n"
-            f"Opportunités : {', '.join(df['Opportunités'])}\n"
-            f"Risques : {', '.join(df['Risques/Blocages'])}\n\n"
-            "Donne : 1) une synthèse Codir en 3 phrases, 2) 2 points de vigilance & 2 opportunités majeures, 3) 2 actions prioritaires."
-        )
-        rsp = client.chat.completions.create(
+        from llm_cache import cached_chat_completion
+        # mêmes indicateurs → synthèse servie par le cache local (0 token)
+        synthese = cached_chat_completion(
+            lambda: OpenAI(api_key=OPENAI_API_KEY),
             model="gpt-4o-mini",
-            messages=[{"role":"user","content":prompt}],
+            messages=[{"role":"user","content":gpt_prompt(k)}],
             max_tokens=350, temperature=0.2
-        )
-        synthese_codir = rsp.choices[0].message.content.strip()
-        print("🤖 Synthèse GPT activée.")
+        ).strip()
+        print(f"🤖 Synthèse GPT activée ({k.bu}).")
     except Exception as e:
         print(f"ℹ️ GPT non utilisé (erreur: {e}). Synthèse offline conservée.")
+    return synthese
 
-# --- PDF (Unicode) ---
-# --- PDF (Unicode) avec fallback robuste ---
-font_path = Path(__file__).with_name("fonts").joinpath("DejaVuSans.ttf")
 
+# --- PDF (Unicode) avec fallback robuste ---
 def _try_download_font(dst: Path) -> bool:
     urls = [
         "https://raw.githubusercontent.com/dejavu-fonts/dejavu-fonts/master/ttf/DejaVuSans.ttf",
@@ -88,121 +84,161 @@ def _try_download_font(dst: Path) -> bool:
             continue
     return False
 
-use_core_font = False
-if not font_path.exists():
-    if not _try_download_font(font_path):
-        print("⚠️ Impossible de télécharger DejaVuSans.ttf — fallback police intégrée.")
-        use_core_font = True
-
-pdf = FPDF()
-# marges + saut de page auto (IMPORTANT)
-pdf.set_margins(10, 10, 10)
-pdf.set_auto_page_break(auto=True, margin=15)
-pdf.add_page()
-
-# Si police Unicode dispo sinon Helvetica
-if not use_core_font:
-    pdf.add_font("DejaVu", "", str(font_path), uni=True)
-    pdf.set_font("DejaVu", "", 14)
-else:
-    pdf.set_font("Helvetica", "", 14)
-
-# largeur de zone d'écriture explicite
-page_w = pdf.w - pdf.l_margin - pdf.r_margin
-
-def _safe(txt: str) -> str:
-    # remplace espaces insécables & co, puis encode latin-1 si fallback
-    txt = (txt or "").replace("\u00a0", " ").replace("\u202f", " ").replace("\u2009", " ")
-    if use_core_font:
-        try:
-            txt = txt.encode("latin-1", "replace").decode("latin-1")
-        except Exception:
-            pass
-    return txt
-
-# Titre
-pdf.set_x(pdf.l_margin)
-pdf.cell(page_w, 10, _safe("Synthèse Codir trimestrielle"), new_y="NEXT", align="C")
-
-# Aperçu tableau
-pdf.set_font("DejaVu" if not use_core_font else "Helvetica", "", 9)
-try:
-    preview = df.head().to_string(index=False)
-    for line in preview.splitlines():
-        pdf.set_x(pdf.l_margin)
-        pdf.multi_cell(page_w, 5, _safe(line))
-except Exception:
-    pass
-
-# Synthèse
-pdf.ln(2)
-pdf.set_font("DejaVu" if not use_core_font else "Helvetica", "", 11)
-pdf.set_x(pdf.l_margin)
-pdf.multi_cell(page_w, 6, _safe("Synthèse :"))
-
-pdf.set_font("DejaVu" if not use_core_font else "Helvetica", "", 9)
-pdf.set_x(pdf.l_margin)
-# aplatis les espaces multiples pour éviter un “mot” trop long
-clean_syn = " ".join(_safe(synthese_codir).split())
-pdf.multi_cell(page_w, 5, clean_syn)
-
-# Graphique
-pdf.ln(2)
-pdf.set_x(pdf.l_margin)
-pdf.multi_cell(page_w, 6, _safe("Graphique :"))
-pdf.image(str(img_path), w=page_w)
-
-pdf_path = REP_DIR / f"rapport_codir_{datetime.now().date()}.pdf"
-pdf.output(str(pdf_path))
-print(f"✅ PDF: {pdf_path}")
+def resolve_font() -> bool:
+    """True si la police Unicode est disponible (téléchargée une seule fois pour tous les rapports)."""
+    if FONT_PATH.exists() or _try_download_font(FONT_PATH):
+        return True
+    print("⚠️ Impossible de télécharger DejaVuSans.ttf — fallback police intégrée.")
+    return False
+
+def build_pdf(k: BuKpis, synthese: str, img_path: Path, pdf_path: Path, unicode_font: bool) -> Path:
+    use_core_font = not unicode_font
+    font = "DejaVu" if not use_core_font else "Helvetica"
+
+    pdf = FPDF()
+    # marges + saut de page auto (IMPORTANT)
+    pdf.set_margins(10, 10, 10)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # Si police Unicode dispo sinon Helvetica
+    if not use_core_font:
+        pdf.add_font("DejaVu", "", str(FONT_PATH), uni=True)
+    pdf.set_font(font, "", 14)
+
+    # largeur de zone d'écriture explicite
+    page_w = pdf.w - pdf.l_margin - pdf.r_margin
+
+    def _safe(txt: str) -> str:
+        # remplace espaces insécables & co, puis encode latin-1 si fallback
+        txt = (txt or "").replace("\u00a0", " ").replace("\u202f", " ").replace("\u2009", " ")
+        if use_core_font:
+            try:
+                txt = txt.encode("latin-1", "replace").decode("latin-1")
+            except Exception:
+                pass
+        return txt
+
+    # Titre
+    title = "Synthèse Codir trimestrielle" if k.bu == DEFAULT_BU else f"Synthèse Codir — {k.bu} ({k.trimestre})"
+    pdf.set_x(pdf.l_margin)
+    pdf.cell(page_w, 10, _safe(title), new_y="NEXT", align="C")
+
+    # Aperçu tableau
+    pdf.set_font(font, "", 9)
+    try:
+        preview = k.mois[CSV_COLUMNS].head().to_string(index=False)
+        for line in preview.splitlines():
+            pdf.set_x(pdf.l_margin)
+            pdf.multi_cell(page_w, 5, _safe(line))
+    except Exception:
+        pass
+
+    # Synthèse
+    pdf.ln(2)
+    pdf.set_font(font, "", 11)
+    pdf.set_x(pdf.l_margin)
+    pdf.multi_cell(page_w, 6, _safe("Synthèse :"))
+
+    pdf.set_font(font, "", 9)
+    pdf.set_x(pdf.l_margin)
+    # aplatis les espaces multiples pour éviter un “mot” trop long
+    clean_syn = " ".join(_safe(synthese).split())
+    pdf.multi_cell(page_w, 5, clean_syn)
+
+    # Graphique
+    pdf.ln(2)
+    pdf.set_x(pdf.l_margin)
+    pdf.multi_cell(page_w, 6, _safe("Graphique :"))
+    pdf.image(str(img_path), w=page_w)
+
+    pdf.output(str(pdf_path))
+    return pdf_path
 
 
 # --- Slack (optionnel) ---
-if SLACK_BOT_TOKEN and SLACK_CHANNEL_ID:
-    try:
-        from slack_sdk import WebClient
-        from textwrap import dedent
-        from datetime import datetime
-
-        sc = WebClient(token=SLACK_BOT_TOKEN)
-
-        # Formatage FR des montants (1 234 567)
-        fmt = lambda n: f"{n:,.0f}".replace(",", " ")
-
-        header = dedent(f"""
-        *Synthèse CODIR – {datetime.now():%Y-%m-%d}*
-        • CA vs Objectif : {fmt(ca.sum())} € / {fmt(obj.sum())} € ({tx_real:.1f}%)
-        • Écart total : {fmt(delta_total)} €
-        • Pipe à sécuriser : {fmt(pipe.sum())} €
-        """).strip()
-
-        # (Option) Alerte si sous-performance
-        alert = ""
-        if tx_real < 90:
-            alert = " :rotating_light: *Alerte : réalisation < 90%*"
-
-        # Message principal
-        sc.chat_postMessage(
-            channel=SLACK_CHANNEL_ID,
-            text=header + ("\n" + alert if alert else "") + "\n\n" + synthese_codir
-        )
-
-        # Fichiers
-        sc.files_upload_v2(
-            channel=SLACK_CHANNEL_ID,
-            file=str(img_path),
-            title="Graphique Codir",
-            initial_comment="Évolution CA / Objectif / Pipe"
-        )
-        sc.files_upload_v2(
-            channel=SLACK_CHANNEL_ID,
-            file=str(pdf_path),
-            title="Rapport PDF Codir",
-            initial_comment="Rapport complet en pièce jointe."
-        )
-
-        print("✅ Envoyé sur Slack.")
-    except Exception as e:
-        print(f"ℹ️ Slack non configuré/erreur: {e}")
-else:
-    print("ℹ️ Slack non configuré (variables manquantes).")
+def post_slack(sc, k: BuKpis, synthese: str, img_path: Path, pdf_path: Path) -> None:
+    # Formatage FR des montants (1 234 567)
+    fmt = lambda n: f"{n:,.0f}".replace(",", " ")
+    scope = "" if k.bu == DEFAULT_BU else f" – {k.bu} {k.trimestre}"
+
+    header = dedent(f"""
+    *Synthèse CODIR{scope} – {datetime.now():%Y-%m-%d}*
+    • CA vs Objectif : {fmt(k.ca)} € / {fmt(k.objectif)} € ({k.taux_realisation:.1f}%)
+    • Écart total : {fmt(k.ecart)} €
+    • Pipe à sécuriser : {fmt(k.pipe)} €
+    """).strip()
+
+    # (Option) Alerte si sous-performance
+    alert = " :rotating_light: *Alerte : réalisation < 90%*" if k.alerte else ""
+
+    # Message principal
+    sc.chat_postMessage(
+        channel=SLACK_CHANNEL_ID,
+        text=header + ("\n" + alert if alert else "") + "\n\n" + synthese
+    )
+
+    # Fichiers
+    sc.files_upload_v2(
+        channel=SLACK_CHANNEL_ID,
+        file=str(img_path),
+        title=f"Graphique Codir{scope}",
+        initial_comment="Évolution CA / Objectif / Pipe"
+    )
+    sc.files_upload_v2(
+        channel=SLACK_CHANNEL_ID,
+        file=str(pdf_path),
+        title=f"Rapport PDF Codir{scope}",
+        initial_comment="Rapport complet en pièce jointe."
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rapport Codir : graphe, PDF et Slack par BU.")
+    parser.add_argument("--csv", default=str(CSV_PATH), help="CSV Codir (colonnes BU / Trimestre optionnelles)")
+    parser.add_argument("--bu", action="append", help="BU à traiter (répétable) ; défaut : toutes")
+    parser.add_argument("--trimestre", help="Trimestre à traiter ; défaut : le dernier de chaque BU")
+    args = parser.parse_args(argv)
+
+    # --- données : un chargement, KPI de toutes les BU / trimestres en une passe ---
+    assert Path(args.csv).exists(), f"CSV introuvable: {args.csv}"
+    kpis = load_kpis(args.csv)
+    reports = [kpis.for_bu(bu, args.trimestre) for bu in (args.bu or kpis.bus)]
+    multi = len(reports) > 1
+
+    ART_DIR.mkdir(parents=True, exist_ok=True)
+    REP_DIR.mkdir(parents=True, exist_ok=True)
+    KPI_PATH.parent.mkdir(parents=True, exist_ok=True)
+    summary_table(kpis).to_csv(KPI_PATH, index=False)
+    print(f"✅ KPI: {KPI_PATH} ({len(kpis.quarters)} BU × trimestre)")
+
+    unicode_font = resolve_font()
+    sc = None
+    if SLACK_BOT_TOKEN and SLACK_CHANNEL_ID:
+        try:
+            from slack_sdk import WebClient
+            sc = WebClient(token=SLACK_BOT_TOKEN)
+        except Exception as e:
+            print(f"ℹ️ Slack non configuré/erreur: {e}")
+    else:
+        print("ℹ️ Slack non configuré (variables manquantes).")
+
+    for k in reports:
+        suffix = _suffix(k, multi)
+        img_path = build_chart(k, ART_DIR / f"ventes_graph{suffix}.png")
+        print(f"✅ Graphe: {img_path}")
+        synthese = synthese_gpt(k)
+        pdf_path = build_pdf(k, synthese, img_path, REP_DIR / f"rapport_codir{suffix}_{datetime.now().date()}.pdf",
+                             unicode_font)
+        print(f"✅ PDF: {pdf_path}")
+        if sc is not None:
+            try:
+                post_slack(sc, k, synthese, img_path, pdf_path)
+                print(f"✅ Envoyé sur Slack ({k.bu}).")
+            except Exception as e:
+                print(f"ℹ️ Slack non configuré/erreur: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
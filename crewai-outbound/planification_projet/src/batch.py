@@ -0,0 +1,105 @@
+"""
+Mode batch : plusieurs projets planifiés dans un seul process, `concurrency` crews à la fois.
+
+Chaque projet a son délai (`timeout`, compté à partir de son démarrage). Un projet hors délai
+est marqué `timeout` tout de suite, mais le thread CrewAI ne peut pas être interrompu : il finit
+en arrière-plan (thread daemon, il ne bloque pas la sortie du process), son résultat est ignoré
+et il **garde sa place** jusqu'à sa fin réelle. Il n'y a donc jamais plus de `concurrency` crews
+en vol ; en contrepartie, un projet bloqué retarde le démarrage des suivants (les appels LLM
+ont leurs propres timeouts). L'usage d'un projet hors délai ne doit pas être compté : cf.
+pipeline.run_batch, qui tient un ledger par projet et ignore ceux des projets `timeout`.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+def load_projects(path: str) -> List[Dict[str, Any]]:
+    """Inputs de crew : liste JSON ou JSONL (un dict par ligne)."""
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            projects = [json.loads(line) for line in f if line.strip()]
+        else:
+            projects = json.load(f)
+    if not isinstance(projects, list) or not all(isinstance(p, dict) for p in projects):
+        raise ValueError(f"{path} : liste d'objets JSON attendue (inputs d'un projet par objet)")
+    return projects
+
+
+def project_label(inputs: Dict[str, Any], index: int) -> str:
+    """Libellé unique d'un projet dans le batch (sorties, ledger de coûts)."""
+    name = inputs.get("project_name") or inputs.get("project_type") or "projet"
+    return f"{index + 1:03d}-{name}"
+
+
+@dataclass
+class ProjectResult:
+    label: str
+    inputs: Dict[str, Any]
+    status: str = "pending"          # ok | error | timeout
+    elapsed_sec: float = 0.0
+    value: Any = None                # retour de `run_one` (plan ordonnancé…)
+    error: Optional[str] = None
+
+
+@dataclass
+class _Job:
+    result: ProjectResult
+    started: float = 0.0
+    finished: threading.Event = field(default_factory=threading.Event)
+
+
+def run_projects(projects: List[Dict[str, Any]], run_one: Callable[[Dict[str, Any], str], Any],
+                 concurrency: int = 4, timeout: float = 900.0, poll: float = 0.5) -> List[ProjectResult]:
+    """`run_one(inputs, label)` pour chaque projet ; résultats dans l'ordre du fichier."""
+    slots = threading.Semaphore(max(1, concurrency))
+    lock = threading.Lock()
+    jobs = [_Job(ProjectResult(project_label(p, i), p)) for i, p in enumerate(projects)]
+
+    def _worker(job: _Job) -> None:
+        res = job.result
+        try:
+            value = run_one(res.inputs, res.label)
+            with lock:
+                if res.status == "pending":
+                    res.status, res.value = "ok", value
+        except Exception as e:
+            with lock:
+                if res.status == "pending":
+                    res.status, res.error = "error", str(e)
+        finally:
+            with lock:
+                if res.status != "timeout":
+                    res.elapsed_sec = round(time.monotonic() - job.started, 2)
+            job.finished.set()
+            slots.release()  # seulement à la fin réelle du thread, même après un timeout
+
+    def _sweep() -> None:
+        now = time.monotonic()
+        for job in jobs:
+            if job.started and not job.finished.is_set() and now - job.started > timeout:
+                with lock:
+                    if job.result.status != "pending":
+                        continue
+                    job.result.status = "timeout"
+                    job.result.error = f"délai de {timeout:.0f}s dépassé"
+                    job.result.elapsed_sec = round(now - job.started, 2)
+                print(f"[BATCH] ⏱️ {job.result.label} : {job.result.error} (résultat ignoré, "
+                      "place libérée à la fin du thread)")
+
+    for job in jobs:
+        while not slots.acquire(timeout=poll):
+            _sweep()
+        job.started = time.monotonic()
+        threading.Thread(target=_worker, args=(job,), name=f"plan-{job.result.label}", daemon=True).start()
+
+    while any(j.result.status == "pending" for j in jobs):
+        _sweep()
+        pending = [j for j in jobs if j.result.status == "pending"]
+        if pending:
+            pending[0].finished.wait(poll)
+    return [j.result for j in jobs]
@@ -0,0 +1,108 @@
+"""
+Graphe de dépendances des tâches de la crew, lu depuis les clés `depends_on` de config/tasks.yaml.
+
+- `topological_levels` : niveaux d'exécution (les tâches d'un même niveau sont indépendantes) ;
+  un cycle ou une dépendance inconnue lève une ValueError.
+- `async_flags` : `async_execution` par tâche, compatible avec le process séquentiel de CrewAI
+  (une tâche synchrone attend toutes les tâches asynchrones lancées avant elle).
+- `TaskTimer` + `critical_path` : chemin critique réellement exécuté, à partir des durées mesurées.
+"""
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Tuple
+
+
+def load_dependencies(tasks_cfg: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[str]]:
+    """{tâche: [dépendances]} dans l'ordre du YAML."""
+    deps: Dict[str, List[str]] = {}
+    for name, cfg in tasks_cfg.items():
+        raw = (cfg or {}).get("depends_on") or []
+        deps[name] = [raw] if isinstance(raw, str) else list(raw)
+    for name, parents in deps.items():
+        unknown = [p for p in parents if p not in deps]
+        if unknown:
+            raise ValueError(f"Tâche '{name}' : dépendances inconnues {unknown}")
+    return deps
+
+
+def topological_levels(deps: Mapping[str, List[str]]) -> List[List[str]]:
+    """Niveaux de Kahn ; l'ordre du YAML est conservé à l'intérieur d'un niveau."""
+    remaining = {name: set(parents) for name, parents in deps.items()}
+    levels: List[List[str]] = []
+    while remaining:
+        ready = [name for name, parents in remaining.items() if not parents]
+        if not ready:
+            raise ValueError(f"Cycle de dépendances entre les tâches : {sorted(remaining)}")
+        levels.append(ready)
+        for name in ready:
+            del remaining[name]
+        for parents in remaining.values():
+            parents.difference_update(ready)
+    return levels
+
+
+def async_flags(levels: List[List[str]]) -> Dict[str, bool]:
+    """
+    Un niveau de plusieurs tâches part en asynchrone ; la première tâche du niveau suivant reste
+    synchrone et sert de barrière (CrewAI y rassemble les sorties asynchrones avant de poursuivre).
+    La crew ne peut pas se terminer par une tâche asynchrone : la dernière est toujours synchrone.
+    """
+    flags: Dict[str, bool] = {}
+    pending = False  # des tâches asynchrones du niveau précédent ne sont pas encore rassemblées
+    for level in levels:
+        for i, name in enumerate(level):
+            flags[name] = len(level) > 1 and not (pending and i == 0)
+        pending = any(flags[name] for name in level)
+    if levels:
+        flags[levels[-1][-1]] = False
+    return flags
+
+
+def critical_path(deps: Mapping[str, List[str]],
+                  spans: Mapping[str, Tuple[float, float]]) -> Tuple[List[str], float]:
+    """
+    Chemin critique exécuté : depuis la tâche terminée en dernier, on remonte à chaque fois
+    vers la dépendance terminée le plus tard. Retourne (chemin, durée cumulée en secondes).
+    """
+    if not spans:
+        return [], 0.0
+    current = max(spans, key=lambda name: spans[name][1])
+    path = [current]
+    while True:
+        parents = [p for p in deps.get(current, []) if p in spans]
+        if not parents:
+            break
+        current = max(parents, key=lambda name: spans[name][1])
+        path.append(current)
+    path.reverse()
+    return path, sum(spans[name][1] - spans[name][0] for name in path)
+
+
+class TaskTimer:
+    """Début / fin de chaque tâche (cœur d'exécution commun sync/async de CrewAI), thread-safe."""
+
+    def __init__(self) -> None:
+        self.spans: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def instrument(self, named_tasks: Mapping[str, Any]) -> None:
+        for name, task in named_tasks.items():
+            for method in ("_execute_core", "_execute"):
+                fn = getattr(task, method, None)
+                if fn is not None:
+                    object.__setattr__(task, method, self._wrap(name, fn))
+                    break
+
+    def _wrap(self, name: str, fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            start = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                with self._lock:
+                    self.spans[name] = (start, time.perf_counter())
+        return wrapper
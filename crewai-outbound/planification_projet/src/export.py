@@ -0,0 +1,123 @@
+"""
+Historique des ProjectPlan en dataset Parquet, partitionné par date de run (Hive : run_date=AAAA-MM-JJ).
+
+Trois tables sous `root` : plans (une ligne par run), tasks (une ligne par tâche), milestones.
+Les listes (ressources, dépendances, tâches d'un jalon, chemin critique) restent des colonnes
+list<string> typées — pas de "; ".join à re-parser. Chaque run ajoute ses propres fichiers
+(`<id>-N.parquet`) : écritures concurrentes sans réécriture des runs précédents.
+
+    run_id = export_plan(plan, project="Site web")
+    df = load_plans("tasks", start="2025-01-01", end="2025-03-31")   # un trimestre, filtré par partition
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except Exception:  # pyarrow absent : export Parquet indisponible (CSV inchangés)
+    pa = ds = None
+
+DEFAULT_ROOT = os.path.join("outputs", "dataset")
+
+
+def _schemas() -> Dict[str, "pa.Schema"]:
+    strings = pa.list_(pa.string())
+    run = [("run_id", pa.string()), ("run_at", pa.timestamp("us", tz="UTC")), ("project", pa.string())]
+    return {
+        "plans": pa.schema(run + [
+            ("n_tasks", pa.int32()), ("total_hours", pa.float64()), ("critical_path", strings),
+            ("critical_path_hours", pa.float64()), ("makespan_hours", pa.float64()), ("notes", pa.string()),
+        ]),
+        "tasks": pa.schema(run + [
+            ("task_name", pa.string()), ("estimated_time_hours", pa.float64()), ("required_resources", strings),
+            ("dependencies", strings), ("start_hour", pa.float64()), ("end_hour", pa.float64()),
+            ("slack_hours", pa.float64()), ("critical", pa.bool_()),
+        ]),
+        "milestones": pa.schema(run + [
+            ("milestone_name", pa.string()), ("tasks", strings), ("due_hour", pa.float64()),
+        ]),
+    }
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(pa.schema([("run_date", pa.string())]), flavor="hive")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow requis pour l'export Parquet (pip install pyarrow)")
+
+
+def plan_rows(plan: Any, run_id: str, run_at: datetime, project: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Lignes des trois tables pour un ProjectPlan (planning vide → colonnes de planning nulles)."""
+    run = {"run_id": run_id, "run_at": run_at, "project": project}
+    slots = {s.task_name: s for s in getattr(plan, "schedule", None) or []}
+    tasks = []
+    for t in plan.tasks:
+        s = slots.get(t.task_name)
+        tasks.append({**run, "task_name": t.task_name, "estimated_time_hours": t.estimated_time_hours,
+                      "required_resources": list(t.required_resources),
+                      "dependencies": list(getattr(t, "dependencies", None) or []),
+                      "start_hour": s.start_hour if s else None, "end_hour": s.end_hour if s else None,
+                      "slack_hours": s.slack_hours if s else None, "critical": s.critical if s else None})
+    milestones = [{**run, "milestone_name": m.milestone_name, "tasks": list(m.tasks),
+                   "due_hour": getattr(m, "due_hour", None)} for m in plan.milestones]
+    plans = [{**run, "n_tasks": len(plan.tasks), "total_hours": sum(t.estimated_time_hours for t in plan.tasks),
+              "critical_path": list(getattr(plan, "critical_path", None) or []),
+              "critical_path_hours": getattr(plan, "critical_path_hours", None),
+              "makespan_hours": getattr(plan, "makespan_hours", None), "notes": getattr(plan, "notes", None)}]
+    return {"plans": plans, "tasks": tasks, "milestones": milestones}
+
+
+def export_plans(plans: Sequence[Any], root: str = DEFAULT_ROOT, projects: Optional[Sequence[str]] = None,
+                 run_at: Optional[datetime] = None) -> List[str]:
+    """Ajoute plusieurs plans au dataset en un fichier par table et par partition ; retourne les run_id."""
+    _require_pyarrow()
+    run_at = run_at or datetime.now(timezone.utc)
+    projects = list(projects) if projects is not None else ["default"] * len(plans)
+    run_ids = [uuid.uuid4().hex[:12] for _ in plans]
+    rows: Dict[str, List[Dict[str, Any]]] = {"plans": [], "tasks": [], "milestones": []}
+    for plan, project, run_id in zip(plans, projects, run_ids):
+        for table, table_rows in plan_rows(plan, run_id, run_at, project).items():
+            rows[table].extend(table_rows)
+
+    batch_id = run_ids[0] if len(run_ids) == 1 else uuid.uuid4().hex[:12]
+    for table, schema in _schemas().items():
+        if not rows[table]:
+            continue
+        data = pa.Table.from_pylist(rows[table], schema=schema)
+        data = data.append_column("run_date", pa.array([run_at.date().isoformat()] * data.num_rows, pa.string()))
+        ds.write_dataset(data, os.path.join(root, table), format="parquet", partitioning=_partitioning(),
+                         basename_template=f"{batch_id}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore")
+    return run_ids
+
+
+def export_plan(plan: Any, root: str = DEFAULT_ROOT, project: str = "default",
+                run_at: Optional[datetime] = None) -> str:
+    """Ajoute un ProjectPlan au dataset ; retourne son run_id."""
+    return export_plans([plan], root=root, projects=[project], run_at=run_at)[0]
+
+
+def load_plans(table: str = "tasks", root: str = DEFAULT_ROOT, start: Union[str, date, None] = None,
+               end: Union[str, date, None] = None, projects: Optional[Sequence[str]] = None,
+               columns: Optional[List[str]] = None):
+    """DataFrame d'une table entre deux dates incluses (seules les partitions concernées sont lues)."""
+    _require_pyarrow()
+    if table not in ("plans", "tasks", "milestones"):
+        raise ValueError(f"Table inconnue : {table!r} (plans, tasks ou milestones)")
+    path = os.path.join(root, table)
+    if not os.path.isdir(path):
+        return _schemas()[table].empty_table().to_pandas()
+    dataset = ds.dataset(path, format="parquet", partitioning=_partitioning())
+    expr = None
+    for cond in (ds.field("run_date") >= str(start) if start else None,
+                 ds.field("run_date") <= str(end) if end else None,
+                 ds.field("project").isin(list(projects)) if projects else None):
+        if cond is not None:
+            expr = cond if expr is None else expr & cond
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
@@ -0,0 +1,208 @@
+"""
+KPI du rapport Codir : un seul chargement du CSV, calculs vectorisés sur toutes les BU et tous les trimestres.
+
+    kpis = load_kpis("outputs/tables/data_codir.csv")
+    kpis.quarters                       # une ligne par (bu, trimestre) : CA, objectif, écart, taux, pipe…
+    k = kpis.for_bu("Retail")           # BuKpis du dernier trimestre : graphe, PDF, Slack et prompt GPT
+
+Colonnes du CSV : `Mois`, `CA réalisé (€)`, `Objectif (€)`, `Pipe (€)`, `Opportunités`, `Risques/Blocages`,
+plus `BU` et `Trimestre` optionnelles. Sans `BU` : une BU "Global". Sans `Trimestre` : déduit de `Mois`
+quand il est au format AAAA-MM, sinon tout le fichier forme un seul trimestre.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# en-tête CSV → nom de colonne interne
+COLUMNS = {
+    "BU": "bu",
+    "Trimestre": "trimestre",
+    "Mois": "mois",
+    "CA réalisé (€)": "ca",
+    "Objectif (€)": "objectif",
+    "Pipe (€)": "pipe",
+    "Opportunités": "opportunites",
+    "Risques/Blocages": "risques",
+}
+DTYPES = {
+    "BU": "string", "Trimestre": "string", "Mois": "string",
+    "CA réalisé (€)": "float64", "Objectif (€)": "float64", "Pipe (€)": "float64",
+    "Opportunités": "string", "Risques/Blocages": "string",
+}
+REQUIRED = ("Mois", "CA réalisé (€)", "Objectif (€)", "Pipe (€)")
+DEFAULT_BU = "Global"
+DEFAULT_QUARTER = "Trimestre"
+ROLLING_MONTHS = 3
+ALERT_RATE = 90.0  # % de réalisation sous lequel le rapport passe en alerte
+
+
+@dataclass
+class BuKpis:
+    """Indicateurs d'une BU sur un trimestre (valeurs Python prêtes pour le texte, le PDF et Slack)."""
+    bu: str
+    trimestre: str
+    ca: float
+    objectif: float
+    ecart: float                       # CA - objectif (négatif = retard)
+    taux_realisation: float            # % de l'objectif
+    pipe: float
+    couverture_pipe: Optional[float]   # pipe / reste à faire ; None si l'objectif est atteint
+    mois_bas: str                      # mois au plus grand retard sur objectif
+    tendance_points: Optional[float]   # évolution du taux vs trimestre précédent (points) ; None au 1er
+    mois: pd.DataFrame                 # lignes mensuelles (en-têtes du CSV) + moyennes glissantes
+
+    @property
+    def alerte(self) -> bool:
+        return self.taux_realisation < ALERT_RATE
+
+    def synthese(self) -> str:
+        """Synthèse offline (sans GPT)."""
+        text = (f"Réalisation à {self.taux_realisation:.1f}% de l'objectif "
+                f"({self.ca:,.0f}€ vs {self.objectif:,.0f}€, écart {self.ecart:,.0f}€). "
+                f"Mois le plus sous-performant : {self.mois_bas}. "
+                f"Pipe total : {self.pipe:,.0f}€ à sécuriser")
+        if self.couverture_pipe is not None:
+            text += f" (couverture du reste à faire : {self.couverture_pipe:.1f}x)"
+        text += "."
+        if self.tendance_points is not None:
+            text += f" Tendance vs trimestre précédent : {self.tendance_points:+.1f} pts."
+        return text
+
+
+@dataclass
+class CodirKpis:
+    """
+    monthly  : une ligne par (bu, trimestre, mois), écart et moyennes glissantes sur ROLLING_MONTHS mois.
+    quarters : index (bu, trimestre), une ligne par trimestre de chaque BU.
+    """
+    monthly: pd.DataFrame
+    quarters: pd.DataFrame
+
+    def __post_init__(self) -> None:
+        # index calculés une fois : N rapports sans re-filtrer le DataFrame à chaque BU
+        keys = ["bu", "trimestre"]
+        self._rows = dict(self.monthly.groupby(keys, observed=True).indices)
+        self._records = self.quarters.to_dict("index")
+        self._report = self.monthly.drop(columns=keys).rename(columns=_HEADERS)
+        self._latest = {bu: str(q) for bu, q in self.quarters.index}  # index trié : dernier trimestre gagne
+
+    @property
+    def bus(self) -> List[str]:
+        return list(self._latest)
+
+    def latest_quarter(self, bu: str) -> str:
+        return self._latest[bu]
+
+    def for_bu(self, bu: str, trimestre: Optional[str] = None) -> BuKpis:
+        """KPI d'une BU ; `trimestre` par défaut : le dernier de la BU. KeyError si inconnu."""
+        trimestre = trimestre or self.latest_quarter(bu)
+        row = self._records[(bu, trimestre)]
+        return BuKpis(
+            bu=bu, trimestre=trimestre,
+            ca=float(row["ca"]), objectif=float(row["objectif"]), ecart=float(row["ecart"]),
+            taux_realisation=float(row["taux_realisation"]), pipe=float(row["pipe"]),
+            couverture_pipe=_optional(row["couverture_pipe"]), mois_bas=str(row["mois_bas"]),
+            tendance_points=_optional(row["tendance_points"]),
+            mois=self._report.iloc[self._rows[(bu, trimestre)]].reset_index(drop=True),
+        )
+
+    def latest(self) -> List[BuKpis]:
+        """Dernier trimestre de chaque BU (un rapport par BU)."""
+        return [self.for_bu(bu) for bu in self.bus]
+
+
+_HEADERS = {v: k for k, v in COLUMNS.items()}
+
+
+def _optional(value) -> Optional[float]:
+    return None if pd.isna(value) else float(value)
+
+
+def read_codir_csv(path: str) -> pd.DataFrame:
+    """CSV Codir lu une fois, types explicites, colonnes internes (bu, trimestre, mois, ca…)."""
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [c for c in REQUIRED if c not in header]
+    if missing:
+        raise ValueError(f"{path} : colonnes manquantes {missing}")
+    df = pd.read_csv(path, dtype={c: t for c, t in DTYPES.items() if c in header})
+    return prepare(df)
+
+
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Renomme, complète BU / trimestre / textes manquants ; l'ordre des lignes fait foi pour les mois."""
+    df = df.rename(columns=COLUMNS)
+    df = df[[c for c in COLUMNS.values() if c in df]].copy()
+    if "bu" not in df:
+        df["bu"] = DEFAULT_BU
+    if "trimestre" not in df:
+        dates = pd.to_datetime(df["mois"], format="%Y-%m", errors="coerce")
+        df["trimestre"] = dates.dt.to_period("Q").astype("string") if dates.notna().all() else DEFAULT_QUARTER
+    for col in ("opportunites", "risques"):
+        if col not in df:
+            df[col] = ""
+    for col in ("ca", "objectif", "pipe"):
+        df[col] = df[col].astype("float64").fillna(0.0)
+    # catégories dans l'ordre d'apparition : groupby et tri conservent la chronologie du fichier
+    for col in ("bu", "trimestre"):
+        df[col] = pd.Categorical(df[col].astype("string"), categories=list(dict.fromkeys(df[col].astype(str))))
+    return df[list(COLUMNS.values())].reset_index(drop=True)
+
+
+def compute_kpis(df: pd.DataFrame, window: int = ROLLING_MONTHS) -> CodirKpis:
+    """Tous les KPI de toutes les (BU, trimestre) en opérations groupées, sans boucle Python par BU."""
+    monthly = df.copy()
+    monthly["ecart"] = monthly["ca"] - monthly["objectif"]
+    by_bu = monthly.groupby("bu", observed=True, sort=False)
+    rolling = by_bu[["ca", "objectif"]].rolling(window, min_periods=1).sum().reset_index(level=0, drop=True)
+    monthly["ca_glissant"] = by_bu["ca"].rolling(window, min_periods=1).mean().reset_index(level=0, drop=True)
+    monthly["taux_glissant"] = rolling["ca"] / rolling["objectif"].clip(lower=1) * 100
+
+    keys = ["bu", "trimestre"]
+    grouped = monthly.groupby(keys, observed=True, sort=True)
+    q = grouped[["ca", "objectif", "pipe"]].sum()
+    q["ecart"] = q["ca"] - q["objectif"]
+    q["taux_realisation"] = q["ca"] / q["objectif"].clip(lower=1) * 100
+    reste = -q["ecart"]
+    q["couverture_pipe"] = (q["pipe"] / reste).where(reste > 0)
+    q["mois_bas"] = monthly.loc[grouped["ecart"].idxmin(), keys + ["mois"]].set_index(keys)["mois"].astype(str)
+    q["nb_mois"] = grouped.size()
+    q["tendance_points"] = q.groupby(level="bu", observed=True, sort=False)["taux_realisation"].diff()
+    q["alerte"] = q["taux_realisation"] < ALERT_RATE
+    return CodirKpis(monthly=monthly, quarters=q)
+
+
+def load_kpis(path: str, window: int = ROLLING_MONTHS) -> CodirKpis:
+    return compute_kpis(read_codir_csv(path), window=window)
+
+
+def gpt_prompt(k: BuKpis) -> str:
+    """Prompt GPT d'une BU : indicateurs déjà calculés, le modèle ne refait pas les sommes."""
+    m = k.mois
+    tendance = f"{k.tendance_points:+.1f} pts" if k.tendance_points is not None else "n/a"
+    return (
+        f"Voici les indicateurs commerciaux du trimestre {k.trimestre} (BU {k.bu}).\n"
+        f"Mois : {', '.join(m['Mois'])}\n"
+        f"CA réalisé : {', '.join(f'{x:.0f}' for x in m['CA réalisé (€)'])}\n"
+        f"Objectif : {', '.join(f'{x:.0f}' for x in m['Objectif (€)'])}\n"
+        f"Pipe : {', '.join(f'{x:.0f}' for x in m['Pipe (€)'])}\n"
+        f"Opportunités : {', '.join(m['Opportunités'].fillna(''))}\n"
+        f"Risques : {', '.join(m['Risques/Blocages'].fillna(''))}\n"
+        f"Réalisation : {k.taux_realisation:.1f}% (écart {k.ecart:,.0f}€), mois le plus bas : {k.mois_bas}, "
+        f"tendance vs trimestre précédent : {tendance}\n\n"
+        "Donne : 1) une synthèse Codir en 3 phrases, 2) 2 points de vigilance & 2 opportunités majeures, "
+        "3) 2 actions prioritaires."
+    )
+
+
+def summary_table(kpis: CodirKpis, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Tableau plat (bu, trimestre, KPI…) pour un export CSV multi-BU."""
+    cols = columns or ["ca", "objectif", "ecart", "taux_realisation", "pipe", "couverture_pipe", "mois_bas",
+                       "tendance_points", "alerte"]
+    out = kpis.quarters[cols].reset_index()
+    num = out.select_dtypes(include=[np.floating]).columns
+    out[num] = out[num].round(2)
+    return out
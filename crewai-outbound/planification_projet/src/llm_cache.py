@@ -0,0 +1,157 @@
+# Module partagé — copie canonique : crewai-outbound/planification_projet/src/llm_cache.py
+# Ne pas modifier les copies : python scripts/sync_shared_modules.py
+"""
+Cache disque des appels chat completion OpenAI.
+
+Clé = SHA-256 de la requête canonique (modèle, messages, temperature, max_tokens…) :
+une requête identique est servie localement, sans token consommé.
+Stockage SQLite, expiration (TTL) et borne de taille avec éviction LRU.
+
+Variables d'environnement : LLM_CACHE_PATH (défaut .llm_cache.sqlite3), LLM_CACHE_TTL_SECONDS
+(défaut 7 jours), LLM_CACHE_MAX_ENTRIES (défaut 2000), LLM_CACHE_DISABLED=1 pour le couper.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+def cache_key(**request: Any) -> str:
+    """Empreinte stable d'une requête (les paramètres à None sont ignorés)."""
+    canonical = {k: v for k, v in request.items() if v is not None}
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Cache clé → réponse texte, partagé entre threads."""
+
+    def __init__(self, path: str = ".llm_cache.sqlite3", ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 2000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON completions (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT value, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if found and now - found[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.expired += 1
+                found = None
+            if not found:
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats.hits += 1
+            return found[0]
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now, now))
+            count = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute("""
+                    DELETE FROM completions WHERE key IN (
+                        SELECT key FROM completions ORDER BY last_access ASC LIMIT ?
+                    )""", (overflow,))
+                self.stats.evictions += overflow
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[LLMCache]:
+    """Cache du processus, configuré par l'environnement (None si désactivé)."""
+    global _default_cache
+    if os.getenv("LLM_CACHE_DISABLED", "0") == "1":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache(
+                path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3"),
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")),
+            )
+        return _default_cache
+
+
+def _is_factory(client: Any) -> bool:
+    """
+    Classe (`OpenAI` : `chat` y est une cached_property, donc présent sur la classe elle-même)
+    ou callable sans attribut `chat` (lambda, functools.partial…).
+    """
+    return isinstance(client, type) or (callable(client) and not hasattr(client, "chat"))
+
+
+def cached_chat_completion(client: Any, cache: Optional[LLMCache] = None, **request: Any) -> str:
+    """
+    `client.chat.completions.create(**request)` via le cache ; retourne le texte du 1er choix.
+    `client` peut être une fabrique (classe ou callable sans argument, ex. `OpenAI` ou `lambda: OpenAI(...)`) :
+    il n'est alors construit qu'en cas de miss.
+    """
+    cache = cache if cache is not None else default_cache()
+    key = cache_key(**request)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    if _is_factory(client):
+        client = client()
+    resp = client.chat.completions.create(**{k: v for k, v in request.items() if v is not None})
+    content = resp.choices[0].message.content or ""
+    if cache is not None:
+        cache.put(key, content)
+    return content
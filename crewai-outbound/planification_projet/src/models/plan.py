@@ -1,15 +1,31 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class TaskEstimate(BaseModel):
     task_name: str = Field(..., description="Nom de la tâche")
     estimated_time_hours: float = Field(..., description="Temps estimé (heures)")
     required_resources: List[str] = Field(..., description="Ressources/personnes requises")
+    dependencies: List[str] = Field(default_factory=list, description="Noms des tâches à terminer avant celle-ci")
 
 class Milestone(BaseModel):
     milestone_name: str = Field(..., description="Nom du jalon")
     tasks: List[str] = Field(..., description="Tâches associées")
+    due_hour: Optional[float] = Field(None, description="Heure d'atteinte dans le planning lissé (calculée)")
+
+class ScheduledTask(BaseModel):
+    task_name: str
+    start_hour: float
+    end_hour: float
+    resources: List[str]
+    slack_hours: float = Field(..., description="Marge totale CPM (sans contrainte de ressources)")
+    critical: bool
 
 class ProjectPlan(BaseModel):
     tasks: List[TaskEstimate] = Field(..., description="Tâches avec estimations")
     milestones: List[Milestone] = Field(..., description="Jalons du projet")
+    notes: Optional[str] = Field(None, description="Synthèse : hypothèses, risques, arbitrages")
+    # calculés localement par src.scheduler (jamais demandés au LLM)
+    schedule: List[ScheduledTask] = Field(default_factory=list, description="Planning lissé par ressource")
+    critical_path: List[str] = Field(default_factory=list, description="Chemin critique CPM")
+    critical_path_hours: Optional[float] = Field(None, description="Durée du chemin critique (h)")
+    makespan_hours: Optional[float] = Field(None, description="Durée du planning lissé (h)")
@@ -1,58 +1,197 @@
-import os, yaml, pandas as pd
+import argparse, json, os, sys, time, yaml, pandas as pd
 from crewai import Agent, Task, Crew
+from typing import Dict, List, Optional
+from src.batch import load_projects, run_projects
+from src.costs import CostLedger
+from src.dag import TaskTimer, async_flags, critical_path, load_dependencies, topological_levels
+from src.export import export_plan, export_plans
 from src.helper import load_env
 from src.models.plan import ProjectPlan
+from src.repair import RepairStats, default_ask, repair_plan
+from src.scheduler import schedule_plan
+from src.tracing import instrument_crew, span
 
 def load_yaml(path: str):
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
-def build_crew():
-    agents_cfg = load_yaml("config/agents.yaml")
-    tasks_cfg  = load_yaml("config/tasks.yaml")
+# tâche YAML → agent, et options propres à certaines Task
+TASK_AGENTS = {
+    "task_breakdown": "project_planning_agent",
+    "time_resource_estimation": "estimation_agent",
+    "resource_allocation": "resource_allocation_agent",
+}
+TASK_OPTIONS = {"resource_allocation": {"output_pydantic": ProjectPlan}}
+
+def load_configs():
+    return load_yaml("config/agents.yaml"), load_yaml("config/tasks.yaml")
+
+def build_crew(timer: Optional[TaskTimer] = None, configs=None):
+    """`configs` : (agents, tasks) déjà parsés — le mode batch ne relit pas les YAML à chaque projet."""
+    agents_cfg, tasks_cfg = configs or load_configs()
 
     # Agents
-    project_planning_agent   = Agent(config=agents_cfg['project_planning_agent'])
-    estimation_agent         = Agent(config=agents_cfg['estimation_agent'])
-    resource_allocation_agent= Agent(config=agents_cfg['resource_allocation_agent'])
+    agents = {name: Agent(config=cfg) for name, cfg in agents_cfg.items()}
 
-    # Tasks
-    task_breakdown = Task(config=tasks_cfg['task_breakdown'], agent=project_planning_agent)
-    time_estimation= Task(config=tasks_cfg['time_resource_estimation'], agent=estimation_agent)
-    allocation     = Task(config=tasks_cfg['resource_allocation'], agent=resource_allocation_agent,
-                          output_pydantic=ProjectPlan)
+    # Tasks : ordre topologique des `depends_on`, contexte limité aux vraies dépendances,
+    # tâches indépendantes d'un même niveau en async_execution
+    deps = load_dependencies(tasks_cfg)
+    levels = topological_levels(deps)
+    is_async = async_flags(levels)
+    tasks = {}
+    for name in (n for level in levels for n in level):
+        cfg = {k: v for k, v in tasks_cfg[name].items() if k != "depends_on"}
+        tasks[name] = Task(config=cfg, agent=agents[TASK_AGENTS[name]],
+                           context=[tasks[d] for d in deps[name]] or None,
+                           async_execution=is_async[name], **TASK_OPTIONS.get(name, {}))
+    print(f"[DAG] niveaux : {' | '.join(' + '.join(level) for level in levels)}")
+    if timer is not None:
+        timer.instrument(tasks)
 
     crew = Crew(
-        agents=[project_planning_agent, estimation_agent, resource_allocation_agent],
-        tasks=[task_breakdown, time_estimation, allocation],
+        agents=list(agents.values()),
+        tasks=list(tasks.values()),
         verbose=True
     )
     return crew
 
-def run_pipeline(inputs: dict):
+def kickoff_plan(crew, inputs: dict, deps, ledger: CostLedger, label: str, timer: Optional[TaskTimer] = None,
+                 repairs: Optional[RepairStats] = None):
+    """
+    Exécute la crew d'un projet ; retourne le plan ordonnancé localement. Usage ajouté à `ledger`.
+    Sortie non conforme à ProjectPlan : réparée fragment par fragment (compteurs dans `repairs`).
+    """
+    instrument_crew(crew)  # TRACE_FILE=outputs/trace.json : spans tâches / outils / appels LLM
+    with span("crew", "crew", project=label):
+        result = crew.kickoff(inputs=inputs)
+    if timer is not None:
+        path, path_sec = critical_path(deps, timer.spans)
+        print(f"[DAG] {label} chemin critique : {' -> '.join(path)} ({path_sec:.1f}s)")
+
+    # coûts & métriques (tarif du modèle : entrée / entrée en cache / sortie)
+    model = os.environ["OPENAI_MODEL_NAME"]
+    costs = ledger.add_usage(model, crew.usage_metrics, label=label)
+    print(f"[COUT ESTIME] {label} ${costs:.4f}" if costs is not None else f"[COUT ESTIME] tarif inconnu pour {model}")
+
+    # planning lissé + chemin critique calculés localement (déterministe, 0 token)
+    plan = result.pydantic
+    if plan is None:  # conversion output_pydantic en échec : réparation ciblée plutôt que relancer la crew
+        repairs = repairs if repairs is not None else RepairStats()
+        before = repairs.as_dict()
+        plan = repair_plan(result.raw, ask=default_ask(model), stats=repairs)
+        after = repairs.as_dict()
+        print(f"[REPARATION] {label} local={after['local'] - before['local']}, llm={after['llm'] - before['llm']}, "
+              f"abandonnés={after['dropped'] - before['dropped']}")
+    scheduled = schedule_plan(plan)
+    print(f"[PLANNING] {label} chemin critique {scheduled.critical_path_hours}h : "
+          f"{' -> '.join(scheduled.critical_path)} | planning lissé {scheduled.makespan_hours}h")
+    return scheduled
+
+def run_pipeline(inputs: dict, ledger: Optional[CostLedger] = None):
+    """`ledger` : cumule l'usage de plusieurs runs (sinon un ledger propre au run)."""
     load_env()
     os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
-    crew = build_crew()
-    result = crew.kickoff(inputs=inputs)
-
-    # coûts & métriques
-    costs = 0.150 * (crew.usage_metrics.prompt_tokens + crew.usage_metrics.completion_tokens) / 1_000_000
-    print(f"[COUT ESTIME] ${costs:.4f}")
+    configs = load_configs()
+    timer = TaskTimer()
+    crew = build_crew(timer, configs)
+    ledger = ledger if ledger is not None else CostLedger()
+    label = inputs.get("project_type", "default")
+    scheduled = kickoff_plan(crew, inputs, load_dependencies(configs[1]), ledger, label, timer)
     df_usage = pd.DataFrame([crew.usage_metrics.dict()])
     print(df_usage)
 
     # sorties structurées
-    plan = result.pydantic.dict()
+    plan = scheduled.dict()
     pd.DataFrame(plan["tasks"]).to_csv("outputs/tables/tasks.csv", index=False)
     pd.DataFrame(plan["milestones"]).to_csv("outputs/tables/milestones.csv", index=False)
+    pd.DataFrame(plan["schedule"]).to_csv("outputs/tables/schedule.csv", index=False)
     print("[OK] Exports -> outputs/tables/")
+    # historique Parquet (partition run_date) : relu en une requête par load_plans()
+    try:
+        run_id = export_plan(scheduled, project=label)
+        print(f"[OK] Plan {run_id} -> outputs/dataset/")
+    except RuntimeError as e:
+        print(f"[AVERTISSEMENT] {e}")
 
-if __name__ == "__main__":
-    demo_inputs = {
-        "project_type": "Site web",
-        "project_objectives": "Créer un site vitrine",
-        "industry": "Technologie",
-        "team_members": "- John (PM)\n- Jane (Dev)\n- Bob (Design)\n- Alice (QA)\n- Tom (QA)",
-        "project_requirements": "- Responsive\n- UI moderne\n- Nav claire\n- Pages: A propos, Services, Contact\n- Blog\n- SEO\n- Social\n- Témoignages"
+def run_batch(projects: List[dict], concurrency: int = 4, timeout: float = 900.0,
+              out_dir: str = "outputs/batch") -> dict:
+    """
+    Mode --batch : YAML parsés et Agents construits une fois, une copie de la crew par projet.
+    Plans, usage et coûts fusionnés dans `out_dir` (tables avec colonne `project`, summary.json).
+    Usage et réparations sont comptés par projet puis fusionnés, sauf pour les projets hors délai :
+    leur crew peut encore tourner (cf. src.batch) et finir après l'écriture de summary.json.
+    """
+    load_env()
+    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-4o-mini")
+    configs = load_configs()
+    deps = load_dependencies(configs[1])
+    task_names = [n for level in topological_levels(deps) for n in level]
+    template = build_crew(configs=configs)
+    ledgers: Dict[str, CostLedger] = {}
+    repairs: Dict[str, RepairStats] = {}
+
+    def _one(inputs: dict, label: str):
+        crew = template.copy()  # crewai : état de kickoff propre à chaque copie, agents partagés
+        timer = TaskTimer()
+        timer.instrument(dict(zip(task_names, crew.tasks)))  # les copies ne portent pas l'instrumentation
+        ledgers[label], repairs[label] = CostLedger(), RepairStats()
+        return kickoff_plan(crew, inputs, deps, ledgers[label], label, timer, repairs[label])
+
+    t0 = time.time()
+    results = run_projects(projects, _one, concurrency=concurrency, timeout=timeout)
+    elapsed = time.time() - t0
+    counted = [r.label for r in results if r.status != "timeout" and r.label in ledgers]
+    ledger = CostLedger()
+    for label in counted:
+        ledger.merge(ledgers[label])
+    repair_totals = {k: sum(repairs[label].as_dict()[k] for label in counted)
+                     for k in RepairStats().as_dict()}
+
+    os.makedirs(out_dir, exist_ok=True)
+    ok = [r for r in results if r.status == "ok"]
+    for table in ("tasks", "milestones", "schedule"):
+        frames = [pd.DataFrame(r.value.dict()[table]).assign(project=r.label) for r in ok]
+        if frames:
+            pd.concat(frames, ignore_index=True).to_csv(os.path.join(out_dir, f"{table}.csv"), index=False)
+    try:
+        export_plans([r.value for r in ok], projects=[r.label for r in ok])
+    except RuntimeError as e:
+        print(f"[AVERTISSEMENT] {e}")
+
+    costs = ledger.summary()
+    summary = {
+        "projects": len(results), "ok": len(ok),
+        "failed": sum(r.status == "error" for r in results),
+        "timeout": sum(r.status == "timeout" for r in results),
+        "elapsed_sec": round(elapsed, 1), "concurrency": concurrency,
+        "total_tokens": sum(row["prompt_tokens"] + row["completion_tokens"] for row in costs["by_label"].values()),
+        "estimated_cost_usd": costs["total_cost_usd"], "costs": costs, "repairs": repair_totals,
+        "per_project": [{"project": r.label, "status": r.status, "elapsed_sec": r.elapsed_sec, "error": r.error,
+                         "makespan_hours": r.value.makespan_hours if r.value else None} for r in results],
     }
-    run_pipeline(demo_inputs)
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"[BATCH] {summary['ok']}/{summary['projects']} projets en {summary['elapsed_sec']}s "
+          f"({summary['failed']} erreurs, {summary['timeout']} hors délai) -> {out_dir}/")
+    return summary
+
+DEMO_INPUTS = {
+    "project_type": "Site web",
+    "project_objectives": "Créer un site vitrine",
+    "industry": "Technologie",
+    "team_members": "- John (PM)\n- Jane (Dev)\n- Bob (Design)\n- Alice (QA)\n- Tom (QA)",
+    "project_requirements": "- Responsive\n- UI moderne\n- Nav claire\n- Pages: A propos, Services, Contact\n- Blog\n- SEO\n- Social\n- Témoignages"
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Planification de projet multi-agents (CrewAI).")
+    parser.add_argument("--batch", help="Fichier JSON / JSONL d'inputs de projets : mode batch")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("PLANNING_CONCURRENCY", "4")),
+                        help="Mode batch : crews exécutées en parallèle")
+    parser.add_argument("--timeout", type=float, default=float(os.getenv("PLANNING_PROJECT_TIMEOUT", "900")),
+                        help="Mode batch : délai max par projet (s)")
+    args = parser.parse_args()
+    if args.batch:
+        summary = run_batch(load_projects(args.batch), concurrency=args.concurrency, timeout=args.timeout)
+        sys.exit(0 if summary["ok"] == summary["projects"] else 2)
+    run_pipeline(DEMO_INPUTS)
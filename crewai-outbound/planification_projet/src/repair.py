@@ -0,0 +1,278 @@
+"""
+Validation et réparation ciblée de la sortie ProjectPlan du LLM.
+
+1. Extraction du JSON (blocs ```json, texte autour, virgules finales).
+2. Corrections locales, fragment par fragment (une tâche, un jalon) : alias de clés
+   (`name` → `task_name`, `resources` → `required_resources`…), heures en texte
+   ("6h", "1,5 jour", "4-6 h"), listes en chaîne ("Jane, Bob").
+3. Un fragment encore invalide est renvoyé seul au LLM avec un prompt court (schéma + erreurs),
+   au lieu de relancer toute la crew. Irréparable : abandonné avec un warning.
+
+`RepairStats` compte les fragments réparés localement, par le LLM, et abandonnés.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from src.models.plan import Milestone, ProjectPlan, TaskEstimate
+
+HOURS_PER_DAY = 8.0
+HOURS_PER_WEEK = 5 * HOURS_PER_DAY
+
+TASK_ALIASES = {
+    "task_name": ("task_name", "name", "task", "title", "nom", "tache", "tâche"),
+    "estimated_time_hours": ("estimated_time_hours", "estimated_hours", "time_hours", "hours", "duration_hours",
+                             "duration", "estimate", "heures", "duree", "durée"),
+    "required_resources": ("required_resources", "resources", "ressources", "owners", "owner", "assignees",
+                           "assignee", "team"),
+    "dependencies": ("dependencies", "depends_on", "predecessors", "dependances", "dépendances"),
+}
+MILESTONE_ALIASES = {
+    "milestone_name": ("milestone_name", "name", "title", "milestone", "nom", "jalon"),
+    "tasks": ("tasks", "task_names", "taches", "tâches"),
+}
+PLAN_ALIASES = {
+    "tasks": ("tasks", "taches", "tâches"),
+    "milestones": ("milestones", "jalons"),
+    "notes": ("notes", "summary", "synthese", "synthèse"),
+}
+
+# nombre ou fourchette ("4-6", "4 à 6") suivi de son unité : l'unité doit coller au nombre,
+# et ne pas être suivie d'une lettre ou d'une apostrophe (« 8h d'effort » : le « d' » n'est pas un jour)
+_QUANTITY = re.compile(
+    r"(\d+(?:[.,]\d+)?)(?:\s*(?:-|–|à|a|to)\s*(\d+(?:[.,]\d+)?))?\s*"
+    r"(heures?|hours?|hrs?|h|semaines?|weeks?|sem|jours?|days?|jh|j|d)?(?![^\W\d_]|['’])",
+    re.I,
+)
+_UNIT_HOURS = (("sem", HOURS_PER_WEEK), ("week", HOURS_PER_WEEK), ("j", HOURS_PER_DAY), ("d", HOURS_PER_DAY))
+_SPLIT = re.compile(r"\s*(?:[,;\n/]|\bet\b|\band\b|&)\s*")
+
+
+@dataclass
+class RepairStats:
+    local: int = 0       # fragments corrigés localement
+    llm: int = 0         # fragments corrigés par le LLM
+    dropped: int = 0     # fragments irréparables, retirés du plan
+    llm_calls: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {"local": self.local, "llm": self.llm, "dropped": self.dropped, "llm_calls": self.llm_calls}
+
+
+# ---------- Corrections locales ----------
+def extract_json(text: str) -> Any:
+    """Premier objet / tableau JSON du texte (blocs de code et virgules finales tolérés)."""
+    text = re.sub(r"```(?:json)?", "", text or "")
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("aucun JSON dans la sortie")
+    start = min(starts)
+    end = text.rfind("}" if text[start] == "{" else "]")
+    candidate = re.sub(r",\s*([}\]])", r"\1", text[start:end + 1])
+    return json.loads(candidate)
+
+
+def parse_hours(value: Any) -> Optional[float]:
+    """8 / "8" / "8h" / "1,5 jour" / "4-6 h" (moyenne) → heures ; None si illisible."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _QUANTITY.search(str(value))
+    if match is None:
+        return None
+    low, high, unit = match.groups()
+    numbers = [float(n.replace(",", ".")) for n in (low, high) if n]
+    hours = sum(numbers) / len(numbers)  # fourchette "4-6" → 5
+    unit = (unit or "h").lower()
+    return hours * next((factor for prefix, factor in _UNIT_HOURS if unit.startswith(prefix)), 1.0)
+
+
+def split_list(value: Any) -> Optional[List[str]]:
+    """Liste de noms depuis une liste, une chaîne séparée par , ; / « et », ou des objets {name: …}."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [p for p in (s.strip(" -•") for s in _SPLIT.split(value)) if p]
+    if isinstance(value, dict):
+        value = [value]
+    if isinstance(value, list):
+        out = []
+        for item in value:
+            if isinstance(item, dict):
+                item = next((item[k] for k in ("name", "task_name", "nom") if item.get(k)), None)
+            if item is not None and str(item).strip():
+                out.append(str(item).strip())
+        return out
+    return None
+
+
+def _pick(raw: Dict[str, Any], aliases: Tuple[str, ...]) -> Tuple[Optional[str], Any]:
+    lowered = {str(k).strip().lower(): k for k in raw}
+    for alias in aliases:
+        if alias in lowered:
+            return lowered[alias], raw[lowered[alias]]
+    return None, None
+
+
+def _coerce(raw: Any, aliases: Dict[str, Tuple[str, ...]], converters: Dict[str, Callable[[Any], Any]],
+            defaults: Dict[str, Any]) -> Tuple[Any, bool]:
+    """(fragment corrigé, au moins une correction appliquée)."""
+    if not isinstance(raw, dict):
+        return raw, False
+    out: Dict[str, Any] = {}
+    changed = False
+    for field, names in aliases.items():
+        key, value = _pick(raw, names)
+        if key is None:
+            if field in defaults:
+                out[field] = defaults[field]
+            continue
+        changed |= key != field
+        convert = converters.get(field)
+        if convert is not None:
+            converted = convert(value)
+            if converted is not None:
+                changed |= converted != value
+                value = converted
+        out[field] = value
+    return out, changed
+
+
+def coerce_task(raw: Any) -> Tuple[Any, bool]:
+    return _coerce(raw, TASK_ALIASES, {"estimated_time_hours": parse_hours, "required_resources": split_list,
+                                       "dependencies": split_list, "task_name": _as_text},
+                   defaults={"dependencies": []})
+
+
+def coerce_milestone(raw: Any) -> Tuple[Any, bool]:
+    return _coerce(raw, MILESTONE_ALIASES, {"tasks": split_list, "milestone_name": _as_text}, defaults={})
+
+
+def _as_text(value: Any) -> Optional[str]:
+    return str(value).strip() if isinstance(value, (str, int, float)) and str(value).strip() else None
+
+
+# ---------- Réparation LLM d'un fragment ----------
+def _fragment_prompt(model: Type[BaseModel], fragment: Any, errors: str) -> str:
+    schema = json.dumps(model.model_json_schema().get("properties", {}), ensure_ascii=False)
+    return (f"Corrige cet objet JSON pour qu'il respecte le schéma {model.__name__}.\n"
+            f"Schéma (propriétés) : {schema}\nErreurs : {errors}\n"
+            f"Objet : {json.dumps(fragment, ensure_ascii=False, default=str)}\n"
+            "Réponds uniquement par l'objet JSON corrigé, sans texte autour.")
+
+
+def default_ask(model: Optional[str] = None, client: Any = None) -> Callable[[str], str]:
+    """
+    Appel chat OpenAI (via le cache disque) pour la réparation des fragments.
+    `client` : client ou fabrique (défaut : OpenAI construit au premier miss du cache).
+    """
+    from src.llm_cache import cached_chat_completion
+
+    if client is None:
+        from openai import OpenAI
+        client = lambda: OpenAI()  # noqa: E731 — fabrique : pas de client construit si tout est en cache
+    model = model or os.getenv("REPAIR_MODEL") or os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini")
+
+    def ask(prompt: str) -> str:
+        return cached_chat_completion(client, model=model, temperature=0,
+                                      messages=[{"role": "user", "content": prompt}])
+    return ask
+
+
+def _validate_fragment(model: Type[BaseModel], raw: Any, coerce: Callable[[Any], Tuple[Any, bool]],
+                       ask: Optional[Callable[[str], str]], stats: RepairStats, max_attempts: int,
+                       what: str) -> Optional[BaseModel]:
+    fragment, changed = coerce(raw)
+    try:
+        obj = model.model_validate(fragment)
+        if changed:
+            stats.count("local")
+        return obj
+    except ValidationError as e:
+        error = e
+    for _ in range(max_attempts if ask is not None else 0):
+        stats.count("llm_calls")
+        try:
+            answer = extract_json(ask(_fragment_prompt(model, fragment, _errors(error))))
+            obj = model.model_validate(coerce(answer)[0])
+            stats.count("llm")
+            return obj
+        except (ValidationError, ValueError) as e:
+            error = e if isinstance(e, ValidationError) else error
+        except Exception as e:  # appel LLM en échec : fragment abandonné plutôt que plan perdu
+            warnings.warn(f"Réparation LLM impossible ({what}) : {e}")
+            break
+    stats.count("dropped")
+    warnings.warn(f"{what} irréparable, retiré du plan : {_errors(error)}")
+    return None
+
+
+def _errors(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'objet'}: {err['msg']}" for err in error.errors())
+
+
+def repair_plan(output: Any, ask: Optional[Callable[[str], str]] = None, stats: Optional[RepairStats] = None,
+                max_attempts: int = 1) -> ProjectPlan:
+    """
+    ProjectPlan depuis la sortie brute du LLM (texte, dict ou ProjectPlan).
+    `ask(prompt) -> str` : réparation LLM des fragments (None = corrections locales seulement).
+    ValueError si aucune tâche valide n'est récupérable.
+    """
+    stats = stats if stats is not None else RepairStats()
+    if isinstance(output, ProjectPlan):
+        return output
+    if isinstance(output, BaseModel):
+        output = output.model_dump()
+    data = output
+    if isinstance(output, str):
+        try:
+            data = extract_json(output)
+        except ValueError:
+            if ask is None:
+                raise ValueError("sortie du LLM sans JSON exploitable")
+            stats.count("llm_calls")
+            data = extract_json(ask(
+                "Convertis ce plan de projet en un objet JSON {\"tasks\": [...], \"milestones\": [...], "
+                "\"notes\": \"...\"} selon le schéma "
+                f"{json.dumps(ProjectPlan.model_json_schema()['properties'], ensure_ascii=False)}.\n"
+                f"Plan :\n{output}\nRéponds uniquement par le JSON."))
+            stats.count("llm")
+    if isinstance(data, list):  # liste de tâches seule
+        data = {"tasks": data}
+        stats.count("local")
+    if not isinstance(data, dict):
+        raise ValueError(f"ProjectPlan attendu, reçu {type(data).__name__}")
+
+    plan_raw, changed = _coerce(data, PLAN_ALIASES, {}, defaults={"tasks": [], "milestones": []})
+    if changed:
+        stats.count("local")
+    tasks = [t for i, raw in enumerate(plan_raw["tasks"] or [])
+             if (t := _validate_fragment(TaskEstimate, raw, coerce_task, ask, stats, max_attempts,
+                                         f"tâche #{i + 1}")) is not None]
+    if not tasks:
+        raise ValueError("aucune tâche valide dans le plan")
+    milestones = [m for i, raw in enumerate(plan_raw["milestones"] or [])
+                  if (m := _validate_fragment(Milestone, raw, coerce_milestone, ask, stats, max_attempts,
+                                              f"jalon #{i + 1}")) is not None]
+    notes = plan_raw.get("notes")
+    return ProjectPlan(tasks=tasks, milestones=milestones,
+                       notes=notes if isinstance(notes, str) else (json.dumps(notes, ensure_ascii=False)
+                                                                   if notes else None))
+
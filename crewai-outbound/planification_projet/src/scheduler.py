@@ -0,0 +1,186 @@
+"""
+Ordonnancement local et déterministe d'un ProjectPlan : plus de lissage de charge demandé au LLM.
+
+1. CPM (méthode du chemin critique) sur les dépendances : dates au plus tôt / au plus tard,
+   marges, chemin critique. Ressources ignorées → borne basse de la durée du projet.
+2. Lissage par ordonnancement en série (serial SGS) : les tâches éligibles sont placées
+   par date de début au plus tard croissante (règle LST), chacune au premier créneau où
+   toutes ses ressources sont libres (capacité 1 par personne, insertion dans les trous).
+
+Heures de travail continues (pas de calendrier). Une dépendance inconnue est ignorée
+avec un warning ; un nom de tâche dupliqué ou un cycle lève une ValueError.
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+import warnings
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from src.models.plan import ProjectPlan, ScheduledTask, TaskEstimate
+
+EPS = 1e-9
+
+
+@dataclass
+class CpmResult:
+    order: List[int]                # ordre topologique (indices dans la liste des tâches)
+    preds: List[List[int]]
+    earliest_start: List[float]
+    latest_start: List[float]
+    duration: float                 # durée du projet sans contrainte de ressources
+
+    def slack(self, i: int) -> float:
+        return self.latest_start[i] - self.earliest_start[i]
+
+
+def _graph(tasks: Sequence[TaskEstimate]) -> Tuple[List[List[int]], List[List[int]]]:
+    index: Dict[str, int] = {}
+    for i, t in enumerate(tasks):
+        if t.task_name in index:
+            raise ValueError(f"Nom de tâche dupliqué : '{t.task_name}'")
+        index[t.task_name] = i
+    preds: List[List[int]] = [[] for _ in tasks]
+    succs: List[List[int]] = [[] for _ in tasks]
+    for i, t in enumerate(tasks):
+        for dep in dict.fromkeys(t.dependencies):  # doublons retirés, ordre conservé
+            j = index.get(dep)
+            if j is None:
+                warnings.warn(f"Tâche '{t.task_name}' : dépendance inconnue '{dep}' ignorée.")
+                continue
+            preds[i].append(j)
+            succs[j].append(i)
+    return preds, succs
+
+
+def _topological_order(preds: List[List[int]], succs: List[List[int]]) -> List[int]:
+    indegree = [len(p) for p in preds]
+    ready = [i for i, d in enumerate(indegree) if d == 0]
+    heapq.heapify(ready)  # à égalité, ordre de saisie : résultat déterministe
+    order: List[int] = []
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(i)
+        for s in succs[i]:
+            indegree[s] -= 1
+            if indegree[s] == 0:
+                heapq.heappush(ready, s)
+    if len(order) != len(preds):
+        raise ValueError(f"Cycle de dépendances entre {len(preds) - len(order)} tâches")
+    return order
+
+
+def compute_cpm(tasks: Sequence[TaskEstimate]) -> CpmResult:
+    """Passes avant / arrière en O(tâches + dépendances)."""
+    preds, succs = _graph(tasks)
+    order = _topological_order(preds, succs)
+    dur = [max(0.0, t.estimated_time_hours) for t in tasks]
+
+    es = [0.0] * len(tasks)
+    for i in order:
+        es[i] = max((es[p] + dur[p] for p in preds[i]), default=0.0)
+    duration = max((es[i] + dur[i] for i in order), default=0.0)
+
+    ls = [0.0] * len(tasks)
+    for i in reversed(order):
+        lf = min((ls[s] for s in succs[i]), default=duration)
+        ls[i] = lf - dur[i]
+    return CpmResult(order=order, preds=preds, earliest_start=es, latest_start=ls, duration=duration)
+
+
+def critical_path(tasks: Sequence[TaskEstimate], cpm: CpmResult) -> List[str]:
+    """Chaîne de tâches à marge nulle, du début à la fin du projet."""
+    dur = [max(0.0, t.estimated_time_hours) for t in tasks]
+    critical = [i for i in cpm.order if cpm.slack(i) <= EPS]
+    if not critical:
+        return []
+    current = next((i for i in critical if cpm.earliest_start[i] + dur[i] >= cpm.duration - EPS), critical[-1])
+    path = [current]
+    while True:
+        prev = [p for p in cpm.preds[current]
+                if cpm.slack(p) <= EPS and abs(cpm.earliest_start[p] + dur[p] - cpm.earliest_start[current]) <= EPS]
+        if not prev:
+            break
+        current = min(prev)
+        path.append(current)
+    return [tasks[i].task_name for i in reversed(path)]
+
+
+class _Timeline:
+    """Créneaux occupés d'une ressource, triés par début (sans chevauchement)."""
+
+    def __init__(self) -> None:
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+    def conflict_end(self, start: float, end: float) -> float:
+        """Fin du dernier créneau qui chevauche [start, end) ; -1 si la ressource est libre."""
+        k = bisect.bisect_left(self.starts, end - EPS)
+        worst = -1.0
+        while k > 0 and self.ends[k - 1] > start + EPS:
+            worst = max(worst, self.ends[k - 1])
+            k -= 1
+        return worst
+
+    def book(self, start: float, end: float) -> None:
+        if end - start <= EPS:
+            return
+        k = bisect.bisect_left(self.starts, start)
+        self.starts.insert(k, start)
+        self.ends.insert(k, end)
+
+
+def level_resources(tasks: Sequence[TaskEstimate], cpm: CpmResult) -> List[Tuple[float, float]]:
+    """(début, fin) par tâche : serial SGS, priorité = début au plus tard, puis ordre de saisie."""
+    preds = cpm.preds
+    succs: List[List[int]] = [[] for _ in tasks]
+    for i, ps in enumerate(preds):
+        for p in ps:
+            succs[p].append(i)
+    dur = [max(0.0, t.estimated_time_hours) for t in tasks]
+    remaining = [len(p) for p in preds]
+    eligible = [(cpm.latest_start[i], i) for i, n in enumerate(remaining) if n == 0]
+    heapq.heapify(eligible)
+    timelines: Dict[str, _Timeline] = {}
+    slots: List[Tuple[float, float]] = [(0.0, 0.0)] * len(tasks)
+
+    while eligible:
+        _, i = heapq.heappop(eligible)
+        resources = [timelines.setdefault(r, _Timeline()) for r in dict.fromkeys(tasks[i].required_resources)]
+        start = max((slots[p][1] for p in preds[i]), default=0.0)
+        while True:  # décale jusqu'à un créneau libre pour toutes les ressources
+            blocked = max((tl.conflict_end(start, start + dur[i]) for tl in resources), default=-1.0)
+            if blocked < 0:
+                break
+            start = blocked
+        slots[i] = (start, start + dur[i])
+        for tl in resources:
+            tl.book(start, start + dur[i])
+        for s in succs[i]:
+            remaining[s] -= 1
+            if remaining[s] == 0:
+                heapq.heappush(eligible, (cpm.latest_start[s], s))
+    return slots
+
+
+def schedule_plan(plan: ProjectPlan) -> ProjectPlan:
+    """Copie du plan complétée : planning lissé, chemin critique, durées et date d'atteinte des jalons."""
+    cpm = compute_cpm(plan.tasks)
+    slots = level_resources(plan.tasks, cpm)
+    schedule = [
+        ScheduledTask(task_name=t.task_name, start_hour=round(start, 2), end_hour=round(end, 2),
+                      resources=list(t.required_resources), slack_hours=round(cpm.slack(i), 2),
+                      critical=cpm.slack(i) <= EPS)
+        for i, (t, (start, end)) in enumerate(zip(plan.tasks, slots))
+    ]
+    ends = {s.task_name: s.end_hour for s in schedule}
+    milestones = [m.model_copy(update={"due_hour": max((ends[n] for n in m.tasks if n in ends), default=None)})
+                  for m in plan.milestones]
+    return plan.model_copy(update={
+        "schedule": sorted(schedule, key=lambda s: (s.start_hour, s.task_name)),
+        "milestones": milestones,
+        "critical_path": critical_path(plan.tasks, cpm),
+        "critical_path_hours": round(cpm.duration, 2),
+        "makespan_hours": round(max((end for _, end in slots), default=0.0), 2),
+    })
@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.batch import load_projects, project_label, run_projects
+
+
+def test_load_projects_json_and_jsonl(tmp_path):
+    jsonl = tmp_path / "p.jsonl"
+    jsonl.write_text('{"project_type": "A"}\n\n{"project_type": "B"}\n', encoding="utf-8")
+    assert [p["project_type"] for p in load_projects(str(jsonl))] == ["A", "B"]
+    as_json = tmp_path / "p.json"
+    as_json.write_text(json.dumps([{"project_type": "C"}]), encoding="utf-8")
+    assert load_projects(str(as_json)) == [{"project_type": "C"}]
+    bad = tmp_path / "bad.json"
+    bad.write_text('{"project_type": "C"}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_projects(str(bad))
+
+
+def test_example_projects_file_loads():
+    projects = load_projects("config/projects.example.jsonl")
+    assert len({project_label(p, i) for i, p in enumerate(projects)}) == len(projects)
+
+
+def test_labels_are_unique_even_for_same_project_type():
+    assert project_label({"project_type": "Site web"}, 0) != project_label({"project_type": "Site web"}, 1)
+
+
+def test_concurrency_cap_and_results_in_input_order():
+    running, peak, lock = 0, 0, threading.Lock()
+
+    def run_one(inputs, label):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return inputs["n"] * 2
+
+    results = run_projects([{"n": i} for i in range(8)], run_one, concurrency=3, poll=0.01)
+    assert [r.value for r in results] == [i * 2 for i in range(8)]
+    assert all(r.status == "ok" for r in results)
+    assert peak == 3
+
+
+def test_errors_and_timeouts_do_not_stop_the_batch():
+    release = threading.Event()
+
+    def run_one(inputs, label):
+        if inputs["kind"] == "slow":
+            release.wait(5)
+        if inputs["kind"] == "boom":
+            raise RuntimeError("sortie invalide")
+        return "plan"
+
+    t0 = time.monotonic()
+    results = run_projects([{"kind": "slow"}, {"kind": "boom"}, {"kind": "ok"}], run_one,
+                           concurrency=2, timeout=0.2, poll=0.01)
+    release.set()
+    assert time.monotonic() - t0 < 2
+    assert [r.status for r in results] == ["timeout", "error", "ok"]
+    assert results[1].error == "sortie invalide"
+    assert results[2].value == "plan"
+
+
+def test_timed_out_project_keeps_its_slot_until_it_really_ends():
+    running, peak, lock = 0, 0, threading.Lock()
+
+    def run_one(inputs, label):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.3 if inputs["slow"] else 0.02)
+        with lock:
+            running -= 1
+        return "plan"
+
+    results = run_projects([{"slow": True}] + [{"slow": False}] * 4, run_one, concurrency=2, timeout=0.1, poll=0.01)
+    assert [r.status for r in results] == ["timeout"] + ["ok"] * 4
+    assert peak == 2  # le thread hors délai compte toujours dans la limite de concurrence
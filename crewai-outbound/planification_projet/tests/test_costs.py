@@ -0,0 +1,64 @@
+import warnings
+
+import pytest
+
+from src.costs import CostLedger, cost_usd, resolve_price, usage_dict
+
+
+def test_input_cached_and_output_rates_are_separate():
+    # gpt-4o-mini : 0.15 $ entrée, 0.075 $ entrée en cache, 0.60 $ sortie (par million)
+    cost = cost_usd("gpt-4o-mini", prompt_tokens=1_000_000, completion_tokens=1_000_000,
+                    cached_prompt_tokens=400_000)
+    assert cost == pytest.approx(0.6 * 0.15 + 0.4 * 0.075 + 0.60)
+
+
+def test_model_aliases_resolve_to_the_right_price():
+    assert resolve_price("openai/gpt-4o-mini") == resolve_price("gpt-4o-mini")
+    assert resolve_price("gpt-4o-mini-2024-07-18") == resolve_price("gpt-4o-mini")
+    assert resolve_price("gpt-4o-2024-08-06") == resolve_price("gpt-4o")
+    assert resolve_price("gpt-4o-2024-08-06") != resolve_price("gpt-4o-mini")
+
+
+def test_unknown_model_gives_no_cost_and_warns():
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert cost_usd("modele-maison-v1", 1000, 1000) is None
+    assert caught
+
+
+def test_usage_dict_accepts_dicts_and_objects():
+    class Usage:
+        def model_dump(self):
+            return {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+    assert usage_dict(Usage())["prompt_tokens"] == 10
+    assert usage_dict({"prompt_tokens": 3})["cached_prompt_tokens"] == 0
+    assert usage_dict(None) == {}
+
+
+def test_ledger_aggregates_across_models_labels_and_runs(tmp_path):
+    ledger = CostLedger()
+    ledger.add("gpt-4o-mini", 1_000_000, 0, label="site-web")
+    ledger.add("gpt-4o-mini", 0, 1_000_000, label="crm")
+    ledger.add_usage("gpt-4o", {"prompt_tokens": 1_000_000, "successful_requests": 3}, label="crm")
+
+    summary = ledger.summary()
+    assert summary["total_cost_usd"] == pytest.approx(0.15 + 0.60 + 2.50)
+    assert summary["by_model"]["gpt-4o-mini"]["runs"] == 2
+    assert summary["by_label"]["crm"]["cost_usd"] == pytest.approx(0.60 + 2.50)
+
+    path = tmp_path / "ledger.jsonl"
+    ledger.append_jsonl(str(path))
+    ledger.append_jsonl(str(path))
+    replay = CostLedger.from_jsonl(str(path))
+    assert replay.total_cost() == pytest.approx(2 * ledger.total_cost())
+    assert replay.summary()["by_model"]["gpt-4o-mini"]["runs"] == 4
+
+
+def test_total_is_none_when_a_model_is_unpriced():
+    ledger = CostLedger()
+    ledger.add("gpt-4o-mini", 1000, 1000)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ledger.add("modele-maison-v1", 1000, 1000)
+        assert ledger.total_cost() is None
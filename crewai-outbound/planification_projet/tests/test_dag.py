@@ -0,0 +1,62 @@
+import pytest
+import yaml
+
+from src.dag import TaskTimer, async_flags, critical_path, load_dependencies, topological_levels
+
+
+def test_repo_config_is_a_chain():
+    with open("config/tasks.yaml") as f:
+        deps = load_dependencies(yaml.safe_load(f))
+    assert topological_levels(deps) == [["task_breakdown"], ["time_resource_estimation"], ["resource_allocation"]]
+    assert not any(async_flags(topological_levels(deps)).values())
+
+
+def test_independent_branches_share_a_level():
+    deps = load_dependencies({
+        "cadrage": {},
+        "design": {"depends_on": ["cadrage"]},
+        "infra": {"depends_on": "cadrage"},
+        "budget": {"depends_on": ["cadrage"]},
+        "plan": {"depends_on": ["design", "infra", "budget"]},
+    })
+    levels = topological_levels(deps)
+    assert levels == [["cadrage"], ["design", "infra", "budget"], ["plan"]]
+    assert async_flags(levels) == {"cadrage": False, "design": True, "infra": True, "budget": True, "plan": False}
+
+
+def test_level_after_async_level_starts_with_a_barrier():
+    levels = [["a", "b"], ["c", "d"], ["e"]]
+    flags = async_flags(levels)
+    assert flags == {"a": True, "b": True, "c": False, "d": True, "e": False}
+
+
+def test_crew_never_ends_on_an_async_task():
+    flags = async_flags([["a"], ["b", "c"]])
+    assert flags["c"] is False
+
+
+def test_cycle_and_unknown_dependency_are_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        topological_levels(load_dependencies({"a": {"depends_on": ["b"]}, "b": {"depends_on": ["a"]}}))
+    with pytest.raises(ValueError, match="inconnues"):
+        load_dependencies({"a": {"depends_on": ["fantome"]}})
+
+
+def test_critical_path_follows_latest_finishing_dependency():
+    deps = {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}
+    spans = {"a": (0.0, 1.0), "b": (1.0, 2.0), "c": (1.0, 5.0), "d": (5.0, 6.0)}
+    assert critical_path(deps, spans) == (["a", "c", "d"], 6.0)
+
+
+class FakeTask:
+    def _execute_core(self, agent=None):
+        return "ok"
+
+
+def test_timer_records_each_task():
+    timer = TaskTimer()
+    task = FakeTask()
+    timer.instrument({"cadrage": task})
+    assert task._execute_core() == "ok"
+    start, end = timer.spans["cadrage"]
+    assert end >= start
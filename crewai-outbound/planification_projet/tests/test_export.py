@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.export import export_plan, export_plans, load_plans  # noqa: E402
+from src.models.plan import Milestone, ProjectPlan, TaskEstimate  # noqa: E402
+from src.scheduler import schedule_plan  # noqa: E402
+
+
+def _plan(hours=8.0):
+    return ProjectPlan(
+        tasks=[TaskEstimate(task_name="Cadrage", estimated_time_hours=hours, required_resources=["John", "Bob"]),
+               TaskEstimate(task_name="Dev", estimated_time_hours=16, required_resources=["Jane"],
+                            dependencies=["Cadrage"])],
+        milestones=[Milestone(milestone_name="MVP", tasks=["Cadrage", "Dev"])],
+    )
+
+
+def _at(day):
+    return datetime(2025, 1, day, 9, 0, tzinfo=timezone.utc)
+
+
+def test_runs_append_into_date_partitions(tmp_path):
+    root = str(tmp_path)
+    export_plan(_plan(), root=root, project="Site web", run_at=_at(1))
+    export_plan(_plan(), root=root, project="Site web", run_at=_at(1))
+    export_plans([_plan(), _plan(4)], root=root, projects=["CRM", "ERP"], run_at=_at(20))
+
+    assert sorted(p.name for p in (tmp_path / "tasks").iterdir()) == ["run_date=2025-01-01", "run_date=2025-01-20"]
+    tasks = load_plans("tasks", root=root)
+    assert len(tasks) == 8
+    assert tasks["run_id"].nunique() == 4
+
+
+def test_list_columns_stay_typed(tmp_path):
+    run_id = export_plan(schedule_plan(_plan()), root=str(tmp_path), run_at=_at(1))
+    tasks = load_plans("tasks", root=str(tmp_path)).set_index("task_name")
+    assert list(tasks.loc["Cadrage", "required_resources"]) == ["John", "Bob"]
+    assert list(tasks.loc["Dev", "dependencies"]) == ["Cadrage"]
+    assert tasks.loc["Dev", "end_hour"] == 24
+    plans = load_plans("plans", root=str(tmp_path))
+    assert plans.loc[0, "run_id"] == run_id
+    assert list(plans.loc[0, "critical_path"]) == ["Cadrage", "Dev"]
+    assert list(load_plans("milestones", root=str(tmp_path)).loc[0, "tasks"]) == ["Cadrage", "Dev"]
+
+
+def test_date_and_project_filters(tmp_path):
+    root = str(tmp_path)
+    export_plans([_plan(), _plan()], root=root, projects=["CRM", "ERP"], run_at=_at(1))
+    export_plan(_plan(), root=root, project="CRM", run_at=_at(20))
+    assert len(load_plans("plans", root=root, start="2025-01-10")) == 1
+    assert len(load_plans("plans", root=root, end="2025-01-10")) == 2
+    assert len(load_plans("plans", root=root, projects=["CRM"])) == 2
+
+
+def test_missing_dataset_loads_empty(tmp_path):
+    df = load_plans("milestones", root=str(tmp_path))
+    assert df.empty and "tasks" in df.columns
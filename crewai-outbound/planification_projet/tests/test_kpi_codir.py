@@ -0,0 +1,45 @@
+import pytest
+
+from src.kpi_codir import gpt_prompt, load_kpis, summary_table
+
+HEADER = "Mois,CA réalisé (€),Objectif (€),Pipe (€),Opportunités,Risques/Blocages\n"
+
+
+def _csv(tmp_path, body, header=HEADER):
+    path = tmp_path / "data_codir.csv"
+    path.write_text(header + body, encoding="utf-8")
+    return str(path)
+
+
+def test_single_quarter_matches_legacy_report(tmp_path):
+    path = _csv(tmp_path, "Janvier,100,120,50,A,R\nFévrier,130,120,40,B,\nMars,90,120,60,C,S\n")
+    k = load_kpis(path).for_bu("Global")
+    assert (k.trimestre, k.ca, k.objectif, k.ecart) == ("Trimestre", 320, 360, -40)
+    assert k.taux_realisation == pytest.approx(88.89, abs=0.01) and k.alerte
+    assert k.mois_bas == "Mars" and k.tendance_points is None
+    assert k.couverture_pipe == pytest.approx(150 / 40)
+    assert list(k.mois["Mois"]) == ["Janvier", "Février", "Mars"]
+    assert "Réalisation à 88.9%" in k.synthese() and "Mars" in gpt_prompt(k)
+
+
+def test_many_bus_and_quarters_in_one_pass(tmp_path):
+    rows = "".join(f"{bu},{m},{ca},100,10,,\n" for bu, m, ca in [
+        ("Retail", "2025-01", 80), ("Retail", "2025-02", 90), ("Retail", "2025-03", 100),
+        ("Retail", "2025-04", 120), ("Pro", "2025-01", 110), ("Pro", "2025-02", 70),
+    ])
+    kpis = load_kpis(_csv(tmp_path, rows, header="BU," + HEADER))
+    assert kpis.bus == ["Retail", "Pro"]
+    assert list(kpis.quarters.index) == [("Retail", "2025Q1"), ("Retail", "2025Q2"), ("Pro", "2025Q1")]
+
+    retail = kpis.for_bu("Retail")  # dernier trimestre par défaut
+    assert retail.trimestre == "2025Q2" and retail.couverture_pipe is None  # objectif dépassé
+    assert retail.tendance_points == pytest.approx(120 - 90)
+    assert kpis.for_bu("Pro").mois_bas == "2025-02"
+    # moyenne glissante sur 3 mois, par BU (ne déborde pas d'une BU à l'autre)
+    assert list(kpis.monthly["ca_glissant"]) == pytest.approx([80, 85, 90, 310 / 3, 110, 90])
+    assert len(summary_table(kpis)) == 3
+
+
+def test_missing_columns_raise(tmp_path):
+    with pytest.raises(ValueError):
+        load_kpis(_csv(tmp_path, "Janvier,100\n", header="Mois,CA réalisé (€)\n"))
@@ -0,0 +1,85 @@
+import time
+from types import SimpleNamespace
+
+from src.llm_cache import LLMCache, cache_key, cached_chat_completion
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        self.calls += 1
+        msg = SimpleNamespace(content=f"réponse {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+
+def _request(prompt="Bonjour", temperature=0.2):
+    return dict(model="gpt-4o-mini", messages=[{"role": "user", "content": prompt}],
+                temperature=temperature, max_tokens=350)
+
+
+def test_cache_key_is_stable_and_parameter_sensitive():
+    assert cache_key(**_request()) == cache_key(**dict(reversed(list(_request().items()))))
+    assert cache_key(**_request()) != cache_key(**_request(temperature=0.3))
+    assert cache_key(**_request()) != cache_key(**_request(prompt="Salut"))
+
+
+def test_identical_request_is_served_from_cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"))
+    client = FakeClient()
+
+    first = cached_chat_completion(client, cache, **_request())
+    second = cached_chat_completion(client, cache, **_request())
+
+    assert first == second == "réponse 1"
+    assert client.calls == 1
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_client_factory_not_built_on_hit(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"))
+    cache.put(cache_key(**_request()), "en cache")
+
+    def factory():
+        raise AssertionError("client construit inutilement")
+
+    assert cached_chat_completion(factory, cache, **_request()) == "en cache"
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    LLMCache(path).put("k", "v")
+    assert LLMCache(path).get("k") == "v"
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"), ttl_seconds=0.05)
+    cache.put("k", "v")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats.expired == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = LLMCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    cache.put("a", "1")
+    time.sleep(0.01)
+    cache.put("b", "2")
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", "3")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats.evictions == 1
+
+
+def test_client_class_is_instantiated_on_miss(tmp_path):
+    class ClientClass:
+        chat = property(lambda self: FakeClient().chat)  # attribut visible sur la classe, comme openai.OpenAI
+
+    assert cached_chat_completion(ClientClass, LLMCache(str(tmp_path / "c.sqlite3")), **_request()) == "réponse 1"
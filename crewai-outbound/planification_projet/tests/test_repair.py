@@ -0,0 +1,109 @@
+import functools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.repair import RepairStats, default_ask, extract_json, parse_hours, repair_plan, split_list
+
+RAW = """Voici le plan final :
+```json
+{
+  "tasks": [
+    {"task_name": "Cadrage", "estimated_time_hours": 8, "required_resources": ["John"]},
+    {"name": "Design", "hours": "2 jours", "resources": "Bob et Jane", "depends_on": "Cadrage"},
+    {"task_name": "Recette", "estimated_time_hours": "4-6h", "required_resources": ["Alice"],},
+  ],
+  "milestones": [{"milestone_name": "Go live", "tasks": "Design, Recette"}]
+}
+```"""
+
+
+def test_parse_hours_and_lists():
+    assert parse_hours("8h") == 8
+    assert parse_hours("1,5 jour") == 12
+    assert parse_hours("4-6 h") == 5
+    assert parse_hours("1 semaine") == 40
+    # l'unité est celle collée au nombre : le « d' » élidé n'est pas une unité « jour »
+    assert parse_hours("8h d'effort") == 8
+    assert parse_hours("4 heures d'analyse") == 4
+    assert parse_hours("2 d'effort") == 2
+    assert parse_hours("4 à 6 jours") == 40
+    assert parse_hours("à définir") is None
+    assert split_list("Jane, Bob et Alice") == ["Jane", "Bob", "Alice"]
+    assert split_list([{"name": "Jane"}, "Bob"]) == ["Jane", "Bob"]
+
+
+def test_extract_json_tolerates_fences_and_trailing_commas():
+    assert extract_json('ok ```json\n{"a": [1, 2,],}\n```') == {"a": [1, 2]}
+    with pytest.raises(ValueError):
+        extract_json("pas de JSON ici")
+
+
+def test_local_repairs_without_llm():
+    stats = RepairStats()
+    plan = repair_plan(RAW, stats=stats)
+    design = plan.tasks[1]
+    assert (design.task_name, design.estimated_time_hours) == ("Design", 16)
+    assert design.required_resources == ["Bob", "Jane"] and design.dependencies == ["Cadrage"]
+    assert plan.tasks[2].estimated_time_hours == 5
+    assert plan.milestones[0].tasks == ["Design", "Recette"]
+    # Design, Recette et le jalon corrigés localement ; Cadrage était déjà valide
+    assert stats.as_dict() == {"local": 3, "llm": 0, "dropped": 0, "llm_calls": 0}
+
+
+def test_only_the_failing_fragment_goes_to_the_llm():
+    prompts = []
+
+    def ask(prompt):
+        prompts.append(prompt)
+        return '{"task_name": "Backend", "estimated_time_hours": 24, "required_resources": ["Jane"]}'
+
+    data = {"tasks": [{"task_name": "Cadrage", "estimated_time_hours": 8, "required_resources": ["John"]},
+                      {"task_name": "Backend", "estimated_time_hours": "à estimer"}],
+            "milestones": []}
+    stats = RepairStats()
+    plan = repair_plan(json.dumps(data), ask=ask, stats=stats)
+    assert [t.task_name for t in plan.tasks] == ["Cadrage", "Backend"]
+    assert len(prompts) == 1 and "Cadrage" not in prompts[0] and "required_resources" in prompts[0]
+    assert stats.as_dict() == {"local": 0, "llm": 1, "dropped": 0, "llm_calls": 1}
+
+
+def test_irreparable_fragment_is_dropped():
+    data = {"tasks": [{"task_name": "Cadrage", "estimated_time_hours": 8, "required_resources": ["John"]},
+                      {"task_name": "Mystère"}],
+            "milestones": [{"milestone_name": "Fin"}]}
+    stats = RepairStats()
+    with pytest.warns(UserWarning):
+        plan = repair_plan(data, ask=lambda prompt: "désolé", stats=stats)
+    assert [t.task_name for t in plan.tasks] == ["Cadrage"] and plan.milestones == []
+    assert stats.dropped == 2 and stats.llm_calls == 2
+
+
+def test_no_valid_task_raises():
+    with pytest.raises(ValueError):
+        repair_plan("le LLM a répondu en prose")
+
+
+class StubOpenAI:
+    """Comme openai.OpenAI : `chat` est une cached_property, donc visible sur la classe."""
+    instances = 0
+
+    def __init__(self):
+        StubOpenAI.instances += 1
+
+    @functools.cached_property
+    def chat(self):
+        msg = SimpleNamespace(content='{"task_name": "Backend", "estimated_time_hours": 24, '
+                                      '"required_resources": ["Jane"]}')
+        create = lambda **request: SimpleNamespace(choices=[SimpleNamespace(message=msg)])  # noqa: E731
+        return SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+def test_default_ask_builds_the_client_class(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_DISABLED", "1")
+    stats = RepairStats()
+    plan = repair_plan({"tasks": [{"task_name": "Backend"}], "milestones": []},
+                       ask=default_ask("gpt-4o-mini", client=StubOpenAI), stats=stats)
+    assert plan.tasks[0].required_resources == ["Jane"]
+    assert StubOpenAI.instances == 1 and stats.as_dict()["llm"] == 1
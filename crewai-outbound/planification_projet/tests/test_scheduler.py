@@ -0,0 +1,77 @@
+import pytest
+
+from src.models.plan import Milestone, ProjectPlan, TaskEstimate
+from src.scheduler import compute_cpm, schedule_plan
+
+
+def _task(name, hours, resources, deps=()):
+    return TaskEstimate(task_name=name, estimated_time_hours=hours, required_resources=list(resources),
+                        dependencies=list(deps))
+
+
+def _plan():
+    return ProjectPlan(
+        tasks=[
+            _task("Cadrage", 8, ["John"]),
+            _task("Design", 16, ["Bob"], ["Cadrage"]),
+            _task("Backend", 24, ["Jane"], ["Cadrage"]),
+            _task("Frontend", 12, ["Jane"], ["Design"]),
+            _task("Recette", 8, ["Alice"], ["Backend", "Frontend"]),
+        ],
+        milestones=[Milestone(milestone_name="Go live", tasks=["Recette"])],
+    )
+
+
+def test_cpm_dates_slack_and_critical_path():
+    plan = schedule_plan(_plan())
+    # Cadrage 8 → Design 16 → Frontend 12 → Recette 8 = 44h ; Backend (24h) a 4h de marge
+    assert plan.critical_path == ["Cadrage", "Design", "Frontend", "Recette"]
+    assert plan.critical_path_hours == 44
+    slack = {s.task_name: s.slack_hours for s in plan.schedule}
+    assert slack["Backend"] == 4 and slack["Design"] == 0
+
+
+def test_levelling_never_double_books_a_person():
+    plan = schedule_plan(_plan())
+    jane = sorted((s.start_hour, s.end_hour) for s in plan.schedule if "Jane" in s.resources)
+    assert jane[0][1] <= jane[1][0]
+    # Jane enchaîne Backend puis Frontend : 8 + 24 + 12 + 8, au-delà du chemin critique
+    assert plan.makespan_hours == 52
+    assert plan.milestones[0].due_hour == 52
+
+
+def test_dependencies_are_respected():
+    plan = schedule_plan(_plan())
+    slots = {s.task_name: s for s in plan.schedule}
+    for task in plan.tasks:
+        for dep in task.dependencies:
+            assert slots[dep].end_hour <= slots[task.task_name].start_hour
+
+
+def test_resource_gap_is_reused():
+    plan = schedule_plan(ProjectPlan(tasks=[
+        _task("A", 10, ["X"]),
+        _task("B", 5, ["Y"], ["A"]),
+        _task("C", 5, ["X"], ["B"]),
+        _task("D", 4, ["X"]),
+    ], milestones=[]))
+    slots = {s.task_name: (s.start_hour, s.end_hour) for s in plan.schedule}
+    assert slots["D"] == (10, 14)  # se glisse dans le trou de X pendant B
+    assert slots["C"] == (15, 20)
+
+
+def test_same_input_gives_same_schedule():
+    assert schedule_plan(_plan()) == schedule_plan(_plan())
+
+
+def test_cycle_and_duplicate_are_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        compute_cpm([_task("A", 1, [], ["B"]), _task("B", 1, [], ["A"])])
+    with pytest.raises(ValueError, match="dupliqué"):
+        compute_cpm([_task("A", 1, []), _task("A", 2, [])])
+
+
+def test_unknown_dependency_is_ignored_with_a_warning():
+    with pytest.warns(UserWarning, match="inconnue"):
+        plan = schedule_plan(ProjectPlan(tasks=[_task("A", 3, ["X"], ["Fantôme"])], milestones=[]))
+    assert plan.makespan_hours == 3
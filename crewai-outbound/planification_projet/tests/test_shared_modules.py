@@ -0,0 +1,14 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[3] / "scripts" / "sync_shared_modules.py"
+
+
+@pytest.mark.skipif(not SCRIPT.exists(), reason="projet extrait hors du monorepo")
+def test_shared_module_copies_match_the_canonical_one():
+    spec = importlib.util.spec_from_file_location("sync_shared_modules", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert module.drifted() == [], "lancer : python scripts/sync_shared_modules.py"
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from src import tracing
+
+
+@pytest.fixture
+def tracer(tmp_path, monkeypatch):
+    t = tracing.Tracer(str(tmp_path / "trace.json"))
+    monkeypatch.setattr(tracing, "_tracer", t)
+    return t
+
+
+class FakeTool:
+    name = "Outil factice"
+
+    def _run(self, x):
+        return x * 2
+
+
+class FakeTask:
+    description = "Découper le projet en tâches"
+    output_file = None
+
+    def _execute_core(self, agent=None):
+        return "ok"
+
+
+def test_span_is_a_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    with tracing.span("rien", "app") as args:
+        args["x"] = 1
+    assert tracing.get_tracer() is None
+
+
+def test_spans_are_exported_as_chrome_trace(tracer):
+    with tracing.span("parent", "crew"):
+        with tracing.span("enfant", "http", path="/1/boards") as args:
+            args["status"] = 200
+    with pytest.raises(ValueError):
+        with tracing.span("échec", "tool"):
+            raise ValueError("boom")
+
+    data = json.loads(open(tracer.export(), encoding="utf-8").read())
+    spans = {e["name"]: e for e in data["traceEvents"] if e["ph"] == "X"}
+    assert set(spans) == {"parent", "enfant", "échec"}
+    assert spans["enfant"]["args"] == {"path": "/1/boards", "status": 200}
+    assert "boom" in spans["échec"]["args"]["error"]
+    # l'enfant est contenu dans le parent (imbrication correcte dans Perfetto)
+    assert spans["parent"]["ts"] <= spans["enfant"]["ts"]
+    assert spans["enfant"]["ts"] + spans["enfant"]["dur"] <= spans["parent"]["ts"] + spans["parent"]["dur"]
+    assert any(e["ph"] == "M" for e in data["traceEvents"])
+
+
+def test_tools_and_tasks_are_wrapped_once(tracer):
+    tool, task = FakeTool(), FakeTask()
+    tracing.instrument_tools([tool])
+    tracing.instrument_tools([tool])
+    tracing.instrument_tasks([task])
+    assert tool._run(21) == 42
+    assert task._execute_core() == "ok"
+
+    names = [e["name"] for e in tracer.events]
+    assert names == ["tool: Outil factice", "task: Découper le projet en tâches"]
+    assert tracer.summary()["tool"]["count"] == 1
@@ -0,0 +1,73 @@
+"""
+Modules partagés entre projets, copiés à l'identique dans chaque projet (chacun reste autonome :
+son propre requirements.txt, ses imports relatifs à son dossier, pas de paquet commun à installer).
+
+La copie canonique est celle de planification_projet (c'est elle qui porte les tests) ;
+les autres copies ne se modifient pas à la main :
+
+    python scripts/sync_shared_modules.py           # recopie la version canonique dans chaque projet
+    python scripts/sync_shared_modules.py --check   # CI : code 1 si une copie a divergé
+"""
+from __future__ import annotations
+
+import argparse
+import filecmp
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+CANONICAL_DIR = "crewai-outbound/planification_projet/src"
+
+# module → copies (chemins relatifs à la racine du repo)
+SHARED = {
+    "llm_cache.py": ("ai-dashboards/src", "crewai-outbound/outbound_commercial/src"),
+    "costs.py": ("crewai-outbound/multiagents",),
+    "tracing.py": ("crewai-outbound/multiagents", "crewai-outbound/outbound_commercial/src"),
+}
+
+
+def header(name: str) -> str:
+    """En-tête commun (identique dans toutes les copies) désignant la copie canonique."""
+    return (f"# Module partagé — copie canonique : {CANONICAL_DIR}/{name}\n"
+            "# Ne pas modifier les copies : python scripts/sync_shared_modules.py\n")
+
+
+def drifted(root: Path = ROOT) -> list[str]:
+    """Problèmes trouvés : en-tête absent de la canonique, copie manquante ou différente."""
+    problems = []
+    for name, copies in SHARED.items():
+        canonical = root / CANONICAL_DIR / name
+        if not canonical.read_text(encoding="utf-8").startswith(header(name)):
+            problems.append(f"{canonical.relative_to(root)} : en-tête de module partagé absent")
+        for folder in copies:
+            copy = root / folder / name
+            if not copy.exists() or not filecmp.cmp(canonical, copy, shallow=False):
+                problems.append(f"{copy.relative_to(root)} diffère de {canonical.relative_to(root)}")
+    return problems
+
+
+def sync(root: Path = ROOT) -> None:
+    for name, copies in SHARED.items():
+        canonical = root / CANONICAL_DIR / name
+        for folder in copies:
+            shutil.copyfile(canonical, root / folder / name)
+            print(f"[OK] {folder}/{name}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Synchronise / vérifie les copies des modules partagés.")
+    parser.add_argument("--check", action="store_true", help="Vérifie seulement (code 1 si divergence)")
+    args = parser.parse_args()
+    if not args.check:
+        sync()
+    problems = drifted()
+    for p in problems:
+        print(f"[DIVERGENCE] {p}")
+    if not problems:
+        print(f"[OK] {sum(len(c) for c in SHARED.values())} copies identiques à {CANONICAL_DIR}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())